@@ -0,0 +1,121 @@
+"""
+카테고리/프로모션 워커가 공유하는 적응형 동시 실행 제한기 (AIMD + 지연시간 목표).
+
+- 작업이 목표 시간(target_latency) 안에 성공하면 동시 실행 수를 조금씩 늘리고 (Additive Increase:
+  작업 하나마다 step / 현재 한도만큼, 즉 한도만큼의 작업이 끝날 때마다 약 +step)
+- 실패하거나 목표 시간을 넘기면 절반으로 줄입니다 (Multiplicative Decrease).
+  동시에 끝난 여러 작업이 연달아 줄이지 않도록, 한 번 줄인 뒤 cooldown 동안은 다시 줄이지 않습니다.
+
+사용법:
+    limiter = AdaptiveLimiter(initial=3)
+    async with limiter.slot() as slot:
+        result = await do_work()  # 예외가 나면 자동으로 실패 처리
+        if result is None:  # 오류/시간 초과를 잡아 None으로 돌려준 경우 (빈 결과는 정상)
+            slot.fail()
+"""
+import asyncio
+import os
+import time
+
+ADAPTIVE_MIN_CONCURRENCY = int(os.environ.get("CRAWL_MIN_CONCURRENCY", "1"))
+ADAPTIVE_MAX_CONCURRENCY = int(os.environ.get("CRAWL_MAX_CONCURRENCY", "10"))
+# 한 작업(페이지 로딩~추출)이 이 시간(초) 안에 끝나면 '빠름'으로 보고 동시 실행 수를 늘립니다.
+ADAPTIVE_TARGET_LATENCY = float(os.environ.get("CRAWL_TARGET_LATENCY", "20"))
+ADAPTIVE_INCREASE_STEP = 1.0
+ADAPTIVE_DECREASE_FACTOR = 0.5
+ADAPTIVE_DECREASE_COOLDOWN = 5.0
+
+
+class _Slot:
+    def __init__(self, limiter):
+        self.limiter = limiter
+        self.ok = True
+        self.started = None
+
+    def fail(self):
+        """예외 없이 끝났지만 실패로 취급할 때 (예: 페이지 로딩 오류/시간 초과를 잡아서 빈 결과를 돌려줄 때)"""
+        self.ok = False
+
+    async def __aenter__(self):
+        await self.limiter._acquire()
+        self.started = time.monotonic()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        latency = time.monotonic() - self.started
+        await self.limiter._release(latency, self.ok and exc_type is None)
+        return False
+
+
+class AdaptiveLimiter:
+    def __init__(self, initial=3, min_limit=ADAPTIVE_MIN_CONCURRENCY, max_limit=ADAPTIVE_MAX_CONCURRENCY,
+                 target_latency=ADAPTIVE_TARGET_LATENCY):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.target_latency = target_latency
+
+        self.in_flight = 0
+        self._cond = asyncio.Condition()
+        self._last_decrease = 0.0
+
+        # 실제 사용된 동시 실행 수 통계
+        self.peak_in_flight = 0
+        self.successes = 0
+        self.failures = 0
+        self.slow = 0
+        self._busy_area = 0.0  # in_flight * 경과시간 누적 (시간 가중 평균용)
+        self._last_change = None
+        self._first_start = None
+
+    def slot(self):
+        return _Slot(self)
+
+    def _account(self):
+        now = time.monotonic()
+        if self._last_change is not None:
+            self._busy_area += self.in_flight * (now - self._last_change)
+        else:
+            self._first_start = now
+        self._last_change = now
+
+    async def _acquire(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self._account()
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    async def _release(self, latency, ok):
+        async with self._cond:
+            self._account()
+            self.in_flight -= 1
+
+            now = time.monotonic()
+            if not ok or latency > self.target_latency:
+                if not ok:
+                    self.failures += 1
+                else:
+                    self.slow += 1
+                if now - self._last_decrease >= ADAPTIVE_DECREASE_COOLDOWN:
+                    self.limit = max(self.min_limit, self.limit * ADAPTIVE_DECREASE_FACTOR)
+                    self._last_decrease = now
+            else:
+                self.successes += 1
+                # 한 '창'(현재 한도만큼의 작업)마다 +step이 되도록 작업당 step / limit씩 증가
+                self.limit = min(self.max_limit, self.limit + ADAPTIVE_INCREASE_STEP / self.limit)
+
+            self._cond.notify_all()
+
+    @property
+    def average_in_flight(self):
+        if self._first_start is None or self._last_change is None:
+            return 0.0
+        elapsed = self._last_change - self._first_start
+        return self._busy_area / elapsed if elapsed > 0 else float(self.in_flight)
+
+    def report(self):
+        print("  [동시 실행 제어]")
+        print(f"    - 최종 한도: {int(self.limit)} (범위 {self.min_limit}~{self.max_limit})")
+        print(f"    - 실제 최대 동시 실행: {self.peak_in_flight} / 평균: {self.average_in_flight:.1f}")
+        print(f"    - 성공 {self.successes} / 지연 {self.slow} / 실패 {self.failures}")
@@ -1,469 +1,827 @@
-import json
 import os
 import time
-import re
+import base64
 import asyncio
+import multiprocessing
+import queue
+import sys
+from urllib.parse import urlparse
 from playwright.async_api import async_playwright, TimeoutError
 import datetime
 
+from http_crawler import HttpCrawler, same_page
+from crawl_pipeline import ProductPipeline
+from adaptive_limiter import AdaptiveLimiter
+from crawl_trace import TRACER
+from crawl_store import CrawlStore, category_fingerprint, promotion_cache_key, promotion_fingerprint
+from product_parser import build_extraction_js, extract_call
+from site_profiles import get_profile
+from product_registry import ProductRegistry
+from asset_cache import ASSET_CACHE_ENABLED, AssetCache
+
+# 기존 JSON 덤프 (상태 저장소가 비어 있을 때 한 번 가져오는 용도로만 사용)
 DATA_FILE = "amway_products_full.json"
-PV_REGEX = re.compile(r"PV\s*:\s*([\d,]+)")
-BV_REGEX = re.compile(r"BV\s*:\s*([\d,]+)")
 
-async def discover_category_tabs(page):
+# [최적화] 요청 차단 설정 (이미지/미디어/폰트/트래커)
+# 추출 스크립트는 img의 src 속성 문자열만 읽으므로 실제 바이트는 내려받을 필요가 없습니다.
+# CRAWL_BLOCK_RESOURCES=0 으로 끌 수 있습니다.
+BLOCK_RESOURCES = os.environ.get("CRAWL_BLOCK_RESOURCES", "1") != "0"
+
+# resource_type별 처리 방식: "stub" (빈 응답으로 대체) 또는 "abort" (요청 취소)
+# 이미지는 abort 시 onerror 대체 이미지로 src가 바뀔 수 있어 1x1 GIF로 응답합니다.
+BLOCKED_RESOURCE_ACTIONS = {
+    "image": "stub",
+    "media": "abort",
+    "font": "abort",
+}
+
+# 분석/광고 트래커 도메인 (하위 도메인 포함)
+TRACKER_DOMAINS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googleadservices.com",
+    "facebook.net",
+    "tiqcdn.com",
+    "criteo.com",
+    "criteo.net",
+    "wcs.naver.net",
+    "analytics.tiktok.com",
+    "bat.bing.com",
+    "clarity.ms",
+    "hotjar.com",
+    "adobedtm.com",
+    "omtrdc.net",
+    "demdex.net",
+    "nr-data.net",
+]
+
+# 차단 규칙에 걸려도 항상 통과시킬 URL (부분 문자열)
+ALLOWED_URL_PATTERNS = []
+
+# [최적화] 크롤 엔진 선택
+# auto: HTTP 직접 호출 우선, 실패한 카테고리/프로모션만 브라우저로 폴백
+# http: 브라우저를 띄우지 않음 / browser: 기존 Playwright 렌더링만 사용
+CRAWL_ENGINE = os.environ.get("CRAWL_ENGINE", "auto").lower()
+
+# 워커 프로세스(샤드) 수. 2 이상이면 발견한 카테고리/프로모션을 N개 프로세스에 나눠
+# 프로세스마다 자기 브라우저/HTTP 커넥션 풀로 크롤링하고, 결과는 이 프로세스의 저장 단계 하나로 모음
+CRAWL_SHARDS = int(os.environ.get("CRAWL_SHARDS", "1"))
+
+# 카테고리 페이지네이션 방식
+# network: 상품 목록 XHR 응답의 전체 개수/페이지 수를 보고 마지막 페이지 도착 즉시 종료
+# scroll: 기존 고정 스크롤 루프 (높이 변화가 없을 때까지)
+CRAWL_PAGINATION = os.environ.get("CRAWL_PAGINATION", "network").lower()
+# 다음 페이지 응답을 기다리는 최대 시간 (초). 이 시간 안에 응답이 없으면 끝난 것으로 봅니다.
+NETWORK_PAGE_TIMEOUT = 10.0
+# 목록 응답을 아직 하나도 보지 못했을 때 첫 응답을 기다리는 시간 (초).
+# 한 페이지짜리 카테고리는 목록 XHR이 오지 않으므로 길게 기다리지 않고 스크롤 방식으로 넘어갑니다.
+NETWORK_FIRST_PAGE_TIMEOUT = 3.0
+MAX_NETWORK_PAGES = 200
+
+# [최적화] 실행 간 프로모션 캐시
+# 목록의 제목/기간 문자열이 지난 실행과 같으면 상세 페이지를 다시 열지 않고 저장된 상품을 재사용합니다.
+PROMO_CACHE_ENABLED = os.environ.get("PROMO_CACHE", "1") != "0"
+# 변경이 없어도 이 기간(일)이 지나면 강제로 다시 수집 (0이면 강제 갱신 안 함)
+PROMO_CACHE_REFRESH_DAYS = float(os.environ.get("PROMO_CACHE_REFRESH_DAYS", "7"))
+# 카테고리 탭 -> URL 목록 캐시 유효 기간(시간). 기간 안이면 URL만 HEAD로 확인하고 /shop/c/shop 렌더링을 건너뜀 (0이면 매번 탐색)
+CATEGORY_CACHE_TTL_HOURS = float(os.environ.get("CATEGORY_CACHE_TTL_HOURS", "168"))
+
+# HAR 기록/재생 (오프라인 벤치마크용)
+# record: 크롤링 중 모든 요청/응답을 CRAWL_HAR_PATH에 저장
+# replay: 네트워크 없이 CRAWL_HAR_PATH에서만 응답 (없는 요청은 차단)
+# 두 모드 모두 브라우저 경로만 사용합니다 (HTTP 엔진 요청은 HAR에 기록되지 않으므로).
+CRAWL_HAR_MODE = os.environ.get("CRAWL_HAR_MODE", "").lower()
+CRAWL_HAR_PATH = os.environ.get("CRAWL_HAR_PATH", os.path.join("har", "amway_crawl.har.zip"))
+
+STUB_GIF = base64.b64decode("R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7")
+
+class RequestBlocker:
     """
-    /shop/c/shop 페이지에서 상단 카테고리 탭(영양건강, 뷰티 등)을 수집합니다.
+    브라우저 컨텍스트에 설치되는 요청 라우팅 레이어.
+    이미지/미디어/폰트와 트래커 요청을 차단(또는 빈 응답으로 대체)하고 resource_type별로 집계합니다.
     """
+    def __init__(self, actions=None, tracker_domains=None, allowlist=None):
+        self.actions = dict(BLOCKED_RESOURCE_ACTIONS if actions is None else actions)
+        self.tracker_domains = list(TRACKER_DOMAINS if tracker_domains is None else tracker_domains)
+        self.allowlist = list(ALLOWED_URL_PATTERNS if allowlist is None else allowlist)
+        # { resource_type: {"allowed": n, "stubbed": n, "aborted": n} }
+        self.counters = {}
+        self.tracker_hits = 0
+
+    async def install(self, context):
+        await context.route("**/*", self.handle)
+
+    def _is_tracker(self, url):
+        host = urlparse(url).hostname or ""
+        return any(host == d or host.endswith("." + d) for d in self.tracker_domains)
+
+    def _count(self, resource_type, outcome):
+        bucket = self.counters.setdefault(resource_type, {"allowed": 0, "stubbed": 0, "aborted": 0})
+        bucket[outcome] += 1
+
+    async def handle(self, route):
+        request = route.request
+        url = request.url
+        resource_type = request.resource_type
+
+        action = None
+        if not any(p in url for p in self.allowlist):
+            if self._is_tracker(url):
+                self.tracker_hits += 1
+                action = "abort"
+            else:
+                action = self.actions.get(resource_type)
+
+        try:
+            if action == "stub":
+                self._count(resource_type, "stubbed")
+                if resource_type == "image":
+                    await route.fulfill(status=200, content_type="image/gif", body=STUB_GIF)
+                else:
+                    await route.fulfill(status=200, body=b"")
+            elif action == "abort":
+                self._count(resource_type, "aborted")
+                await route.abort()
+            else:
+                self._count(resource_type, "allowed")
+                # 다른 라우트 핸들러(있다면)에게 넘기고, 없으면 네트워크로 진행
+                await route.fallback()
+        except Exception:
+            # 페이지가 이미 닫힌 경우 등은 무시
+            pass
+
+    def reset_stats(self):
+        self.counters = {}
+        self.tracker_hits = 0
+
+    def report(self):
+        print("  [요청 차단 통계]")
+        for resource_type, c in sorted(self.counters.items()):
+            print(f"    - {resource_type}: 허용 {c['allowed']} / 대체 {c['stubbed']} / 차단 {c['aborted']}")
+        print(f"    - 트래커 차단: {self.tracker_hits}건")
+
+class RunCheckpoints:
+    """
+    카테고리/프로모션 단위 체크포인트.
+    단위가 끝날 때마다 결과를 저장소에 기록하고, --resume 시 완료된 단위는 다시 크롤링하지 않고 저장된 결과를 재생합니다.
+    """
+    def __init__(self, store, run_id, completed=None):
+        self.store = store
+        self.run_id = run_id
+        self.completed = completed or {}
+
+    def get(self, unit_key):
+        return self.completed.get(unit_key)
+
+    async def save(self, unit_key, kind, payload):
+        self.completed[unit_key] = payload
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.store.save_checkpoint, self.run_id, unit_key, kind, payload)
+
+class BrowserSession:
+    """
+    Playwright 브라우저/컨텍스트를 처음 필요할 때 실행하는 지연 실행 래퍼.
+    HTTP 엔진이 모든 카테고리를 처리하면 브라우저는 아예 실행되지 않습니다.
+    """
+    def __init__(self, har_mode=None, har_path=None, profile=None):
+        self._playwright = None
+        self.profile = profile or get_profile()
+        self.browser = None
+        self.context = None
+        self.blocker = None
+        self.asset_cache = None
+        self.har_mode = har_mode
+        self.har_path = har_path
+        self._lock = asyncio.Lock()
+
+    async def get_context(self):
+        async with self._lock:
+            if self.context is not None and not self.browser.is_connected():
+                # 오래 실행 중인 세션(daemon)에서 브라우저가 죽은 경우 새로 실행
+                print("  -> 브라우저 연결이 끊어져 다시 실행합니다.")
+                try:
+                    await self.close()
+                except Exception:
+                    self.browser = self.context = self._playwright = self.blocker = self.asset_cache = None
+            if self.context is None:
+                print("  -> 브라우저를 실행 중입니다... (잠시만 기다려주세요)")
+                self._playwright = await async_playwright().start()
+                self.browser = await self._playwright.chromium.launch(headless=True)
+
+                if self.har_mode == "record":
+                    os.makedirs(os.path.dirname(self.har_path) or ".", exist_ok=True)
+                    # .zip 이면 응답 본문이 별도 파일로 압축 저장됨
+                    self.context = await self.browser.new_context(
+                        record_har_path=self.har_path,
+                        record_har_content="attach" if self.har_path.endswith(".zip") else "embed",
+                    )
+                    print(f"  -> HAR 기록 모드: {self.har_path}")
+                else:
+                    self.context = await self.browser.new_context()
+
+                if self.har_mode == "replay":
+                    # 아카이브에 없는 요청은 네트워크로 나가지 않고 차단
+                    await self.context.route_from_har(self.har_path, not_found="abort")
+                    print(f"  -> HAR 재생 모드: {self.har_path} (네트워크 미사용)")
+
+                # 추출 라이브러리를 컨텍스트에 한 번 등록 -> 모든 페이지/문서에 자동 설치
+                await self.context.add_init_script(build_extraction_js(self.profile["rules"]))
+
+                # 정적 리소스(JS/CSS/폰트) 디스크 캐시. HAR 기록/재생 중에는 실제 응답/아카이브만 사용
+                if ASSET_CACHE_ENABLED and self.har_mode not in ("record", "replay"):
+                    self.asset_cache = AssetCache()
+                    await self.asset_cache.install(self.context)
+
+                # 라우트는 나중에 등록된 것이 먼저 실행되므로 차단 레이어를 마지막에 설치
+                # (허용된 요청은 route.fallback()으로 리소스 캐시 / HAR 재생 라우트에 넘어감)
+                if BLOCK_RESOURCES:
+                    self.blocker = RequestBlocker()
+                    await self.blocker.install(self.context)
+        return self.context
+
+    async def new_page(self):
+        context = await self.get_context()
+        return await context.new_page()
+
+    def report(self, reset=False):
+        """요청 차단/리소스 캐시 통계 출력. reset=True면 다음 실행을 위해 0으로 (daemon.py처럼 세션을 재사용할 때)"""
+        if self.blocker:
+            self.blocker.report()
+            if reset:
+                self.blocker.reset_stats()
+        if self.asset_cache:
+            self.asset_cache.report()
+            if reset:
+                self.asset_cache.reset_stats()
+
+    async def close(self):
+        self.report()
+        if self.context:
+            # HAR 기록은 컨텍스트가 닫힐 때 파일로 저장됨
+            await self.context.close()
+        if self.browser:
+            await self.browser.close()
+        if self._playwright:
+            await self._playwright.stop()
+        if self.asset_cache:
+            self.asset_cache.close()
+        self.browser = None
+        self.context = None
+        self._playwright = None
+        self.blocker = None
+        self.asset_cache = None
+
+async def discover_category_tabs(page, profile=None):
+    """
+    /shop/c/shop 페이지에서 상단 카테고리 탭(영양건강, 뷰티 등 - 사이트 프로필의 categories)을 수집합니다.
+    """
+    profile = profile or get_profile()
     print("카테고리 탭 탐색 중...")
+    TRACER.track_page_bytes(page)
     try:
-        await page.goto("https://www.amway.co.kr/shop/c/shop", wait_until="networkidle", timeout=60000)
+        with TRACER.span("goto", url="/shop/c/shop"):
+            await page.goto(f"{profile['base_url']}/shop/c/shop", wait_until="networkidle", timeout=60000)
     except:
         return []
 
-    target_cats = ["영양건강", "뷰티", "퍼스널 케어", "홈리빙", "원포원", "웰니스", "플러스 쇼핑"]
-    
-    categories = await page.evaluate("""(target_cats) => {
-        const results = [];
-        const links = Array.from(document.querySelectorAll('a'));
-
-        target_cats.forEach(cat_name => {
-            try {
-                // 1. Try exact match on text
-                let match = links.find(l => {
-                    const text = l.innerText ? l.innerText.trim() : "";
-                    return text === cat_name && l.offsetParent !== null; // offsetParent != null checks visibility roughly
-                });
-
-                // 2. Fallback to contains if not found
-                if (!match) {
-                     const candidates = links.filter(l => {
-                         const text = l.innerText || "";
-                         return text.includes(cat_name) && l.offsetParent !== null;
-                     });
-
-                     for (const l of candidates) {
-                         const href = l.getAttribute('href');
-                         if (href && href.includes('/shop/')) {
-                             match = l;
-                             break;
-                         }
-                     }
-                }
-
-                if (match) {
-                    let href = match.getAttribute('href');
-                    if (href) {
-                        if (href.startsWith('/')) href = "https://www.amway.co.kr" + href;
-                        results.push({name: cat_name, url: href});
-                    }
-                }
-            } catch (e) {}
-        });
-        return results;
-    }""", target_cats)
+    target_cats = profile["categories"]
+
+    with TRACER.span("evaluate", what="discover_categories"):
+        categories = await _extract(page, profile, "categories", target_cats, profile["base_url"])
             
     print(f"총 {len(categories)}개의 카테고리 탭 발견: {[c['name'] for c in categories]}")
     return categories
 
-async def load_previous_state():
+async def _category_urls_alive(cats, session, http):
+    """저장된 카테고리 URL이 아직 유효한지 렌더링 없이(HEAD) 확인"""
+    if http:
+        results = await asyncio.gather(*[http.check_url(c["url"]) for c in cats])
+        return all(results)
+    if session is None:
+        return False
+
+    context = await session.get_context()
+
+    async def check(url):
+        try:
+            resp = await context.request.head(url, timeout=10000)
+            return resp.ok and same_page(url, resp.url)
+        except Exception:
+            return False
+    results = await asyncio.gather(*[check(c["url"]) for c in cats])
+    return all(results)
+
+async def discover_categories(store, session, http, profile, use_cache=True):
     """
-    Asynchronously loads the previous state from the JSON file.
-    Uses run_in_executor to avoid blocking the event loop during file I/O.
+    카테고리 탭 -> [{name, url}].
+    CATEGORY_CACHE_TTL_HOURS 이내에 찾아 둔 목록이 있고 모든 URL이 HEAD 확인을 통과하면 그대로 쓰고,
+    아니면 HTTP(/shop/c/shop HTML) -> 브라우저(discover_category_tabs) 순으로 다시 찾아 저장합니다.
+    use_cache=False: 저장된 목록을 보지 않고 항상 탐색 (HAR 기록 시 탐색 페이지도 아카이브에 남도록)
     """
-    if os.path.exists(DATA_FILE):
+    loop = asyncio.get_running_loop()
+    site_key = profile["base_url"]
+    fingerprint = category_fingerprint(profile["categories"])
+
+    if use_cache and CATEGORY_CACHE_TTL_HOURS > 0:
+        cats = await loop.run_in_executor(
+            None, store.get_cached_categories, site_key, fingerprint, CATEGORY_CACHE_TTL_HOURS * 3600)
+        if cats:
+            with TRACER.span("validate_category_cache", count=len(cats)):
+                alive = await _category_urls_alive(cats, session, http)
+            if alive:
+                print(f"  저장된 카테고리 {len(cats)}개를 사용합니다. (URL 확인 완료)")
+                return cats
+            print("  저장된 카테고리 URL 중 유효하지 않은 것이 있어 다시 탐색합니다.")
+
+    cats = None
+    if http:
+        with TRACER.span("http_discover_categories"):
+            cats = await http.discover_categories(profile["categories"])
+    if not cats and session is not None:
+        page = await session.new_page()
         try:
-            loop = asyncio.get_running_loop()
-            def _read_file():
-                with open(DATA_FILE, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return await loop.run_in_executor(None, _read_file)
-        except:
-            return {}
-    return {}
+            cats = await discover_category_tabs(page, profile)
+        finally:
+            await page.close()
+    if cats:
+        await loop.run_in_executor(None, store.put_cached_categories, site_key, fingerprint, cats)
+    return cats
 
-async def save_current_state(data):
+async def load_previous_state(store=None):
     """
-    Asynchronously saves the current state to the JSON file.
+    상태 저장소(SQLite)에서 지금까지의 상품 상태를 { id: Product } 형태로 읽어옵니다.
+    저장소가 비어 있으면 기존 JSON 덤프(DATA_FILE)를 한 번 가져옵니다.
     Uses run_in_executor to avoid blocking the event loop during file I/O.
     """
     loop = asyncio.get_running_loop()
-    def _write_file():
-        with open(DATA_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-    await loop.run_in_executor(None, _write_file)
-
-async def _extract_products_optimized(page, cat_name):
-    return await page.evaluate(r"""(cat_name) => {
-        const products = Array.from(document.querySelectorAll(".product_item"));
-        const items = products.length ? products : Array.from(document.querySelectorAll(".box_product"));
-        const results = {};
-
-        const pvRegex = /PV\s*:\s*([\d,]+)/;
-        const bvRegex = /BV\s*:\s*([\d,]+)/;
-
-        items.forEach(product => {
-            try {
-                // 1. Name
-                let nameEl = product.querySelector(".text_product-title");
-                if (!nameEl) nameEl = product.querySelector(".product_name");
-                let name = nameEl ? nameEl.innerText.trim() : "Unknown Name";
-
-                // 2. Link & ID
-                let linkEl = product.querySelector("a");
-                let link = linkEl ? linkEl.getAttribute("href") : "";
-                if (link && link.startsWith("/")) {
-                    link = "https://www.amway.co.kr" + link;
-                }
-
-                let productId = link ? link.split('/').pop() : name;
-
-                // 3. Price
-                let priceEl = product.querySelector(".text_price-data");
-                if (!priceEl) priceEl = product.querySelector(".price");
-                let price = priceEl ? priceEl.innerText.trim() : "0";
-
-                // 4. Image
-                let imgEl = product.querySelector("img");
-                let imgSrc = imgEl ? imgEl.getAttribute("src") : "";
-                if (imgSrc && imgSrc.startsWith("/")) {
-                    imgSrc = "https://www.amway.co.kr" + imgSrc;
-                }
-
-                // 5. Status
-                let statusText = product.innerText;
-                let status = "판매중";
-                if (statusText.includes("일시품절")) status = "일시품절";
-                else if (statusText.includes("품절")) status = "품절";
-                else if (statusText.includes("단종")) status = "단종";
-
-                // 6. PV / BV
-                let pv = "0";
-                let bv = "0";
-
-                let dataEl = product.querySelector("input[name='productTealiumTagInfo']");
-                if (!dataEl) {
-                    dataEl = product.querySelector(".js-addtocart-v2");
-                }
-
-                if (dataEl) {
-                    let rawPv = dataEl.getAttribute("data-product-point-value");
-                    let rawBv = dataEl.getAttribute("data-product-business-volume");
-
-                    if (rawPv) {
-                        let parsed = parseInt(parseFloat(rawPv));
-                        if (!isNaN(parsed)) pv = String(parsed);
-                    }
-                    if (rawBv) {
-                        let parsed = parseInt(parseFloat(rawBv));
-                        if (!isNaN(parsed)) bv = String(parsed);
-                    }
-                }
-
-                if (pv === "0") {
-                    let match = statusText.match(pvRegex);
-                    if (match) pv = match[1].replace(/,/g, "");
-                }
-
-                if (bv === "0") {
-                    let match = statusText.match(bvRegex);
-                    if (match) bv = match[1].replace(/,/g, "");
-                }
-
-                // Smart Order Handling
-                let finalCategory = cat_name;
-                if (name.includes("스마트 오더") || name.includes("스마트오더")) {
-                    finalCategory = "스마트 오더";
-                }
-
-                results[productId] = {
-                    "id": productId,
-                    "name": name,
-                    "price": price,
-                    "status": status,
-                    "link": link,
-                    "image": imgSrc,
-                    "category": finalCategory,
-                    "sub_category": "",
-                    "pv": pv,
-                    "bv": bv
-                };
-            } catch (e) {
-                // continue
-            }
-        });
-        return results;
-    }""", cat_name)
-
-async def crawl_category(page, category_info):
-    cat_name = category_info['name']
-    url = category_info['url']
-    
-    print(f"Crawling Category: {cat_name} ({url})")
+    def _read_store():
+        s = store or CrawlStore()
+        try:
+            s.import_json(DATA_FILE)
+            return s.get_products()
+        finally:
+            if store is None:
+                s.close()
     try:
-        await page.goto(url, wait_until="networkidle", timeout=60000)
+        return await loop.run_in_executor(None, _read_store)
     except Exception as e:
-        print(f"  Error loading page: {e}")
+        print(f"  (이전 상태 읽기 실패: {e})")
         return {}
 
-    # Wait for products
+async def save_current_state(store, run_id):
+    """
+    크롤링이 끝까지 완료된 실행을 저장소에 '완료'로 기록합니다.
+    상품 자체는 크롤링 중에 묶음 단위로 이미 upsert되어 있습니다.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, store.finish_run, run_id)
+
+async def _extract(page, profile, fn_name, *args):
+    """
+    컨텍스트에 설치된 추출 라이브러리(product_parser.EXTRACTION_JS)의 함수를 짧은 스크립트로 호출합니다.
+    init script가 적용되지 않은 문서(예: 컨텍스트 밖에서 만든 page)에서는 한 번 설치한 뒤 다시 호출합니다.
+    """
+    call = extract_call(fn_name, *args)
+    result = await page.evaluate(call, list(args))
+    if result is None:
+        await page.evaluate(build_extraction_js(profile["rules"]))
+        result = await page.evaluate(call, list(args))
+    return result
+
+async def _extract_products_optimized(page, cat_name, profile):
+    return await _extract(page, profile, "category", cat_name, profile["base_url"])
+
+class ProductListWatcher:
+    """
+    카테고리 페이지의 상품 목록 XHR 응답(pagination 포함 JSON)을 감시합니다.
+    전체 상품 수, 페이지 크기, 도착한 페이지 번호를 추적하여 마지막 페이지가 왔는지 판단합니다.
+    """
+    def __init__(self, page):
+        self.page = page
+        self.total = None
+        self.page_size = None
+        self.number_of_pages = None
+        self.pages = set()
+        # 실제로 받은 목록 XHR 응답 수 (초기 페이지 상태에서 읽은 pagination은 세지 않음)
+        self.responses = 0
+        self._arrived = asyncio.Event()
+        page.on("response", self._on_response)
+
+    async def _on_response(self, response):
+        try:
+            if response.request.resource_type not in ("xhr", "fetch"):
+                return
+            if "json" not in (response.headers.get("content-type") or ""):
+                return
+            data = await response.json()
+        except Exception:
+            return
+
+        pagination = data.get("pagination") if isinstance(data, dict) else None
+        if self.add_pagination(pagination):
+            self.responses += 1
+            self._arrived.set()
+
+    def add_pagination(self, pagination):
+        """목록 응답(또는 초기 페이지 상태)의 pagination 반영. 유효한 pagination이면 True"""
+        if not isinstance(pagination, dict) or "currentPage" not in pagination:
+            return False
+        self.total = pagination.get("totalNumberOfResults", self.total)
+        self.page_size = pagination.get("pageSize", self.page_size)
+        self.number_of_pages = pagination.get("numberOfPages", self.number_of_pages)
+        self.pages.add(pagination["currentPage"])
+        return True
+
+    @property
+    def seen_any(self):
+        """목록 XHR 응답을 하나라도 받았는지"""
+        return self.responses > 0
+
+    @property
+    def complete(self):
+        # 첫 페이지는 서버 렌더링되어 XHR로 오지 않을 수 있으므로 가장 마지막 페이지 번호로 판단
+        if self.number_of_pages is None or not self.pages:
+            return False
+        return max(self.pages) + 1 >= self.number_of_pages
+
+    async def wait_next(self, timeout):
+        """새 목록 응답이 올 때까지 대기. 시간 초과 시 False."""
+        try:
+            await asyncio.wait_for(self._arrived.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._arrived.clear()
+
+    def detach(self):
+        try:
+            self.page.remove_listener("response", self._on_response)
+        except Exception:
+            pass
+
+async def _click_more_buttons(page):
+    """보이는 '더보기' 버튼을 클릭. 클릭했으면 True."""
+    clicked = False
     try:
-        await page.wait_for_selector(".product_item, .box_product", timeout=20000)
-    except:
-        print("  No products found initially.")
-        return {}
-    
-    # Scroll to load all
-    last_height = await page.evaluate("document.body.scrollHeight")
-    for i in range(15): # Adequate scrolling
-        await page.mouse.wheel(0, 15000)
-        
-        # Smart wait for height change
+        more_btns = await page.query_selector_all("a.btn_more, button.btn_more")
+        for btn in more_btns:
+            if await btn.is_visible():
+                await btn.click()
+                clicked = True
+    except: pass
+    return clicked
+
+async def _initial_pagination(page):
+    """
+    서버 렌더링된 첫 페이지의 상태 JSON(인라인 script)에서 pagination을 찾습니다. 없으면 None.
+    첫 페이지는 XHR로 오지 않으므로, 한 페이지짜리 카테고리는 이것으로만 끝났는지 알 수 있습니다.
+    """
+    try:
+        return await page.evaluate("""() => {
+            const re = /"pagination"\\s*:\\s*(\\{[^{}]*\\})/;
+            for (const script of document.querySelectorAll('script:not([src])')) {
+                const m = re.exec(script.textContent || '');
+                if (!m) continue;
+                try {
+                    const pagination = JSON.parse(m[1]);
+                    if ('currentPage' in pagination && 'numberOfPages' in pagination) return pagination;
+                } catch (e) {}
+            }
+            return null;
+        }""")
+    except Exception:
+        return None
+
+async def _paginate_by_network(page, watcher, cat_name):
+    """
+    목록 응답 기반 페이지네이션.
+    반환값: True(완료 또는 응답 기반으로 종료), False(목록 XHR을 전혀 관찰하지 못함 -> 스크롤 방식으로 폴백)
+    """
+    # 첫 페이지 상태에 페이지 수가 있으면 반영 (한 페이지뿐이면 아래 루프를 돌지 않고 바로 종료)
+    watcher.add_pagination(await _initial_pagination(page))
+
+    for i in range(MAX_NETWORK_PAGES):
+        if watcher.complete:
+            break
+
+        with TRACER.span("scroll", iteration=i, mode="network") as span_args:
+            # 다음 페이지 요청 유도 (무한 스크롤 + 더보기 버튼)
+            await page.mouse.wheel(0, 15000)
+            with TRACER.span("more_click"):
+                await _click_more_buttons(page)
+
+            # 목록 응답을 하나도 못 봤고 페이지 수도 모르면 짧게만 기다림 (XHR이 없는 한 페이지짜리일 수 있음)
+            timeout = (NETWORK_PAGE_TIMEOUT if watcher.seen_any or watcher.number_of_pages
+                       else NETWORK_FIRST_PAGE_TIMEOUT)
+            arrived = await watcher.wait_next(timeout)
+            span_args["arrived"] = arrived
+
+        if not arrived:
+            # 초기 상태로 페이지 수를 알아도 목록 XHR이 한 번도 오지 않았으면 스크롤 방식으로 폴백
+            if not watcher.seen_any:
+                return False
+            # 더 이상 응답이 오지 않음 (마지막 페이지 번호를 받지 못한 경우)
+            break
+
+    # 마지막 응답의 상품이 DOM에 그려질 때까지 대기
+    if watcher.total:
         try:
             await page.wait_for_function(
-                "last_height => document.body.scrollHeight > last_height",
-                arg=last_height,
-                timeout=2000
+                "total => document.querySelectorAll('.product_item, .box_product').length >= total",
+                arg=watcher.total,
+                timeout=5000
             )
         except TimeoutError:
             pass
 
-        # '더보기' 버튼 처리
-        try:
-            more_btns = await page.query_selector_all("a.btn_more, button.btn_more")
-            for btn in more_btns:
-                if await btn.is_visible():
-                    await btn.click()
+    if not watcher.complete:
+        print(f"  [경고] {cat_name}: 목록 응답 {len(watcher.pages)}/{watcher.number_of_pages}페이지만 수신됨")
+    return True
+
+async def _paginate_by_scroll(page):
+    # Scroll to load all
+    last_height = await page.evaluate("document.body.scrollHeight")
+    for i in range(15): # Adequate scrolling
+        with TRACER.span("scroll", iteration=i, mode="scroll"):
+            await page.mouse.wheel(0, 15000)
+
+            # Smart wait for height change
+            try:
+                await page.wait_for_function(
+                    "last_height => document.body.scrollHeight > last_height",
+                    arg=last_height,
+                    timeout=2000
+                )
+            except TimeoutError:
+                pass
+
+            # '더보기' 버튼 처리
+            with TRACER.span("more_click"):
+                if await _click_more_buttons(page):
                     # Optimized wait with fallback
                     try:
                         await page.wait_for_load_state("networkidle", timeout=1000)
                     except:
                         await asyncio.sleep(1)
-        except: pass
 
-        new_height = await page.evaluate("document.body.scrollHeight")
+            new_height = await page.evaluate("document.body.scrollHeight")
         if new_height == last_height and i > 2:
             break
         last_height = new_height
 
-    # Optimized extraction
-    category_data = await _extract_products_optimized(page, cat_name)
-    print(f"  Found {len(category_data)} products in {cat_name}.")
-    
+async def crawl_category(page, category_info, profile=None, slot=None):
+    """slot: AdaptiveLimiter 슬롯 (페이지 로딩 실패/시간 초과를 실패로 알림)"""
+    profile = profile or get_profile()
+    cat_name = category_info['name']
+    TRACER.name_lane(f"category: {cat_name}")
+    with TRACER.span("crawl_category", category=cat_name) as span_args:
+        page_bytes = {"bytes": 0}
+        TRACER.track_page_bytes(page, page_bytes)
+        category_data = await _crawl_category(page, category_info, profile, slot)
+        span_args["products"] = len(category_data)
+        span_args["bytes"] = page_bytes["bytes"]
     return category_data
 
-async def process_promotion_item(context, item, sem):
-    async with sem:
+async def _crawl_category(page, category_info, profile, slot=None):
+    cat_name = category_info['name']
+    url = category_info['url']
+    
+    print(f"Crawling Category: {cat_name} ({url})")
+
+    # 목록 응답은 첫 로딩 중에도 올 수 있으므로 goto 전에 감시 시작
+    watcher = ProductListWatcher(page) if CRAWL_PAGINATION == "network" else None
+    # network 모드는 상품 셀렉터와 목록 응답으로 판단하므로 networkidle까지 기다리지 않음
+    wait_until = "domcontentloaded" if watcher else "networkidle"
+
+    try:
+        try:
+            with TRACER.span("goto", url=url):
+                await page.goto(url, wait_until=wait_until, timeout=60000)
+        except Exception as e:
+            print(f"  Error loading page: {e}")
+            if slot:
+                slot.fail()
+            return {}
+
+        # Wait for products
+        try:
+            with TRACER.span("wait_for_selector"):
+                await page.wait_for_selector(", ".join(profile["rules"]["selectors"]["card"]), timeout=20000)
+        except:
+            print("  No products found initially.")
+            return {}
+
+        paginated = False
+        if watcher:
+            paginated = await _paginate_by_network(page, watcher, cat_name)
+        if not paginated:
+            await _paginate_by_scroll(page)
+
+        # Optimized extraction
+        with TRACER.span("evaluate", what="extract_products"):
+            category_data = await _extract_products_optimized(page, cat_name, profile)
+        print(f"  Found {len(category_data)} products in {cat_name}.")
+
+        if watcher and watcher.total and len(category_data) < watcher.total:
+            print(f"  [경고] {cat_name}: 전체 {watcher.total}개 중 {len(category_data)}개만 추출됨")
+
+        return category_data
+    finally:
+        if watcher:
+            watcher.detach()
+
+async def fetch_category_products(session, http, cat, limiter, profile):
+    """카테고리 하나: HTTP 엔진 우선, 실패하면 브라우저로 크롤링 (결과가 없으면 None 또는 빈 dict)"""
+    cat_products = None
+    async with limiter.slot() as slot:
+        if http:
+            TRACER.name_lane(f"category: {cat['name']}")
+            with TRACER.span("http_fetch_category", category=cat['name']):
+                cat_products = await http.fetch_category(cat)
+
+        if cat_products is None and session is not None:
+            if http:
+                print(f"  -> {cat['name']}: 브라우저로 전환")
+            # Use a new page for each category to ensure isolation
+            cat_page = await session.new_page()
+            try:
+                cat_products = await crawl_category(cat_page, cat, profile, slot)
+            finally:
+                await cat_page.close()
+        # 빈 카테고리는 정상 결과이므로 실패로 보지 않음 (로딩 실패/예외만 동시 실행 수를 줄임)
+    return cat_products
+
+async def _commit_category(cat, cat_products, pipeline, registry, checkpoints):
+    await checkpoints.save(f"category:{cat['url']}", "category", cat_products)
+    await pipeline.emit(registry.merge(cat_products), cat['name'])
+
+async def _load_cached_promotion(store, item):
+    """변경되지 않은 프로모션이면 캐시된 상품 dict, 아니면 None"""
+    loop = asyncio.get_running_loop()
+    max_age = PROMO_CACHE_REFRESH_DAYS * 86400 if PROMO_CACHE_REFRESH_DAYS > 0 else None
+    return await loop.run_in_executor(
+        None, store.get_cached_promotion,
+        promotion_cache_key(item["url"]), promotion_fingerprint(item), max_age
+    )
+
+async def _save_cached_promotion(store, item, products):
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(
+        None, store.put_cached_promotion,
+        promotion_cache_key(item["url"]), promotion_fingerprint(item), item, products
+    )
+
+async def process_promotion_item(session, item, limiter, http=None, pipeline=None, registry=None,
+                                 checkpoints=None, promo_cache=None, stats=None, profile=None):
+    profile = profile or get_profile()
+    unit_key = f"promotion:{item['url']}"
+    TRACER.name_lane(f"promotion: {item['text']}")
+    with TRACER.span("process_promotion_item", title=item["text"]) as span_args:
+        promo_data = checkpoints.get(unit_key) if checkpoints else None
+        span_args["source"] = "checkpoint"
+
+        if promo_data is None and promo_cache:
+            promo_data = await _load_cached_promotion(promo_cache, item)
+            span_args["source"] = "cache"
+            if promo_data is not None and stats is not None:
+                stats["cache_hits"] += 1
+
+        if promo_data is None:
+            span_args["source"] = "crawl"
+            promo_data = await _process_promotion_item(session, item, limiter, http, profile)
+            if promo_data and promo_cache:
+                await _save_cached_promotion(promo_cache, item, promo_data)
+        span_args["products"] = len(promo_data or {})
+
+    if promo_data:
+        await _commit_promotion(item, promo_data, pipeline, registry, checkpoints)
+    return promo_data
+
+async def _commit_promotion(item, promo_data, pipeline, registry, checkpoints):
+    unit_key = f"promotion:{item['url']}"
+    if checkpoints and checkpoints.get(unit_key) is None:
+        await checkpoints.save(unit_key, "promotion", promo_data)
+
+    # 프로모션 하나가 끝날 때마다 바로 저장 단계로 전달
+    # (레지스트리가 있으면 카테고리/다른 프로모션에서 이미 전달한 상품은 내용이 바뀐 경우에만 갱신으로 전달)
+    if pipeline:
+        fresh = registry.merge(promo_data, event_title=item["text"]) if registry is not None else promo_data
+        await pipeline.emit(fresh, f"Promo: {item['text']}")
+
+async def _process_promotion_item(session, item, limiter, http, profile):
+    async with limiter.slot() as slot:
         target_url = item["url"]
         target_title = item["text"]
 
+        # [최적화] HTTP로 상세 HTML을 바로 파싱 (JS 렌더링이 필요한 경우에만 브라우저 사용)
+        if http:
+            with TRACER.span("http_fetch_promotion", url=target_url):
+                promo_data = await http.fetch_promotion(item)
+            if promo_data is not None:
+                return promo_data
+        if session is None:
+            return {}
+
         # print(f"  [Promo] Processing: {target_title}") # Too verbose?
-        page = await context.new_page()
+        page = await session.new_page()
+        TRACER.track_page_bytes(page)
         promo_data = {}
 
         try:
-            await page.goto(target_url, wait_until="networkidle", timeout=30000)
+            with TRACER.span("goto", url=target_url):
+                await page.goto(target_url, wait_until="networkidle", timeout=30000)
             
             # Scroll
-            await page.mouse.wheel(0, 3000)
-            await asyncio.sleep(1)
+            with TRACER.span("scroll", iteration=0):
+                await page.mouse.wheel(0, 3000)
+                await asyncio.sleep(1)
 
             # Optimization: Single evaluate call
-            promo_data = await page.evaluate(r"""() => {
-                const results = {};
-                let products = Array.from(document.querySelectorAll(".product_item"));
-                if (!products.length) products = Array.from(document.querySelectorAll(".box_product"));
-
-                const pvRegex = /PV\s*:\s*([\d,]+)/;
-                const bvRegex = /BV\s*:\s*([\d,]+)/;
-
-                if (products.length > 0) {
-                    products.forEach(product => {
-                        try {
-                            // Name
-                            let nameEl = product.querySelector(".text_product-title");
-                            if (!nameEl) nameEl = product.querySelector(".product_name");
-                            let name = nameEl ? nameEl.innerText.trim() : "Unknown Name";
-
-                            // Link & ID
-                            let linkEl = product.querySelector("a");
-                            let p_href = linkEl ? linkEl.getAttribute("href") : "";
-
-                            if (!p_href || !p_href.includes("/shop/")) return;
-
-                            let full_p_url = p_href.startsWith("/") ? "https://www.amway.co.kr" + p_href : p_href;
-                            let productId = full_p_url.split('/').pop();
-
-                            // Price
-                            let priceEl = product.querySelector(".text_price-data");
-                            if (!priceEl) priceEl = product.querySelector(".price");
-                            let price = priceEl ? priceEl.innerText.trim() : "0";
-
-                            // PV / BV
-                            let pv = "0";
-                            let bv = "0";
-                            
-                            let dataEl = product.querySelector("input[name='productTealiumTagInfo']");
-                            if (!dataEl) {
-                                dataEl = product.querySelector(".js-addtocart-v2");
-                            }
-
-                            if (dataEl) {
-                                let rawPv = dataEl.getAttribute("data-product-point-value");
-                                let rawBv = dataEl.getAttribute("data-product-business-volume");
-
-                                if (rawPv) {
-                                    let parsed = parseInt(parseFloat(rawPv));
-                                    if (!isNaN(parsed)) pv = String(parsed);
-                                }
-                                if (rawBv) {
-                                    let parsed = parseInt(parseFloat(rawBv));
-                                    if (!isNaN(parsed)) bv = String(parsed);
-                                }
-                            }
-                            
-                            if (pv === "0" || bv === "0") {
-                               let statusText = product.innerText;
-                               if (pv === "0") {
-                                   let match = statusText.match(pvRegex);
-                                   if (match) pv = match[1].replace(/,/g, "");
-                               }
-                               if (bv === "0") {
-                                   let match = statusText.match(bvRegex);
-                                   if (match) bv = match[1].replace(/,/g, "");
-                               }
-                            }
-
-                            // Image
-                            let imgEl = product.querySelector("img");
-                            let imgSrc = imgEl ? imgEl.getAttribute("src") : "";
-                            if (imgSrc && imgSrc.startsWith("/")) {
-                                imgSrc = "https://www.amway.co.kr" + imgSrc;
-                            }
-
-                            if (!results[productId]) {
-                                results[productId] = {
-                                    "id": productId,
-                                    "name": name,
-                                    "price": price,
-                                    "status": "진행중",
-                                    "link": full_p_url,
-                                    "image": imgSrc,
-                                    "category": "이벤트",
-                                    "sub_category": "",
-                                    "pv": pv,
-                                    "bv": bv
-                                };
-                            }
-                        } catch(e) {}
-                    });
-                } else {
-                    // Fallback: Link-only check
-                    const shopLinks = document.querySelectorAll("a[href*='/shop/']");
-                    shopLinks.forEach(sl => {
-                        try {
-                            let href = sl.getAttribute("href");
-                            if (href.includes("/shop/c/")) return;
-
-                            // Check if it looks like a product link (has /p/ or ends in digits)
-                            let parts = href.split('/');
-                            let lastPart = parts[parts.length - 1];
-                            if (!href.includes("/p/") && isNaN(lastPart)) return;
-
-                            let fullPUrl = href.startsWith("/") ? "https://www.amway.co.kr" + href : href;
-                            let productId = fullPUrl.split('/').pop();
-
-                            let name = sl.innerText.trim();
-                            if (!name) {
-                                let img = sl.querySelector("img");
-                                if (img) name = img.getAttribute("alt") || "이벤트 상품";
-                            }
-                            if (!name) name = "이벤트 상품";
-
-                            if (!results[productId]) {
-                                results[productId] = {
-                                    "id": productId,
-                                    "name": name,
-                                    "price": "0",
-                                    "status": "진행중",
-                                    "link": fullPUrl,
-                                    "image": "",
-                                    "category": "이벤트",
-                                    "sub_category": "",
-                                    "pv": "0",
-                                    "bv": "0"
-                                };
-                            }
-                        } catch(e) {}
-                    });
-                }
-                return results;
-            }""")
+            with TRACER.span("evaluate", what="extract_promotion"):
+                promo_data = await _extract(page, profile, "promotion", profile["base_url"])
 
         except Exception as e:
             print(f"    -> [Promo Error] {target_title}: {e}")
+            slot.fail()
         finally:
             await page.close()
             
         return promo_data
 
-async def crawl_promotions(page, context):
-    """
-    /notifications/promotion 페이지를 크롤링하여 이벤트 목록을 수집합니다.
-    """
-    print("Crawling Promotions (Optimized - Async)...")
+async def _discover_promotion_items(page, profile):
+    TRACER.track_page_bytes(page)
     try:
-        await page.goto("https://www.amway.co.kr/notifications/promotion", wait_until="networkidle", timeout=60000)
+        with TRACER.span("goto", url="/notifications/promotion"):
+            await page.goto(f"{profile['base_url']}/notifications/promotion", wait_until="networkidle", timeout=60000)
     except Exception as e:
         print(f"  Error loading promotion page: {e}")
-        return {}
+        return []
 
     # 스크롤
     try:
-        await page.mouse.wheel(0, 5000)
-        await asyncio.sleep(1)
+        with TRACER.span("scroll", iteration=0):
+            await page.mouse.wheel(0, 5000)
+            await asyncio.sleep(1)
     except: pass
 
-    promo_items = await page.evaluate(r"""() => {
-        const results = [];
-        const links = document.querySelectorAll('a');
-
-        links.forEach(link => {
-            const textRaw = link.innerText;
-            const text = textRaw ? textRaw.trim() : "";
-
-            if (!text || text.length < 5) return;
-            if (!text.includes("기간 :") && !text.includes("프로모션")) return;
-            if (text.includes("진행중인") || text.includes("종료된")) return;
-
-            const href = link.getAttribute('href');
-            const dataCode = link.getAttribute('data-code');
-            const noticeType = link.getAttribute('data-notice-type');
-
-            let targetUrl = null;
-            if (href && href !== "#" && !href.startsWith("javascript")) {
-                targetUrl = href;
-                if (targetUrl.startsWith("/")) {
-                    targetUrl = "https://www.amway.co.kr" + targetUrl;
-                }
-            } else if (dataCode && noticeType) {
-                targetUrl = `https://www.amway.co.kr/notifications/promotion/detail?notificationCode=${dataCode}&noticeType=${noticeType}&searchPromotionStatus=progress`;
-            }
+    with TRACER.span("evaluate", what="promotion_list"):
+        promo_items = await _extract(page, profile, "promotionList", profile["base_url"])
+    return promo_items
 
-            if (targetUrl) {
-                results.push({
-                    text: text.split('\n')[0].trim(),
-                    url: targetUrl
-                });
-            }
-        });
-        return results;
-    }""")
+async def crawl_promotions(session, http=None, pipeline=None, checkpoints=None, promo_cache=None, limiter=None,
+                           registry=None, profile=None):
+    """
+    /notifications/promotion 페이지를 크롤링하여 이벤트 목록을 수집합니다.
+    promo_cache: CrawlStore. 주어지면 목록의 제목/기간이 바뀌지 않은 프로모션은 캐시된 상품을 재사용합니다.
+    limiter: 카테고리 워커와 공유하는 AdaptiveLimiter (없으면 새로 만듦)
+    registry: 카테고리 결과와 공유하는 ProductRegistry (없으면 프로모션끼리만 중복 제거)
+    profile: 사이트 프로필 (site_profiles.get_profile, 기본값은 CRAWL_SITE)
+    """
+    profile = profile or get_profile()
+    print("Crawling Promotions (Optimized - Async)...")
+    with TRACER.span("crawl_promotions") as span_args:
+        combined_data = await _crawl_promotions(session, http, pipeline, checkpoints, promo_cache, limiter, registry,
+                                                profile)
+        span_args["products"] = len(combined_data)
+    return combined_data
+
+async def _load_promotion_items(session, http, checkpoints, profile):
+    """프로모션 목록 (이어하기면 저장된 목록, 아니면 HTTP -> 브라우저 순으로 발견)"""
+    promo_items = checkpoints.get("promotion_list") if checkpoints else None
+    if promo_items is not None:
+        print("  (이어하기) 저장된 프로모션 목록을 사용합니다.")
+    elif http:
+        with TRACER.span("http_fetch_promotion_list"):
+            promo_items = await http.fetch_promotion_list()
+    if promo_items is None and session is not None:
+        page = await session.new_page()
+        try:
+            promo_items = await _discover_promotion_items(page, profile)
+        finally:
+            await page.close()
+    promo_items = promo_items or []
+    if promo_items and checkpoints and checkpoints.get("promotion_list") is None:
+        await checkpoints.save("promotion_list", "promotion_list", promo_items)
+    return promo_items
+
+async def _crawl_promotions(session, http, pipeline, checkpoints, promo_cache, limiter, registry, profile):
+    promo_items = await _load_promotion_items(session, http, checkpoints, profile)
 
     print(f"  총 {len(promo_items)}개의 유효한 프로모션 항목을 발견했습니다. (Concurrent Processing Start)")
 
     # Concurrent Processing
-    sem = asyncio.Semaphore(5) # Limit concurrency
-    tasks = [process_promotion_item(context, item, sem) for item in promo_items]
+    if limiter is None:
+        limiter = AdaptiveLimiter(initial=5) # Limit concurrency (adaptive)
+    if registry is None:
+        registry = ProductRegistry(profile)
+    stats = {"cache_hits": 0}
+    tasks = [
+        process_promotion_item(session, item, limiter, http, pipeline, registry, checkpoints, promo_cache, stats,
+                               profile)
+        for item in promo_items
+    ]
 
     # Gather results
     results = await asyncio.gather(*tasks)
@@ -472,70 +830,334 @@ async def crawl_promotions(page, context):
     for r in results:
         combined_data.update(r)
 
+    if promo_cache:
+        print(f"  프로모션 캐시 재사용: {stats['cache_hits']}/{len(promo_items)}건")
     print(f"  Found {len(combined_data)} products in promotions.")
     return combined_data
 
-async def run_full_crawl(data_callback=None):
-    print(f"[{datetime.datetime.now()}] Starting Amway Smart Crawler (Async)...")
-    
-    current_data = {}
-    save_lock = asyncio.Lock()
+class _ShardOutput:
+    """워커 프로세스의 print 출력을 줄 단위로 코디네이터에 전달 (run_all.py의 로그 파일에 함께 남도록)"""
+    def __init__(self, result_queue, shard_id):
+        self.result_queue = result_queue
+        self.prefix = f"[shard {shard_id}] "
+        self._buffer = ""
+
+    def write(self, message):
+        self._buffer += message
+        while "\n" in self._buffer:
+            line, self._buffer = self._buffer.split("\n", 1)
+            self.result_queue.put(("log", None, self.prefix + line))
+
+    def flush(self):
+        pass
+
+def _split_shards(units, shards):
+    """작업 단위를 라운드 로빈으로 나눔 (앞쪽의 큰 카테고리들이 한 샤드에 몰리지 않도록)"""
+    return [units[i::shards] for i in range(shards) if units[i::shards]]
+
+def _shard_worker(shard_id, units, profile, engine, result_queue):
+    """
+    샤드 워커 프로세스 진입점: 자기 브라우저/HTTP 커넥션 풀/이벤트 루프로 units를 크롤링해
+    ("category" | "promotion", 단위, 상품 dict)를 result_queue로 보내고, 끝나면 ("done", shard_id, None)
+    """
+    sys.stdout = _ShardOutput(result_queue, shard_id)
+    try:
+        asyncio.run(_run_shard(shard_id, units, profile, engine, result_queue))
+    finally:
+        result_queue.put(("done", shard_id, None))
+
+async def _run_shard(shard_id, units, profile, engine, result_queue):
+    TRACER.reset()
+    session = BrowserSession(profile=profile) if engine != "http" else None
+    http = HttpCrawler(profile["base_url"], rules=profile["rules"]) if engine != "browser" else None
+    limiter = AdaptiveLimiter(initial=3)
+
+    async def run_unit(kind, unit):
+        try:
+            if kind == "category":
+                products = await fetch_category_products(session, http, unit, limiter, profile)
+            else:
+                products = await _process_promotion_item(session, unit, limiter, http, profile)
+        except Exception as e:
+            print(f"  !!! {unit.get('name') or unit.get('text')} 크롤링 실패: {e}")
+            products = None
+        result_queue.put((kind, unit, products or {}))
+
+    try:
+        if http:
+            await http.__aenter__()
+        await asyncio.gather(*[run_unit(kind, unit) for kind, unit in units])
+        limiter.report()
+        if http:
+            http.report()
+    finally:
+        if http:
+            await http.close()
+        if session:
+            await session.close()
+        TRACER.save(prefix=f"crawl_{profile['code']}_shard{shard_id}")
+
+async def _crawl_sharded(cats, shards, engine, session, http, pipeline, checkpoints, promo_cache, registry, profile):
+    """
+    코디네이터: 체크포인트/프로모션 캐시로 끝낼 수 있는 단위는 여기서 바로 처리하고,
+    나머지 카테고리/프로모션만 shards개 워커 프로세스에 나눠 맡긴 뒤 결과를 레지스트리 -> 저장 단계 하나로 모음.
+    상태 저장소(체크포인트, 캐시, 상품)는 이 프로세스만 씁니다.
+    프로모션 결과는 단일 프로세스 경로와 같은 순서가 되도록 카테고리를 모두 합친 뒤에 전달합니다.
+    (먼저 전달하면 같은 상품이 '이벤트/진행중'으로 저장됐다가 카테고리 값으로 덮어써져 거짓 상태 변경이 남음)
+    워커가 비정상 종료하면 RuntimeError - 실행은 완료 처리되지 않습니다.
+    """
+    pending = []
+    for cat in cats:
+        cat_products = checkpoints.get(f"category:{cat['url']}")
+        if cat_products is not None:
+            print(f"  (이어하기) {cat['name']}: 저장된 {len(cat_products)}개 상품 재생")
+            await pipeline.emit(registry.merge(cat_products), cat['name'])
+        else:
+            pending.append(("category", cat))
+
+    promo_items = await _load_promotion_items(session, http, checkpoints, profile)
+    print(f"  총 {len(promo_items)}개의 유효한 프로모션 항목을 발견했습니다.")
+    cache_hits = 0
+    # 프로모션 목록 순서대로 [(항목, 상품 dict 또는 None)] - None은 워커가 채움
+    promo_results = []
+    for item in promo_items:
+        promo_data = checkpoints.get(f"promotion:{item['url']}")
+        if promo_data is None and promo_cache:
+            promo_data = await _load_cached_promotion(promo_cache, item)
+            cache_hits += promo_data is not None
+        if promo_data is None:
+            pending.append(("promotion", item))
+        promo_results.append([item, promo_data])
+    if promo_cache:
+        print(f"  프로모션 캐시 재사용: {cache_hits}/{len(promo_items)}건")
+
+    shard_units = _split_shards(pending, shards)
+    if shard_units:
+        await _run_shard_workers(shard_units, len(pending), engine, pipeline, checkpoints, promo_cache, registry,
+                                 profile, promo_results)
+
+    for item, promo_data in promo_results:
+        if promo_data:
+            await _commit_promotion(item, promo_data, pipeline, registry, checkpoints)
+
+async def _run_shard_workers(shard_units, unit_count, engine, pipeline, checkpoints, promo_cache, registry, profile,
+                             promo_results):
+    """워커 프로세스를 띄우고 결과를 받음. 카테고리는 바로 전달, 프로모션은 promo_results에 채워 둠"""
+    pending_promos = {entry[0]["url"]: entry for entry in promo_results}
+    print(f"  남은 {unit_count}개 단위를 워커 프로세스 {len(shard_units)}개로 나눠 크롤링합니다.")
+
+    # Playwright/asyncio 상태를 공유하지 않도록 fork 대신 spawn
+    ctx = multiprocessing.get_context("spawn")
+    result_queue = ctx.Queue()
+    workers = [
+        ctx.Process(target=_shard_worker, args=(i, units, profile, engine, result_queue), name=f"crawl-shard-{i}")
+        for i, units in enumerate(shard_units)
+    ]
+    for w in workers:
+        w.start()
+
     loop = asyncio.get_running_loop()
+    finished = 0
+    crawled_units = 0
+    while finished < len(workers):
+        try:
+            kind, unit, payload = await loop.run_in_executor(None, result_queue.get, True, 1.0)
+        except queue.Empty:
+            # 'done'을 보내지 못하고 죽은 워커가 있어도 끝까지 기다리지 않음
+            if any(w.is_alive() for w in workers) or not result_queue.empty():
+                continue
+            break
+
+        if kind == "log":
+            print(payload)
+            continue
+        if kind == "done":
+            finished += 1
+            continue
+        crawled_units += 1
+        if not payload:
+            continue
+        if kind == "category":
+            await _commit_category(unit, payload, pipeline, registry, checkpoints)
+        else:
+            if promo_cache:
+                await _save_cached_promotion(promo_cache, unit, payload)
+            pending_promos[unit["url"]][1] = payload
+
+    for w in workers:
+        await loop.run_in_executor(None, w.join)
+    failed = [w.name for w in workers if w.exitcode != 0]
+    if failed or finished < len(workers) or crawled_units < unit_count:
+        # 끝난 프로모션은 체크포인트로만 남겨 --resume 때 다시 크롤링하지 않음 (전달은 이어서 실행할 때 카테고리 뒤에)
+        for item, promo_data in promo_results:
+            if promo_data and checkpoints.get(f"promotion:{item['url']}") is None:
+                await checkpoints.save(f"promotion:{item['url']}", "promotion", promo_data)
+        # 실행을 완료 처리하지 않고 예외로 끝냄: 체크포인트가 남아 --resume 으로 이어갈 수 있고,
+        # 호출하는 쪽(run_all.py/daemon.py)도 시트 잔여 행 정리와 변경 내역 기록을 건너뜀
+        raise RuntimeError(
+            f"비정상 종료한 워커: {', '.join(failed) or '없음'}, 완료 보고 {finished}/{len(workers)}, "
+            f"끝난 단위 {crawled_units}/{unit_count} (끝나지 않은 단위는 --resume 으로 이어서 크롤링)")
+
+
+async def run_full_crawl(data_callback=None, store=None, resume=False, har_mode=None, har_path=None,
+                         session=None, http=None, profile=None, shards=None):
+    """
+    resume=True: 직전 실행이 중간에 끝났다면 같은 실행을 이어서 진행합니다.
+    완료된 카테고리/프로모션은 다시 크롤링하지 않고 저장된 결과를 data_callback으로 재생합니다.
+    har_mode: "record" | "replay" (기본값은 CRAWL_HAR_MODE). 두 모드 모두 실제 상태 저장소 대신 메모리 저장소를 사용하고
+    카테고리 캐시/프로모션 캐시/이어하기를 끄므로, 기록 때 모든 페이지가 아카이브에 남고
+    같은 아카이브로 몇 번을 돌려도 같은 작업량이 재현됩니다.
+    session / http: 이미 실행 중인 BrowserSession / 열린 HttpCrawler (daemon.py처럼 여러 번 실행하며 재사용할 때).
+    넘겨받은 것은 끝나도 닫지 않습니다.
+    profile: 사이트 프로필 (site_profiles.get_profile, 기본값은 CRAWL_SITE). 기본 URL/카테고리/추출 규칙/가격 표기/저장소를 정합니다.
+    shards: 워커 프로세스 수 (기본값은 CRAWL_SHARDS). 2 이상이면 카테고리/프로모션 발견까지만 이 프로세스에서 하고,
+    크롤링은 각자 브라우저를 띄운 워커 프로세스들이 나눠 맡습니다. HAR 기록/재생 중에는 사용하지 않습니다.
+    """
+    profile = profile or get_profile()
+    har_mode = har_mode if har_mode is not None else CRAWL_HAR_MODE
+    har_path = har_path or CRAWL_HAR_PATH
+    engine = "browser" if har_mode in ("record", "replay") else CRAWL_ENGINE
+    har = har_mode in ("record", "replay")
+    shards = shards if shards is not None else CRAWL_SHARDS
+    if shards > 1 and har_mode in ("record", "replay"):
+        # 아카이브 하나를 여러 브라우저가 동시에 기록/재생할 수 없음
+        print("  (HAR 기록/재생 중에는 샤드 크롤링을 사용하지 않습니다.)")
+        shards = 1
+
+    print(f"[{datetime.datetime.now()}] Starting Amway Smart Crawler "
+          f"(Async, site={profile['code']}, engine={engine}, shards={shards})...")
+    started = time.time()
+    
+    # 카테고리/프로모션 간 중복 상품을 id 기준으로 합쳐, 저장 단계에는 한 번(또는 변경 시 갱신)만 전달
+    # 추출 결과 dict는 여기서 Product로 바뀜 (가격/PV/BV/판매 상태를 사이트와 무관한 형식으로 한 번만 변환)
+    registry = ProductRegistry(profile)
+    TRACER.reset()
+
+    # HAR 기록/재생은 저장된 캐시/체크포인트 때문에 요청이 빠지지 않도록 항상 빈 메모리 저장소 사용
+    own_store = store is None or har
+    if own_store:
+        store = CrawlStore(":memory:") if har else CrawlStore(profile["store_file"])
+    if profile.get("legacy_json_file"):
+        store.import_json(profile["legacy_json_file"])
+
+    run_id = store.resumable_run() if resume and not har else None
+    if run_id is not None:
+        checkpoints = RunCheckpoints(store, run_id, store.load_checkpoints(run_id))
+        print(f"  -> 중단된 실행 #{run_id}을 이어서 진행합니다. (완료된 단위 {len(checkpoints.completed)}개)")
+    else:
+        if resume:
+            print("  -> 이어서 진행할 중단된 실행이 없습니다. 새로 시작합니다.")
+        run_id = store.begin_run()
+        checkpoints = RunCheckpoints(store, run_id)
+
+    def sink(batch):
+        # batch: { id: Product }
+        # 1) 상태 저장소에 즉시 upsert (중간에 죽어도 여기까지는 남음) 2) 시트 동기화
+        store.upsert_products(run_id, batch)
+        if data_callback:
+            data_callback(batch)
+
+    # session이 None이면 브라우저 폴백 없음 (http 전용)
+    own_session = session is None
+    if own_session:
+        session = BrowserSession(har_mode, har_path, profile) if engine != "http" else None
+    elif engine == "http":
+        session = None
+    own_http = http is None
+    if own_http:
+        http = HttpCrawler(profile["base_url"], rules=profile["rules"]) if engine != "browser" else None
+    elif engine == "browser":
+        http = None
+    # 추출된 상품 묶음을 제한 크기 큐로 시트 저장 단계에 스트리밍
+    pipeline = ProductPipeline(sink)
+    pipeline.start()
+
+    try:
+        if http and own_http:
+            await http.__aenter__()
 
-    async with async_playwright() as p:
-        print("  -> 브라우저를 실행 중입니다... (잠시만 기다려주세요)")
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context()
-        page = await context.new_page()
-        
         # 1. 카테고리 탭 발견
-        cats = await discover_category_tabs(page)
+        cats = checkpoints.get("discovery")
+        if cats:
+            print(f"  (이어하기) 저장된 카테고리 {len(cats)}개를 사용합니다.")
+        else:
+            cats = await discover_categories(store, session, http, profile, use_cache=not har)
+        if cats and checkpoints.get("discovery") is None:
+            await checkpoints.save("discovery", "discovery", cats)
         
         if not cats:
             print("카테고리를 찾지 못했습니다. 기본 URL로 시도합니다.")
-            cats = [{"name": "전체상품", "url": "https://www.amway.co.kr/shop/c/shop"}]
+            cats = [{"name": profile["fallback_category"], "url": f"{profile['base_url']}/shop/c/shop"}]
 
         # 2. 각 카테고리 크롤링 (Concurrent Categories)
-        cat_sem = asyncio.Semaphore(3) # Max 3 concurrent categories
+        # 페이지 로딩 속도/오류율에 따라 동시 실행 수를 조절 (카테고리와 프로모션이 공유)
+        limiter = AdaptiveLimiter(initial=3)
+
+        promo_cache = store if PROMO_CACHE_ENABLED and not har else None
 
         async def process_category(cat):
-            async with cat_sem:
-                # Use a new page for each category to ensure isolation
-                cat_page = await context.new_page()
-                try:
-                    cat_products = await crawl_category(cat_page, cat)
-                    if cat_products:
-                        if data_callback:
-                            async with save_lock:
-                                print(f"  >> Sending {len(cat_products)} items to sync ({cat['name']})...")
-                                # Run sync callback in executor
-                                await loop.run_in_executor(None, data_callback, cat_products)
-                        return cat_products
-                    return {}
-                finally:
-                    await cat_page.close()
-
-        cat_tasks = [process_category(cat) for cat in cats]
-        cat_results = await asyncio.gather(*cat_tasks)
-
-        for r in cat_results:
-            current_data.update(r)
-
-        # 3. 프로모션 크롤링
-        # Use existing page (it's idle now) or create new one. We can pass context.
-        promo_products = await crawl_promotions(page, context)
-        if promo_products:
-            current_data.update(promo_products)
-            if data_callback:
-                async with save_lock:
-                    print(f"  >> Sending {len(promo_products)} promotions to sync...")
-                    await loop.run_in_executor(None, data_callback, promo_products)
-            
-        await browser.close()
+            cat_products = checkpoints.get(f"category:{cat['url']}")
+            if cat_products is not None:
+                print(f"  (이어하기) {cat['name']}: 저장된 {len(cat_products)}개 상품 재생")
+                await pipeline.emit(registry.merge(cat_products), cat['name'])
+                return cat_products
+
+            cat_products = await fetch_category_products(session, http, cat, limiter, profile)
+            # 세마포어를 놓은 뒤 큐에 넣어, 저장 대기 중에도 다음 카테고리 브라우징이 진행되도록 함
+            if cat_products:
+                await _commit_category(cat, cat_products, pipeline, registry, checkpoints)
+                return cat_products
+            return {}
 
-    print(f"Total products scraped: {len(current_data)}")
-    await save_current_state(current_data)
+        if shards > 1:
+            # 2~3. 카테고리/프로모션을 워커 프로세스들에 나눠 크롤링
+            await _crawl_sharded(cats, shards, engine, session, http, pipeline, checkpoints, promo_cache,
+                                 registry, profile)
+        else:
+            cat_tasks = [process_category(cat) for cat in cats]
+            await asyncio.gather(*cat_tasks)
+
+            # 3. 프로모션 크롤링
+            await crawl_promotions(
+                session, http, pipeline, checkpoints, promo_cache=promo_cache,
+                limiter=limiter, registry=registry, profile=profile
+            )
+            limiter.report()
+        registry.report()
+
+        if http:
+            http.report()
+    finally:
+        if http and own_http:
+            await http.close()
+        if session and own_session:
+            await session.close()
+        elif session:
+            # 넘겨받은 세션은 닫지 않으므로 이번 실행의 통계만 출력하고 초기화
+            session.report(reset=True)
+        # 큐에 남은 묶음까지 모두 저장
+        await pipeline.close()
+        TRACER.save(prefix=f"crawl_{profile['code']}")
+
+    current_data = registry.products
+    print(f"Total products scraped: {len(current_data)} ({time.time() - started:.1f}초)")
+    await save_current_state(store, run_id)
+    if own_store:
+        store.close()
     return current_data
 
 if __name__ == "__main__":
-    asyncio.run(run_full_crawl())
+    import argparse
+    parser = argparse.ArgumentParser(description='Amway Full Crawler')
+    parser.add_argument('--resume', action='store_true', help='중단된 직전 실행을 이어서 진행')
+    parser.add_argument('--record-har', metavar='PATH', help='크롤링 중 모든 요청/응답을 HAR 아카이브로 기록')
+    parser.add_argument('--replay-har', metavar='PATH', help='네트워크 없이 HAR 아카이브로만 크롤링 (벤치마크용)')
+    parser.add_argument('--shards', type=int, help=f'워커 프로세스 수 (기본값: CRAWL_SHARDS={CRAWL_SHARDS})')
+    args = parser.parse_args()
+
+    har_mode, har_path = None, None
+    if args.record_har:
+        har_mode, har_path = "record", args.record_har
+    elif args.replay_har:
+        har_mode, har_path = "replay", args.replay_har
+    asyncio.run(run_full_crawl(resume=args.resume, har_mode=har_mode, har_path=har_path, shards=args.shards))
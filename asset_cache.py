@@ -0,0 +1,256 @@
+"""
+브라우저 정적 리소스(JS 번들, CSS, 스프라이트/폰트)를 실행 간에 재사용하는 디스크 캐시.
+
+browser.new_context()는 매번 빈 캐시로 시작하므로, 렌더링이 필요한 실행마다 같은 파일을 다시 받습니다.
+AssetCache를 컨텍스트 라우트로 설치하면
+- 신선한(Cache-Control max-age 이내) 항목은 네트워크 없이 디스크에서 바로 응답하고
+- 만료된 항목은 ETag/Last-Modified로 조건부 요청을 보내 304면 디스크 내용을 그대로 사용하며
+- 새로 받은 응답은 내용 해시(sha256) 파일로 저장합니다. (같은 내용은 URL이 달라도 한 번만 저장)
+
+전체 크기가 ASSET_CACHE_MAX_MB를 넘으면 (새 항목을 저장한 직후) 가장 오래 사용하지 않은 항목부터 지웁니다(LRU).
+daemon.py처럼 브라우저를 닫지 않고 계속 쓰는 경우에도 최대 크기가 지켜집니다.
+색인은 SQLite(WAL)라 샤드 워커 프로세스들이 같은 캐시를 함께 써도 됩니다.
+"""
+import email.utils
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+ASSET_CACHE_ENABLED = os.environ.get("ASSET_CACHE", "1") != "0"
+ASSET_CACHE_DIR = os.environ.get("ASSET_CACHE_DIR", os.path.join("cache", "assets"))
+ASSET_CACHE_MAX_MB = float(os.environ.get("ASSET_CACHE_MAX_MB", "200"))
+
+# 캐시 대상 resource_type (문서/XHR 응답은 매번 달라지므로 제외)
+CACHEABLE_TYPES = ("script", "stylesheet", "font", "image")
+# 본문은 디코딩된 상태로 저장하므로 전송 관련 헤더는 다시 내보내지 않음
+DROPPED_HEADERS = ("content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie")
+# max-age가 없고 Last-Modified만 있을 때: 마지막 수정 후 경과 시간의 10%를 신선 기간으로 (최대 1일)
+HEURISTIC_FRESHNESS_RATIO = 0.1
+HEURISTIC_FRESHNESS_MAX = 86400
+# 실행 중 최대 크기를 넘으면 이 비율까지 줄임 (저장할 때마다 한 개씩 지우지 않도록)
+EVICT_TARGET_RATIO = 0.9
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    url TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fresh_until REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_assets_last_used ON assets(last_used);
+CREATE INDEX IF NOT EXISTS idx_assets_digest ON assets(digest);
+"""
+
+
+def freshness_lifetime(headers, now=None):
+    """응답 헤더 -> 신선 기간(초). no-store면 None (저장하지 않음)"""
+    now = now or time.time()
+    cache_control = headers.get("cache-control", "").lower()
+    if "no-store" in cache_control:
+        return None
+    if "no-cache" in cache_control:
+        return 0
+    m = _MAX_AGE.search(cache_control)
+    if m:
+        return int(m.group(1))
+    last_modified = headers.get("last-modified")
+    if last_modified:
+        try:
+            modified = email.utils.parsedate_to_datetime(last_modified).timestamp()
+        except (TypeError, ValueError):
+            return 0
+        return min(max(now - modified, 0) * HEURISTIC_FRESHNESS_RATIO, HEURISTIC_FRESHNESS_MAX)
+    return 0
+
+
+class AssetCache:
+    def __init__(self, directory=ASSET_CACHE_DIR, max_bytes=int(ASSET_CACHE_MAX_MB * 1024 * 1024)):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(directory, "index.db"), check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        # 디스크 사용량 추정치 (처음 저장할 때 계산, 새 파일을 쓸 때마다 더함)
+        self._size = None
+
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.bytes_fetched = 0
+
+    async def install(self, context):
+        await context.route("**/*", self.handle)
+
+    # --- 저장소 ---
+
+    def _object_path(self, digest):
+        return os.path.join(self.directory, "objects", digest[:2], digest)
+
+    def _lookup(self, url):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT digest, size, status, headers, etag, last_modified, fresh_until FROM assets WHERE url = ?",
+                (url,)).fetchone()
+        if row is None:
+            return None
+        entry = dict(zip(("digest", "size", "status", "headers", "etag", "last_modified", "fresh_until"), row))
+        try:
+            with open(self._object_path(entry["digest"]), "rb") as f:
+                entry["body"] = f.read()
+        except OSError:
+            # 다른 프로세스가 정리한 경우 등: 없는 것으로 처리
+            return None
+        entry["headers"] = json.loads(entry["headers"])
+        return entry
+
+    def _touch(self, url, fresh_until=None):
+        with self._lock, self.conn:
+            if fresh_until is None:
+                self.conn.execute("UPDATE assets SET last_used = ? WHERE url = ?", (time.time(), url))
+            else:
+                self.conn.execute("UPDATE assets SET last_used = ?, fresh_until = ? WHERE url = ?",
+                                  (time.time(), fresh_until, url))
+
+    def _store(self, url, status, headers, body, lifetime):
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+        if self._size is None:
+            self._size = self.total_bytes()
+        if not os.path.exists(path):
+            self._size += len(body)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # 임시 파일에 쓴 뒤 교체 (다른 프로세스가 반쯤 쓴 파일을 읽지 않도록)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+
+        now = time.time()
+        kept = {k: v for k, v in headers.items() if k.lower() not in DROPPED_HEADERS}
+        with self._lock, self.conn:
+            self.conn.execute("""
+                INSERT OR REPLACE INTO assets
+                    (url, digest, size, status, headers, etag, last_modified, fresh_until, last_used)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (url, digest, len(body), status, json.dumps(kept), headers.get("etag"),
+                  headers.get("last-modified"), now + lifetime, now))
+
+        if self._size > self.max_bytes:
+            removed = self.evict(int(self.max_bytes * EVICT_TARGET_RATIO))
+            if removed:
+                print(f"  [리소스 캐시] 용량 초과로 {removed}개 항목 정리")
+            self._size = self.total_bytes()
+
+    def total_bytes(self):
+        """디스크에 저장된 내용 크기 합계 (같은 내용은 한 번만)"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM (SELECT size FROM assets GROUP BY digest)").fetchone()
+        return row[0]
+
+    def evict(self, target=None):
+        """최대 크기를 넘으면 target(기본: 최대 크기) 이하가 될 때까지 가장 오래 사용하지 않은 항목부터 삭제. 삭제한 항목 수 반환"""
+        target = self.max_bytes if target is None else target
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return 0
+
+        removed = 0
+        with self._lock:
+            rows = self.conn.execute("SELECT url, digest, size FROM assets ORDER BY last_used").fetchall()
+            for url, digest, size in rows:
+                if total <= target:
+                    break
+                with self.conn:
+                    self.conn.execute("DELETE FROM assets WHERE url = ?", (url,))
+                    still_used = self.conn.execute(
+                        "SELECT 1 FROM assets WHERE digest = ? LIMIT 1", (digest,)).fetchone()
+                removed += 1
+                if not still_used:
+                    total -= size
+                    try:
+                        os.remove(self._object_path(digest))
+                    except OSError:
+                        pass
+        return removed
+
+    def close(self):
+        removed = self.evict()
+        if removed:
+            print(f"  [리소스 캐시] 용량 초과로 {removed}개 항목 정리")
+        with self._lock:
+            self.conn.close()
+
+    # --- 라우트 핸들러 ---
+
+    async def handle(self, route):
+        request = route.request
+        if request.method != "GET" or request.resource_type not in CACHEABLE_TYPES:
+            await route.fallback()
+            return
+
+        url = request.url
+        try:
+            entry = self._lookup(url)
+            if entry is not None and entry["fresh_until"] > time.time():
+                self.hits += 1
+                self.bytes_saved += entry["size"]
+                self._touch(url)
+                await route.fulfill(status=entry["status"], headers=entry["headers"], body=entry["body"])
+                return
+
+            headers = dict(request.headers)
+            if entry is not None:
+                if entry["etag"]:
+                    headers["if-none-match"] = entry["etag"]
+                if entry["last_modified"]:
+                    headers["if-modified-since"] = entry["last_modified"]
+            response = await route.fetch(headers=headers)
+
+            if response.status == 304 and entry is not None:
+                # 변경 없음: 본문은 디스크 것을 사용하고 신선 기간만 갱신
+                self.revalidated += 1
+                self.bytes_saved += entry["size"]
+                lifetime = freshness_lifetime(response.headers)
+                self._touch(url, time.time() + (lifetime or 0))
+                await route.fulfill(status=entry["status"], headers=entry["headers"], body=entry["body"])
+                return
+
+            body = await response.body()
+            self.misses += 1
+            self.bytes_fetched += len(body)
+            lifetime = freshness_lifetime(response.headers)
+            if response.status == 200 and lifetime is not None:
+                self._store(url, response.status, response.headers, body, lifetime)
+            await route.fulfill(response=response, body=body)
+        except Exception:
+            # 페이지가 이미 닫혔거나 캐시 파일 문제: 캐시 없이 진행 (이미 응답했다면 무시됨)
+            try:
+                await route.fallback()
+            except Exception:
+                pass
+
+    def report(self):
+        print("  [리소스 캐시]")
+        print(f"    - 적중 {self.hits} / 재검증(304) {self.revalidated} / 새로 받음 {self.misses}")
+        print(f"    - 절약 {self.bytes_saved / 1024 / 1024:.1f}MB / 다운로드 {self.bytes_fetched / 1024 / 1024:.1f}MB "
+              f"(캐시 크기 {self.total_bytes() / 1024 / 1024:.1f}MB / 최대 {self.max_bytes / 1024 / 1024:.0f}MB)")
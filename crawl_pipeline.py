@@ -0,0 +1,73 @@
+"""
+크롤러(생산자) -> 제한 크기 asyncio.Queue -> 시트 저장(소비자) 스트리밍 파이프라인.
+
+카테고리/프로모션 워커는 추출한 상품 묶음을 emit()으로 큐에 넣고 바로 다음 페이지 작업으로 넘어갑니다.
+전용 writer 태스크 하나가 큐를 비우며 sink(SheetManager.append_data 등)를 executor 스레드에서 호출하므로
+시트 I/O가 브라우징과 겹쳐서 진행됩니다. 큐가 가득 차면 emit()이 대기하여 자연스럽게 속도가 조절됩니다(backpressure).
+"""
+import asyncio
+import os
+
+# 큐에 쌓아둘 수 있는 최대 묶음 수 (가득 차면 크롤러가 대기)
+PIPELINE_QUEUE_SIZE = int(os.environ.get("PIPELINE_QUEUE_SIZE", "4"))
+
+_STOP = object()
+
+
+class ProductPipeline:
+    def __init__(self, sink, maxsize=PIPELINE_QUEUE_SIZE):
+        """
+        sink: 상품 dict({id: {...}})를 받는 동기 함수. None이면 emit()은 아무것도 하지 않습니다.
+        """
+        self.sink = sink
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self._writer = None
+        self.stats = {"batches": 0, "items": 0, "errors": 0, "max_backlog": 0}
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def start(self):
+        if self.sink and self._writer is None:
+            self._writer = asyncio.create_task(self._run())
+
+    async def emit(self, batch, label=""):
+        """상품 묶음을 큐에 넣습니다. 큐가 가득 차 있으면 writer가 소비할 때까지 대기합니다."""
+        if not batch or not self.sink:
+            return
+        await self.queue.put((label, batch))
+        self.stats["max_backlog"] = max(self.stats["max_backlog"], self.queue.qsize())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self.queue.get()
+            try:
+                if item is _STOP:
+                    break
+                label, batch = item
+                print(f"  >> Sending {len(batch)} items to sync ({label})...")
+                try:
+                    await loop.run_in_executor(None, self.sink, batch)
+                    self.stats["batches"] += 1
+                    self.stats["items"] += len(batch)
+                except Exception as e:
+                    # writer가 죽으면 생산자가 가득 찬 큐에서 영원히 대기하므로 기록만 하고 계속 진행
+                    self.stats["errors"] += 1
+                    print(f"  !!! 저장 단계 오류 ({label}): {e}")
+            finally:
+                self.queue.task_done()
+
+    async def close(self):
+        """남은 묶음을 모두 저장한 뒤 writer를 종료합니다."""
+        if self._writer is None:
+            return
+        await self.queue.put(_STOP)
+        await self._writer
+        self._writer = None
+        print(f"  [파이프라인] 저장 {self.stats['batches']}회 / {self.stats['items']}개 "
+              f"(최대 대기 {self.stats['max_backlog']}묶음, 오류 {self.stats['errors']}회)")
@@ -0,0 +1,480 @@
+"""
+크롤링 결과를 저장하는 SQLite 상태 저장소 (기존 amway_products_full.json 전체 덤프 대체).
+
+- products: 상품 id 기준 최신 상태 (upsert)
+- product_history: 가격/PV/BV/상태/이름이 바뀔 때마다 한 줄씩 쌓이는 변경 이력
+- runs: 실행 단위 기록 (시작/종료 시각, 상품 수)
+- run_products: 실행마다 발견한 상품과 그 실행의 최종 값 (실행 간 신규/삭제/변경 비교용, 최근 완료 실행 2개만 보관)
+- checkpoints: 실행 중 완료된 카테고리/프로모션 단위의 결과 (--resume 시 재생)
+- promotion_cache: 실행 간 프로모션 상세 결과 캐시 (notificationCode/URL + 목록 문구 기준)
+- category_cache: 실행 간 카테고리 탭 -> URL 목록 캐시 (사이트 기본 URL + 카테고리 이름 목록 기준)
+
+크롤링 중에 묶음 단위로 바로 upsert되며(WAL + 묶음별 트랜잭션), 중간에 죽어도 그때까지의 결과는 남습니다.
+"""
+import json
+import os
+import sqlite3
+import threading
+import datetime
+import hashlib
+from urllib.parse import urlparse, parse_qs
+
+from product import Product, to_products
+
+STORE_FILE = os.environ.get("CRAWL_STORE_FILE", "amway_crawl_state.db")
+LEGACY_JSON_FILE = "amway_products_full.json"
+
+# 이력에서 변경 여부를 비교하는 필드
+TRACKED_FIELDS = ("name", "price", "pv", "bv", "status")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    product_count INTEGER DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS products (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    price INTEGER,
+    pv INTEGER,
+    bv INTEGER,
+    status TEXT,
+    category TEXT,
+    sub_category TEXT,
+    link TEXT,
+    image TEXT,
+    first_seen_run INTEGER,
+    last_seen_run INTEGER,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_products_last_seen ON products(last_seen_run);
+CREATE TABLE IF NOT EXISTS product_history (
+    product_id TEXT NOT NULL,
+    run_id INTEGER NOT NULL,
+    recorded_at TEXT NOT NULL,
+    name TEXT,
+    price INTEGER,
+    pv INTEGER,
+    bv INTEGER,
+    status TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_history_product ON product_history(product_id, run_id);
+CREATE INDEX IF NOT EXISTS idx_history_time ON product_history(recorded_at);
+CREATE TABLE IF NOT EXISTS run_products (
+    run_id INTEGER NOT NULL,
+    product_id TEXT NOT NULL,
+    name TEXT,
+    price INTEGER,
+    pv INTEGER,
+    bv INTEGER,
+    status TEXT,
+    PRIMARY KEY (run_id, product_id)
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    run_id INTEGER NOT NULL,
+    unit_key TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    completed_at TEXT NOT NULL,
+    PRIMARY KEY (run_id, unit_key)
+);
+CREATE TABLE IF NOT EXISTS promotion_cache (
+    promo_key TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    url TEXT,
+    title TEXT,
+    period TEXT,
+    products TEXT NOT NULL,
+    fetched_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS category_cache (
+    site_key TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    categories TEXT NOT NULL,
+    discovered_at TEXT NOT NULL
+);
+"""
+
+def _now():
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+
+def promotion_cache_key(url):
+    """프로모션 URL -> 캐시 키 (notificationCode가 있으면 그것, 없으면 URL)"""
+    code = parse_qs(urlparse(url).query).get("notificationCode")
+    return f"code:{code[0]}" if code else f"url:{url}"
+
+
+def promotion_fingerprint(item):
+    """목록에 보이는 제목/기간 문구가 같으면 같은 프로모션으로 판단"""
+    text = f"{item.get('text', '')}\n{item.get('period', '')}"
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def category_fingerprint(names):
+    """찾을 카테고리 이름 목록이 바뀌면 (사이트 프로필 수정) 캐시를 쓰지 않도록"""
+    return hashlib.sha1("\n".join(names).encode("utf-8")).hexdigest()
+
+
+class CrawlStore:
+    def __init__(self, path=STORE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        # executor 스레드(파이프라인 writer)에서도 사용하므로 스레드 검사를 끄고 락으로 보호
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    # --- 실행(run) 관리 ---
+
+    def begin_run(self):
+        with self._lock, self.conn:
+            cur = self.conn.execute("INSERT INTO runs (started_at) VALUES (?)", (_now(),))
+            return cur.lastrowid
+
+    def finish_run(self, run_id):
+        with self._lock, self.conn:
+            count = self.conn.execute(
+                "SELECT COUNT(*) FROM products WHERE last_seen_run = ?", (run_id,)
+            ).fetchone()[0]
+            self.conn.execute(
+                "UPDATE runs SET finished_at = ?, product_count = ? WHERE run_id = ?",
+                (_now(), count, run_id),
+            )
+            # 완료된 실행의 체크포인트는 더 이상 필요 없음
+            self.conn.execute("DELETE FROM checkpoints WHERE run_id = ?", (run_id,))
+            # 실행별 상품 목록은 이번 실행과 직전 완료 실행 것만 남김 (중단된 실행의 목록도 여기서 정리)
+            prev_id = self.conn.execute(
+                "SELECT MAX(run_id) FROM runs WHERE finished_at IS NOT NULL AND run_id < ?", (run_id,)
+            ).fetchone()[0]
+            self.conn.execute(
+                "DELETE FROM run_products WHERE run_id < ? AND run_id != ?", (run_id, prev_id or 0)
+            )
+        return count
+
+    def last_finished_run(self, before=None):
+        sql = "SELECT * FROM runs WHERE finished_at IS NOT NULL"
+        params = ()
+        if before is not None:
+            sql += " AND run_id < ?"
+            params = (before,)
+        sql += " ORDER BY run_id DESC LIMIT 1"
+        with self._lock:
+            row = self.conn.execute(sql, params).fetchone()
+        return dict(row) if row else None
+
+    def resumable_run(self):
+        """가장 최근 실행이 완료되지 않았다면 그 run_id, 아니면 None"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT run_id, finished_at FROM runs ORDER BY run_id DESC LIMIT 1"
+            ).fetchone()
+        if row and row["finished_at"] is None:
+            return row["run_id"]
+        return None
+
+    # --- 체크포인트 ---
+
+    def save_checkpoint(self, run_id, unit_key, kind, payload):
+        """단위 작업(category:<url>, promotion:<url>, discovery 등) 완료 기록. payload는 JSON 직렬화 가능해야 합니다."""
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (run_id, unit_key, kind, payload, completed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (run_id, unit_key, kind, json.dumps(payload, ensure_ascii=False), _now()),
+            )
+
+    def load_checkpoints(self, run_id):
+        """{ unit_key: payload }"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT unit_key, payload FROM checkpoints WHERE run_id = ?", (run_id,)
+            ).fetchall()
+        return {r["unit_key"]: json.loads(r["payload"]) for r in rows}
+
+    # --- 프로모션 캐시 ---
+
+    def get_cached_promotion(self, promo_key, fingerprint, max_age_seconds=None):
+        """fingerprint가 같고 max_age_seconds 이내에 수집된 캐시가 있으면 상품 dict, 아니면 None"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT fingerprint, products, fetched_at FROM promotion_cache WHERE promo_key = ?",
+                (promo_key,),
+            ).fetchone()
+        if not row or row["fingerprint"] != fingerprint:
+            return None
+        if max_age_seconds is not None:
+            age = datetime.datetime.now() - datetime.datetime.fromisoformat(row["fetched_at"])
+            if age.total_seconds() > max_age_seconds:
+                return None
+        return json.loads(row["products"])
+
+    def put_cached_promotion(self, promo_key, fingerprint, item, products):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO promotion_cache (promo_key, fingerprint, url, title, period, products, fetched_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (promo_key, fingerprint, item.get("url"), item.get("text"), item.get("period", ""),
+                 json.dumps(products, ensure_ascii=False), _now()),
+            )
+
+    def get_cached_categories(self, site_key, fingerprint, max_age_seconds=None):
+        """fingerprint가 같고 max_age_seconds 이내에 발견한 카테고리 목록이 있으면 [{name, url}], 아니면 None"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT fingerprint, categories, discovered_at FROM category_cache WHERE site_key = ?",
+                (site_key,),
+            ).fetchone()
+        if not row or row["fingerprint"] != fingerprint:
+            return None
+        if max_age_seconds is not None:
+            age = datetime.datetime.now() - datetime.datetime.fromisoformat(row["discovered_at"])
+            if age.total_seconds() > max_age_seconds:
+                return None
+        return json.loads(row["categories"])
+
+    def put_cached_categories(self, site_key, fingerprint, categories):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO category_cache (site_key, fingerprint, categories, discovered_at)"
+                " VALUES (?, ?, ?, ?)",
+                (site_key, fingerprint, json.dumps(categories, ensure_ascii=False), _now()),
+            )
+
+    # --- 쓰기 ---
+
+    def upsert_products(self, run_id, products):
+        """
+        products: { id: Product }
+        변경된 필드가 있으면 이력을 남기고 최신 상태를 갱신합니다. 묶음 하나가 하나의 트랜잭션입니다.
+        """
+        if not products:
+            return 0
+        now = _now()
+        changed = 0
+        with self._lock, self.conn:
+            for pid, item in products.items():
+                record = {f: getattr(item, f) for f in TRACKED_FIELDS}
+                prev = self.conn.execute(
+                    "SELECT name, price, pv, bv, status, category, last_seen_run FROM products WHERE id = ?", (pid,)
+                ).fetchone()
+
+                # 같은 실행에서 이미 일반 카테고리로 수집된 상품은 프로모션(이벤트) 항목으로 덮어쓰지 않음
+                if (prev is not None and prev["last_seen_run"] == run_id
+                        and item.category == "이벤트" and prev["category"] != "이벤트"):
+                    continue
+
+                if prev is None or any(prev[f] != record[f] for f in TRACKED_FIELDS):
+                    changed += 1
+                    self.conn.execute(
+                        "INSERT INTO product_history (product_id, run_id, recorded_at, name, price, pv, bv, status)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (pid, run_id, now, record["name"], record["price"], record["pv"], record["bv"], record["status"]),
+                    )
+
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO run_products (run_id, product_id, name, price, pv, bv, status)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (run_id, pid, record["name"], record["price"], record["pv"], record["bv"], record["status"]),
+                )
+                self.conn.execute(
+                    """
+                    INSERT INTO products (id, name, price, pv, bv, status, category, sub_category, link, image,
+                                          first_seen_run, last_seen_run, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(id) DO UPDATE SET
+                        name = excluded.name, price = excluded.price, pv = excluded.pv, bv = excluded.bv,
+                        status = excluded.status, category = excluded.category,
+                        sub_category = excluded.sub_category, link = excluded.link, image = excluded.image,
+                        last_seen_run = excluded.last_seen_run, updated_at = excluded.updated_at
+                    """,
+                    (pid, record["name"], record["price"], record["pv"], record["bv"], record["status"],
+                     item.category, item.sub_category, item.link, item.image, run_id, run_id, now),
+                )
+        return changed
+
+    def update_statuses(self, statuses):
+        """
+        statuses: { id: 새 상태 } (stock_watcher의 가벼운 재고 확인 결과)
+        전체 크롤링 실행(run)을 만들지 않고 상태만 갱신합니다. 이력은 그 상품이 마지막으로 발견된 실행 번호로 남기므로
+        다음 전체 크롤링의 실행 간 비교에서는 이 값이 '직전 값'이 됩니다.
+        """
+        if not statuses:
+            return 0
+        now = _now()
+        changed = 0
+        with self._lock, self.conn:
+            for pid, status in statuses.items():
+                prev = self.conn.execute(
+                    "SELECT name, price, pv, bv, status, last_seen_run FROM products WHERE id = ?", (pid,)
+                ).fetchone()
+                if prev is None or prev["status"] == status:
+                    continue
+                changed += 1
+                self.conn.execute(
+                    "INSERT INTO product_history (product_id, run_id, recorded_at, name, price, pv, bv, status)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (pid, prev["last_seen_run"], now, prev["name"], prev["price"], prev["pv"], prev["bv"], status),
+                )
+                self.conn.execute(
+                    "UPDATE products SET status = ?, updated_at = ? WHERE id = ?", (status, now, pid)
+                )
+                # 다음 전체 크롤링이 비교할 직전 완료 실행의 값도 갱신
+                self.conn.execute(
+                    "UPDATE run_products SET status = ? WHERE product_id = ? AND run_id ="
+                    " (SELECT MAX(run_id) FROM runs WHERE finished_at IS NOT NULL)",
+                    (status, pid),
+                )
+        return changed
+
+    def import_json(self, path=LEGACY_JSON_FILE):
+        """기존 JSON 덤프를 최초 1회 가져옵니다 (저장소가 비어 있을 때만)."""
+        if not os.path.exists(path):
+            return 0
+        with self._lock:
+            has_products = self.conn.execute("SELECT 1 FROM products LIMIT 1").fetchone()
+        if has_products:
+            return 0
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not data:
+            return 0
+        run_id = self.begin_run()
+        self.upsert_products(run_id, to_products(data))
+        self.finish_run(run_id)
+        return len(data)
+
+    # --- 조회 ---
+
+    @staticmethod
+    def _to_item(row):
+        return Product(
+            id=row["id"], name=row["name"] or "", price=row["price"] or 0, status=row["status"] or "",
+            link=row["link"] or "", image=row["image"] or "", category=row["category"] or "",
+            sub_category=row["sub_category"] or "", pv=row["pv"] or 0, bv=row["bv"] or 0,
+        )
+
+    def get_product(self, product_id):
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM products WHERE id = ?", (product_id,)).fetchone()
+        return self._to_item(row) if row else None
+
+    def get_products(self, run_id=None):
+        """{ id: Product } - run_id를 주면 그 실행에서 발견된 상품만"""
+        sql = "SELECT * FROM products"
+        params = ()
+        if run_id is not None:
+            sql += " WHERE last_seen_run = ?"
+            params = (run_id,)
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return {row["id"]: self._to_item(row) for row in rows}
+
+    def history(self, product_id):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT * FROM product_history WHERE product_id = ? ORDER BY run_id, recorded_at",
+                (product_id,),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def changes_since(self, since):
+        """
+        since(datetime 또는 ISO 문자열) 이후 바뀐 상품 목록.
+        [{product_id, recorded_at, before: {...}|None, after: {...}}]
+        """
+        if isinstance(since, datetime.datetime):
+            since = since.isoformat(timespec="seconds")
+        with self._lock:
+            rows = self.conn.execute(
+                """
+                SELECT h.*, (
+                    SELECT MAX(p.rowid) FROM product_history p
+                    WHERE p.product_id = h.product_id AND p.rowid < h.rowid
+                ) AS prev_rowid
+                FROM product_history h
+                WHERE h.recorded_at >= ?
+                ORDER BY h.recorded_at
+                """,
+                (since,),
+            ).fetchall()
+            results = []
+            for r in rows:
+                before = None
+                if r["prev_rowid"] is not None:
+                    prev = self.conn.execute(
+                        "SELECT * FROM product_history WHERE rowid = ?", (r["prev_rowid"],)
+                    ).fetchone()
+                    before = {f: prev[f] for f in TRACKED_FIELDS}
+                results.append({
+                    "product_id": r["product_id"],
+                    "recorded_at": r["recorded_at"],
+                    "before": before,
+                    "after": {f: r[f] for f in TRACKED_FIELDS},
+                })
+        return results
+
+    def run_changes(self, run_id=None):
+        """
+        run_id 실행(기본: 가장 최근 완료 실행)과 직전 완료 실행을 비교한 신규/삭제/변경 목록.
+        두 실행이 각각 발견한 상품과 그 최종 값(run_products)만 비교하므로, 사이에 중단된 실행이 있어도
+        그 실행에서 쓴 값/발견 기록은 결과에 영향을 주지 않습니다.
+        직전 완료 실행이 없거나(최초 실행) 그 실행의 상품 목록이 없으면(이 기록을 남기기 전의 실행) None을 반환합니다.
+        """
+        if run_id is None:
+            latest = self.last_finished_run()
+            if not latest:
+                return None
+            run_id = latest["run_id"]
+
+        prev_run = self.last_finished_run(before=run_id)
+        if not prev_run:
+            return None
+        prev_id = prev_run["run_id"]
+
+        with self._lock:
+            if not self.conn.execute("SELECT 1 FROM run_products WHERE run_id = ? LIMIT 1", (prev_id,)).fetchone():
+                return None
+
+            # a 실행에는 있고 b 실행에는 없는 상품
+            only_in = """
+                SELECT p.* FROM run_products r JOIN products p ON p.id = r.product_id
+                WHERE r.run_id = ? AND NOT EXISTS (
+                    SELECT 1 FROM run_products o WHERE o.run_id = ? AND o.product_id = r.product_id
+                )
+            """
+            new_rows = self.conn.execute(only_in, (run_id, prev_id)).fetchall()
+            removed_rows = self.conn.execute(only_in, (prev_id, run_id)).fetchall()
+            # 두 실행 모두에 있는 상품: 각 실행의 최종 값끼리 비교
+            both_rows = self.conn.execute(
+                """
+                SELECT r.product_id, r.name, r.price, r.pv, r.bv, r.status,
+                       o.name AS prev_name, o.price AS prev_price, o.pv AS prev_pv, o.bv AS prev_bv,
+                       o.status AS prev_status
+                FROM run_products r JOIN run_products o ON o.product_id = r.product_id AND o.run_id = ?
+                WHERE r.run_id = ?
+                """,
+                (prev_id, run_id),
+            ).fetchall()
+
+        changed = []
+        for r in both_rows:
+            before = {f: r[f"prev_{f}"] for f in TRACKED_FIELDS}
+            after = {f: r[f] for f in TRACKED_FIELDS}
+            if before != after:
+                changed.append({"id": r["product_id"], "before": before, "after": after})
+
+        return {
+            "new": [self._to_item(r) for r in new_rows],
+            "removed": [self._to_item(r) for r in removed_rows],
+            "changed": changed,
+        }
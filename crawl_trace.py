@@ -0,0 +1,127 @@
+"""
+크롤링 구간별 시간 측정 (Chrome Trace / Perfetto JSON 형식).
+
+실행마다 logs/traces/crawl_YYYYmmdd_HHMMSS.json 파일이 생성되며,
+chrome://tracing 또는 https://ui.perfetto.dev 에서 열어 카테고리별 소요 시간과 동시 실행 공백을 볼 수 있습니다.
+각 asyncio 태스크(카테고리/프로모션 워커)가 하나의 줄(tid)로 표시됩니다.
+CRAWL_TRACE=0 으로 끌 수 있습니다.
+"""
+import asyncio
+import datetime
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+TRACE_ENABLED = os.environ.get("CRAWL_TRACE", "1") != "0"
+TRACE_DIR = os.path.join("logs", "traces")
+
+
+class Tracer:
+    def __init__(self, enabled=TRACE_ENABLED):
+        self.enabled = enabled
+        self.reset()
+
+    def reset(self):
+        self.events = []
+        self.bytes_total = 0
+        self._t0 = time.perf_counter()
+        self._pid = os.getpid()
+        self._lanes = {}
+        self._lock = threading.Lock()
+
+    def _now_us(self):
+        return (time.perf_counter() - self._t0) * 1_000_000
+
+    def _tid(self):
+        """현재 asyncio 태스크(없으면 스레드)별로 고정된 작은 정수 id"""
+        try:
+            key = id(asyncio.current_task())
+        except RuntimeError:
+            key = threading.get_ident()
+        with self._lock:
+            if key not in self._lanes:
+                self._lanes[key] = len(self._lanes) + 1
+            return self._lanes[key]
+
+    def name_lane(self, label):
+        """현재 태스크 줄에 이름 붙이기 (예: 카테고리 이름)"""
+        if not self.enabled:
+            return
+        self.events.append({
+            "name": "thread_name", "ph": "M", "pid": self._pid, "tid": self._tid(),
+            "args": {"name": label},
+        })
+
+    @contextmanager
+    def span(self, name, cat="crawl", **args):
+        """with TRACER.span("goto", url=url): ... -> 완료 이벤트("X") 하나 기록"""
+        if not self.enabled:
+            yield args
+            return
+        tid = self._tid()
+        start = self._now_us()
+        try:
+            yield args
+        finally:
+            self.events.append({
+                "name": name, "cat": cat, "ph": "X", "pid": self._pid, "tid": tid,
+                "ts": start, "dur": self._now_us() - start, "args": args,
+            })
+
+    def instant(self, name, cat="crawl", **args):
+        if not self.enabled:
+            return
+        self.events.append({
+            "name": name, "cat": cat, "ph": "i", "s": "t", "pid": self._pid, "tid": self._tid(),
+            "ts": self._now_us(), "args": args,
+        })
+
+    def add_bytes(self, n):
+        if not self.enabled or not n:
+            return
+        self.bytes_total += n
+        self.events.append({
+            "name": "bytes_transferred", "ph": "C", "pid": self._pid, "ts": self._now_us(),
+            "args": {"bytes": self.bytes_total},
+        })
+
+    def track_page_bytes(self, page, counter=None):
+        """
+        page의 응답 바이트를 누적합니다. counter(dict)를 주면 counter["bytes"]에도 더합니다.
+        (차단/대체된 요청은 네트워크를 타지 않으므로 0으로 집계됩니다)
+        """
+        if not self.enabled:
+            return
+
+        async def _on_response(response):
+            try:
+                sizes = await response.request.sizes()
+                n = sizes.get("responseBodySize", 0) + sizes.get("responseHeadersSize", 0)
+            except Exception:
+                try:
+                    n = int(response.headers.get("content-length") or 0)
+                except ValueError:
+                    n = 0
+            if n > 0:
+                self.add_bytes(n)
+                if counter is not None:
+                    counter["bytes"] = counter.get("bytes", 0) + n
+
+        page.on("response", _on_response)
+
+    def save(self, directory=TRACE_DIR, prefix="crawl"):
+        """prefix: 파일 이름 앞부분 (여러 사이트를 동시에 돌릴 때 파일이 겹치지 않도록 사이트 코드 포함)"""
+        if not self.enabled or not self.events:
+            return None
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{prefix}_{datetime.datetime.now():%Y%m%d_%H%M%S}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+        print(f"  [트레이스] {path} 저장 (이벤트 {len(self.events)}개, 전송 {self.bytes_total / 1024 / 1024:.1f}MB)")
+        return path
+
+
+# 크롤러 전체가 공유하는 트레이서
+TRACER = Tracer()
@@ -0,0 +1,220 @@
+"""
+크롤링 -> 시트 동기화 -> AI 채우기를 한 프로세스에서 계속 실행하는 상주(데몬) 모드.
+
+run_all.py는 실행할 때마다 파이썬/Playwright/gspread/AI 라이브러리를 새로 불러오고,
+Chromium을 띄우고, 구글 인증을 다시 합니다. 데몬은 이것들을 한 번만 준비해 두고
+- 내부 스케줄(DAEMON_INTERVAL_MINUTES)마다
+- 또는 로컬 HTTP 트리거를 받을 때
+같은 브라우저/클라이언트로 전체 작업을 반복 실행합니다.
+
+사용법:
+    python daemon.py
+    curl -X POST http://127.0.0.1:8765/run                  # 지금 실행
+    curl -X POST "http://127.0.0.1:8765/run?resume=1&ai=0"  # 이어하기, AI 단계 생략
+    curl http://127.0.0.1:8765/status                        # 상태 확인
+"""
+import asyncio
+import datetime
+import json
+import os
+import sys
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import amway_full_crawler
+from amway_full_crawler import BrowserSession, run_full_crawl
+from crawl_store import CrawlStore
+from http_crawler import HttpCrawler
+from run_all import Logger
+from site_profiles import get_profile
+from sheet_client import get_client
+from sync_to_sheet import SheetManager
+
+DAEMON_HOST = os.environ.get("DAEMON_HOST", "127.0.0.1")
+DAEMON_PORT = int(os.environ.get("DAEMON_PORT", "8765"))
+# 자동 실행 간격(분). 0이면 트리거로만 실행
+DAEMON_INTERVAL_MINUTES = float(os.environ.get("DAEMON_INTERVAL_MINUTES", "360"))
+# 0이면 AI 채우기 단계를 기본으로 건너뜀 (트리거에서 ai=1로 켤 수 있음)
+DAEMON_RUN_AI = os.environ.get("DAEMON_RUN_AI", "1") != "0"
+
+HTTP_REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 409: "Conflict"}
+
+
+class CrawlDaemon:
+    def __init__(self):
+        self.session = None
+        self.http = None
+        self.gc = None
+        self.ai = None
+        self.profile = get_profile()
+        self._lock = asyncio.Lock()
+        self._task = None
+        self.status = {
+            "state": "starting",
+            "runs": 0,
+            "last_started": None,
+            "last_finished": None,
+            "last_elapsed": None,
+            "last_error": None,
+            "next_scheduled": None,
+        }
+
+    async def warm_up(self):
+        """브라우저, HTTP 커넥션 풀, 구글 인증, AI 클라이언트를 미리 준비"""
+        loop = asyncio.get_running_loop()
+        print(">>> 데몬 준비 중 (브라우저/클라이언트 예열)...")
+
+        if amway_full_crawler.CRAWL_ENGINE != "browser":
+            self.http = HttpCrawler(self.profile["base_url"], rules=self.profile["rules"])
+            await self.http.__aenter__()
+        if amway_full_crawler.CRAWL_ENGINE != "http":
+            self.session = BrowserSession(profile=self.profile)
+            await self.session.get_context()
+
+        self.gc = await loop.run_in_executor(None, get_client)
+
+        try:
+            # main.py는 import 시점에 AI 클라이언트를 초기화함
+            import main as ai_main
+            self.ai = ai_main
+        except Exception as e:
+            print(f"  (AI 모듈을 불러올 수 없어 AI 단계를 건너뜁니다: {e})")
+
+        self.status["state"] = "idle"
+        print(">>> 데몬 준비 완료")
+
+    async def close(self):
+        if self._task:
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self.http:
+            await self.http.close()
+        if self.session:
+            await self.session.close()
+
+    def trigger(self, resume=False, run_ai=DAEMON_RUN_AI):
+        """실행 중이 아니면 새 실행을 시작하고 True, 이미 실행 중이면 False"""
+        if self._lock.locked() or (self._task and not self._task.done()):
+            return False
+        self._task = asyncio.create_task(self.run_cycle(resume=resume, run_ai=run_ai))
+        return True
+
+    async def run_cycle(self, resume=False, run_ai=DAEMON_RUN_AI):
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            started = time.time()
+            self.status.update(state="running", last_started=datetime.datetime.now().isoformat(timespec="seconds"),
+                               last_error=None)
+            print(f"\n[{datetime.datetime.now()}] 데몬 실행 #{self.status['runs'] + 1} 시작")
+
+            sheet_manager = None
+            try:
+                sheet_manager = await loop.run_in_executor(
+                    None, lambda: SheetManager(self.gc, spreadsheet_name=self.profile["spreadsheet"]))
+
+                store = CrawlStore(self.profile["store_file"])
+                try:
+                    await run_full_crawl(data_callback=sheet_manager.append_data, store=store, resume=resume,
+                                         session=self.session, http=self.http, profile=self.profile)
+                    store_changes = await loop.run_in_executor(None, store.run_changes)
+                    await loop.run_in_executor(
+                        None, lambda: sheet_manager.finalize_and_report_changes(store_changes=store_changes))
+                finally:
+                    store.close()
+
+                if run_ai and self.ai is not None:
+                    print("\n>>> AI 빈칸 채우기...")
+                    # 방금 크롤링 결과를 쓴 SheetManager(연결/행 색인)를 그대로 사용
+                    await loop.run_in_executor(None, self.ai.run_stage, sheet_manager)
+            except Exception as e:
+                print(f"\n!!! 데몬 실행 중 오류: {e}")
+                self.status["last_error"] = str(e)
+            finally:
+                # 실행마다 새로 만드는 SheetManager의 로컬 사본(SQLite) 연결을 닫음
+                if sheet_manager is not None:
+                    await loop.run_in_executor(None, sheet_manager.close)
+                elapsed = time.time() - started
+                self.status.update(state="idle", runs=self.status["runs"] + 1, last_elapsed=round(elapsed, 1),
+                                   last_finished=datetime.datetime.now().isoformat(timespec="seconds"))
+                print(f"[{datetime.datetime.now()}] 데몬 실행 완료 ({int(elapsed)}초)")
+
+    async def schedule_loop(self):
+        if DAEMON_INTERVAL_MINUTES <= 0:
+            return
+        interval = DAEMON_INTERVAL_MINUTES * 60
+        while True:
+            self.status["next_scheduled"] = (
+                datetime.datetime.now() + datetime.timedelta(seconds=interval)).isoformat(timespec="seconds")
+            await asyncio.sleep(interval)
+            if not self.trigger():
+                print("  (예약 실행 건너뜀: 이전 실행이 아직 진행 중)")
+
+    async def handle_request(self, reader, writer):
+        """아주 작은 HTTP 핸들러: GET /status, POST /run?resume=0|1&ai=0|1"""
+        try:
+            request_line = (await reader.readline()).decode("latin-1").strip()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+
+            method, target, _ = request_line.split(" ", 2)
+            url = urlsplit(target)
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+            if method == "GET" and url.path == "/status":
+                code, body = 200, self.status
+            elif method == "POST" and url.path == "/run":
+                resume = params.get("resume", "0") == "1"
+                run_ai = params.get("ai", "1" if DAEMON_RUN_AI else "0") == "1"
+                if self.trigger(resume=resume, run_ai=run_ai):
+                    code, body = 202, {"started": True, "resume": resume, "ai": run_ai}
+                else:
+                    code, body = 409, {"started": False, "reason": "이미 실행 중입니다"}
+            else:
+                code, body = 404, {"error": "GET /status 또는 POST /run 만 지원합니다"}
+        except ValueError:
+            code, body = 400, {"error": "잘못된 요청"}
+
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        header = (f"HTTP/1.1 {code} {HTTP_REASONS[code]}\r\n"
+                  "Content-Type: application/json; charset=utf-8\r\n"
+                  f"Content-Length: {len(payload)}\r\n"
+                  "Connection: close\r\n\r\n")
+        try:
+            writer.write(header.encode("latin-1") + payload)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, run_now=False):
+        await self.warm_up()
+        server = await asyncio.start_server(self.handle_request, DAEMON_HOST, DAEMON_PORT)
+        print(f">>> 트리거 대기 중: http://{DAEMON_HOST}:{DAEMON_PORT} (POST /run, GET /status)")
+        if DAEMON_INTERVAL_MINUTES > 0:
+            print(f">>> 자동 실행 간격: {DAEMON_INTERVAL_MINUTES:g}분")
+
+        if run_now:
+            self.trigger()
+        try:
+            async with server:
+                await asyncio.gather(server.serve_forever(), self.schedule_loop())
+        finally:
+            await self.close()
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description='Amway 통합 자동화 (상주 모드)')
+    parser.add_argument('--run-now', action='store_true', help='시작하자마자 한 번 실행')
+    args = parser.parse_args()
+
+    if not os.path.exists("logs"):
+        os.makedirs("logs")
+    sys.stdout = Logger("logs/monitor.log")
+
+    try:
+        asyncio.run(CrawlDaemon().serve(run_now=args.run_now))
+    except KeyboardInterrupt:
+        print("\n데몬을 종료합니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,12 @@
-import gspread
-from google.oauth2.service_account import Credentials
 import difflib
 import argparse
 import sys
 import os
 
+from sheet_client import SERVICE_ACCOUNT_FILE, get_client
+from sheet_mirror import SHEET_MIRROR_ENABLED, SheetMirror
+
 # Configuration
-SERVICE_ACCOUNT_FILE = 'service_account.json'
-SCOPES = [
-    'https://www.googleapis.com/auth/spreadsheets',
-    'https://www.googleapis.com/auth/drive'
-]
 SHEET_NAME = "통합DB"
 
 # Keywords to remove for fuzzy matching
@@ -38,18 +34,17 @@ def connect_to_sheet():
         sys.exit(1)
 
     try:
-        creds = Credentials.from_service_account_file(SERVICE_ACCOUNT_FILE, scopes=SCOPES)
-        gc = gspread.authorize(creds)
+        gc = get_client()
         sh = gc.open(SHEET_NAME)
         worksheet = sh.get_worksheet(0)
-        return worksheet
+        return sh, worksheet
     except Exception as e:
         print(f"Error connecting to Google Sheet: {e}")
         sys.exit(1)
 
-def find_columns(worksheet):
+def find_columns(worksheet, mirror=None):
     # Scan first 10 rows for headers
-    headers = worksheet.get('A1:Z10')
+    headers = mirror.get('A1:Z10') if mirror else worksheet.get('A1:Z10')
 
     col_map = {
         'category': -1,
@@ -123,11 +118,21 @@ def main():
     parser.add_argument('--dry-run', action='store_true', help='Preview changes without writing to sheet')
     args = parser.parse_args()
 
-    worksheet = connect_to_sheet()
-    col_map, header_row_idx = find_columns(worksheet)
+    sh, worksheet = connect_to_sheet()
+
+    # Local sheet mirror (sheet_mirror.py): full read only when the spreadsheet changed since the last run
+    mirror = None
+    if SHEET_MIRROR_ENABLED:
+        try:
+            # 예전처럼 get_all_values()와 같은 표시 값(FORMATTED_VALUE)으로 비교/복사
+            mirror = SheetMirror(sh, worksheet, value_render_option="FORMATTED_VALUE")
+        except Exception as e:
+            print(f"Sheet mirror unavailable: {e}")
+
+    col_map, header_row_idx = find_columns(worksheet, mirror)
 
     print("Loading data from sheet...")
-    all_values = worksheet.get_all_values()
+    all_values = mirror.get('A1:Z') if mirror else worksheet.get_all_values()
 
     data_start_row = header_row_idx + 1 if header_row_idx != -1 else 6 # Default to row 7 (index 6) if header not found
 
@@ -140,7 +145,7 @@ def main():
     print("Analyzing rows...")
     for i, row in enumerate(rows):
         def get_col(idx):
-            return row[idx] if idx < len(row) else ""
+            return str(row[idx]) if idx < len(row) else ""
 
         category = get_col(col_map['category'])
         name = get_col(col_map['name'])
@@ -237,8 +242,17 @@ def main():
                 print(f"Successfully synced {synced_count} rows.")
             except Exception as e:
                 print(f"Error applying updates: {e}")
+            else:
+                if mirror:
+                    try:
+                        mirror.record_write(updates)
+                    except Exception as e:
+                        print(f"Sheet mirror update failed (next run will reload): {e}")
         else:
             print("No updates to apply.")
 
+    if mirror:
+        mirror.close()
+
 if __name__ == "__main__":
     main()
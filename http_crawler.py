@@ -0,0 +1,269 @@
+"""
+브라우저 없이 상품 목록을 가져오는 HTTP 크롤 엔진.
+
+- 카테고리: 그리드의 무한 스크롤이 호출하는 JSON 엔드포인트({카테고리 URL}/results)를 페이지 단위로 직접 호출
+- 프로모션: 목록/상세 페이지 HTML을 직접 받아 product_parser로 추출
+
+각 메서드는 실패(비 JSON 응답, 상품 0개, 네트워크 오류 등) 시 None을 반환하며,
+호출 측(amway_full_crawler)이 Playwright 경로로 폴백합니다.
+"""
+from urllib.parse import urlparse
+
+import httpx
+
+import product_parser
+from crawl_trace import TRACER
+
+BASE_URL = "https://www.amway.co.kr"
+
+# SAP Commerce 카테고리 그리드의 상품 검색 엔드포인트 (카테고리 URL 뒤에 붙음)
+CATEGORY_RESULTS_SUFFIX = "/results"
+CATEGORY_PAGE_SIZE = 48
+MAX_CATEGORY_PAGES = 100
+
+# 커넥션 풀 설정 (keep-alive 재사용)
+HTTP_MAX_CONNECTIONS = 10
+HTTP_KEEPALIVE_CONNECTIONS = 10
+HTTP_TIMEOUT = 20.0
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept-Language": "ko-KR,ko;q=0.9",
+}
+
+# 재고 상태 코드 -> 시트에 쓰는 한글 상태
+STOCK_STATUS_MAP = {
+    "outOfStock": "품절",
+    "temporarilyOutOfStock": "일시품절",
+    "discontinued": "단종",
+}
+
+
+def _first(d, *keys, default=None):
+    for k in keys:
+        if isinstance(d, dict) and d.get(k) not in (None, ""):
+            return d[k]
+    return default
+
+
+def _volume(raw):
+    if isinstance(raw, dict):
+        raw = _first(raw, "value", "formattedValue")
+    if raw in (None, ""):
+        return "0"
+    try:
+        return str(int(float(str(raw).replace(",", ""))))
+    except ValueError:
+        return "0"
+
+
+def same_page(requested_url, final_url):
+    """리다이렉트 후에도 같은 경로인지 (없어진 카테고리는 보통 홈/전체상품으로 리다이렉트됨)"""
+    def path(url):
+        return urlparse(str(url)).path.rstrip("/")
+    return path(requested_url) == path(final_url)
+
+
+def normalize_search_product(raw, cat_name, base_url=BASE_URL):
+    """상품 검색 JSON 한 건 -> 크롤러 공통 상품 dict (_extract_products_optimized 형식)"""
+    name = (_first(raw, "name", default="Unknown Name") or "").strip()
+
+    link = _first(raw, "url", default="") or ""
+    if link.startswith("/"):
+        link = base_url + link
+
+    product_id = link.split("/")[-1] if link else str(_first(raw, "code", default=name))
+
+    price_info = raw.get("price") or {}
+    if isinstance(price_info, dict):
+        price = _first(price_info, "formattedValue", "value", default="0")
+    else:
+        price = price_info
+    price = str(price)
+
+    image = ""
+    images = raw.get("images") or []
+    if images:
+        primary = next((i for i in images if i.get("imageType") == "PRIMARY"), images[0])
+        image = primary.get("url", "") or ""
+        if image.startswith("/"):
+            image = base_url + image
+
+    stock = raw.get("stock") or {}
+    status = STOCK_STATUS_MAP.get(_first(stock, "stockLevelStatus", default=""), "판매중")
+    if raw.get("discontinued"):
+        status = "단종"
+
+    pv_raw = _first(raw, "pointValue", "pv")
+    bv_raw = _first(raw, "businessVolume", "bv")
+    if isinstance(price_info, dict):
+        if pv_raw is None:
+            pv_raw = price_info.get("pointValue")
+        if bv_raw is None:
+            bv_raw = price_info.get("businessVolume")
+    pv = _volume(pv_raw)
+    bv = _volume(bv_raw)
+
+    category = cat_name
+    if "스마트 오더" in name or "스마트오더" in name:
+        category = "스마트 오더"
+
+    return {
+        "id": product_id,
+        "name": name,
+        "price": price,
+        "status": status,
+        "link": link,
+        "image": image,
+        "category": category,
+        "sub_category": "",
+        "pv": pv,
+        "bv": bv,
+    }
+
+
+class HttpCrawler:
+    """
+    keep-alive 커넥션 풀을 공유하는 비동기 HTTP 클라이언트 래퍼.
+    async with HttpCrawler() as http: ... 형태로 사용합니다.
+    """
+    def __init__(self, base_url=BASE_URL, max_connections=HTTP_MAX_CONNECTIONS, rules=None):
+        """rules: product_parser.make_rules 결과 (사이트 프로필의 추출 규칙, 없으면 기본 규칙)"""
+        self.base_url = base_url
+        self.rules = rules
+        self.max_connections = max_connections
+        self.client = None
+        self.stats = {"requests": 0, "failures": 0}
+
+    async def __aenter__(self):
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=HTTP_KEEPALIVE_CONNECTIONS,
+        )
+        self.client = httpx.AsyncClient(
+            headers=DEFAULT_HEADERS,
+            limits=limits,
+            timeout=HTTP_TIMEOUT,
+            follow_redirects=True,
+            http2=False,
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        if self.client:
+            await self.client.aclose()
+            self.client = None
+
+    async def _get(self, url, params=None, headers=None):
+        self.stats["requests"] += 1
+        try:
+            resp = await self.client.get(url, params=params, headers=headers)
+            resp.raise_for_status()
+            TRACER.add_bytes(len(resp.content))
+            return resp
+        except Exception:
+            self.stats["failures"] += 1
+            raise
+
+    async def _get_json(self, url, params=None):
+        resp = await self._get(url, params=params, headers={
+            "Accept": "application/json",
+            "X-Requested-With": "XMLHttpRequest",
+        })
+        if "json" not in resp.headers.get("content-type", ""):
+            raise ValueError(f"JSON 응답이 아닙니다 ({resp.headers.get('content-type')})")
+        return resp.json()
+
+    async def _get_html(self, url):
+        resp = await self._get(url, headers={"Accept": "text/html"})
+        return resp.text
+
+    async def fetch_category(self, category_info, page_size=CATEGORY_PAGE_SIZE):
+        """카테고리 전체 페이지를 JSON으로 수집. 실패 시 None."""
+        cat_name = category_info["name"]
+        url = category_info["url"].split("?")[0].rstrip("/") + CATEGORY_RESULTS_SUFFIX
+
+        results = {}
+        try:
+            page_no = 0
+            while page_no < MAX_CATEGORY_PAGES:
+                data = await self._get_json(url, params={
+                    "q": ":relevance",
+                    "page": page_no,
+                    "pageSize": page_size,
+                })
+                items = data.get("results")
+                if items is None:
+                    return None
+
+                for raw in items:
+                    product = normalize_search_product(raw, cat_name, self.base_url)
+                    results[product["id"]] = product
+
+                pagination = data.get("pagination") or {}
+                number_of_pages = pagination.get("numberOfPages")
+                if not items or number_of_pages is None or page_no + 1 >= number_of_pages:
+                    break
+                page_no += 1
+        except Exception as e:
+            print(f"  [HTTP] {cat_name} 직접 수집 실패 ({e})")
+            return None
+
+        if not results:
+            return None
+
+        print(f"  [HTTP] Found {len(results)} products in {cat_name}.")
+        return results
+
+    async def fetch_promotion(self, item):
+        """
+        프로모션 상세 HTML에서 상품 추출. 상품 카드가 없거나(JS 렌더링 필요) 실패 시 None.
+        링크만으로 만드는 대체 추출은 쓰지 않음 - 카드가 JS로 그려지는 페이지에서는 헤더 등 사이트 공통 링크만 잡히므로
+        None을 돌려 브라우저 렌더링으로 넘깁니다.
+        """
+        try:
+            html = await self._get_html(item["url"])
+        except Exception:
+            return None
+        products = product_parser.parse_promotion_products(html, self.base_url, self.rules, link_fallback=False)
+        return products or None
+
+    async def check_url(self, url):
+        """본문 없이(HEAD) 페이지가 아직 살아 있는지 확인. 리다이렉트로 다른 페이지가 되면 False"""
+        self.stats["requests"] += 1
+        try:
+            resp = await self.client.head(url, headers={"Accept": "text/html"})
+            if resp.status_code in (405, 501):
+                # HEAD를 지원하지 않는 서버
+                resp = await self.client.get(url, headers={"Accept": "text/html"})
+        except Exception:
+            self.stats["failures"] += 1
+            return False
+        return resp.status_code < 400 and same_page(url, resp.url)
+
+    async def discover_categories(self, target_cats):
+        try:
+            html = await self._get_html(f"{self.base_url}/shop/c/shop")
+        except Exception as e:
+            print(f"  [HTTP] 카테고리 탐색 실패 ({e})")
+            return None
+        anchors = product_parser.parse_anchors(html, self.base_url)
+        return product_parser.match_category_links(anchors, target_cats, self.base_url) or None
+
+    async def fetch_promotion_list(self):
+        try:
+            html = await self._get_html(f"{self.base_url}/notifications/promotion")
+        except Exception as e:
+            print(f"  [HTTP] 프로모션 목록 조회 실패 ({e})")
+            return None
+        anchors = product_parser.parse_anchors(html, self.base_url)
+        return product_parser.match_promotion_links(anchors, self.base_url, self.rules) or None
+
+    def report(self):
+        print(f"  [HTTP 엔진] 요청 {self.stats['requests']}건 / 실패 {self.stats['failures']}건")
@@ -4,12 +4,13 @@ import json
 import time
 import datetime
 import pytz
-import gspread
 import warnings
-from google.oauth2.service_account import Credentials
 from google.api_core.exceptions import ResourceExhausted
 from dotenv import load_dotenv
 
+from sheet_client import SERVICE_ACCOUNT_FILE, get_client
+from sheet_mirror import SHEET_MIRROR_ENABLED, SheetMirror
+
 # OpenAI
 from openai import OpenAI
 
@@ -21,7 +22,6 @@ import google.generativeai as genai
 load_dotenv()
 
 # 설정
-SERVICE_ACCOUNT_FILE = 'service_account.json'
 SHEET_NAME = '통합DB'
 START_ROW = 6
 # [최적화] D열부터 K열까지 가져오므로 인덱스가 변경됨 (D=0, E=1, F=2 ... K=7)
@@ -190,6 +190,15 @@ def get_ai_response_batch(product_list):
         print(f"\n❌ [{AI_PROVIDER}] AI 요청 실패 (배치): {e}")
         return None
 
+def record_mirror_write(mirror, batch_data):
+    """시트에 쓴 E/K열을 로컬 사본에도 반영 (실패해도 다음 실행에서 시트를 다시 읽을 뿐)"""
+    if mirror is None:
+        return
+    try:
+        mirror.record_write(batch_data)
+    except Exception as e:
+        print(f"     -> (시트 사본 갱신 실패: {e})")
+
 def main():
     print("=== 구글 시트 AI 자동화 봇 실행 (스마트 할당량 관리) ===")
     print(f"AI 공급자: {AI_PROVIDER}")
@@ -199,12 +208,7 @@ def main():
         print(f"오류: '{SERVICE_ACCOUNT_FILE}' 파일을 찾을 수 없습니다.")
         return
 
-    scopes = [
-        "https://www.googleapis.com/auth/spreadsheets",
-        "https://www.googleapis.com/auth/drive"
-    ]
-    creds = Credentials.from_service_account_file(SERVICE_ACCOUNT_FILE, scopes=scopes)
-    gc = gspread.authorize(creds)
+    gc = get_client()
 
     # 2. 스프레드시트 열기
     spreadsheet_name = os.environ.get("SPREADSHEET_NAME")
@@ -215,20 +219,92 @@ def main():
     print("📡 구글 시트에 접속 중입니다... (잠시만 기다려주세요)")
     try:
         sh = gc.open(spreadsheet_name)
-        worksheet = sh.worksheet(SHEET_NAME)
     except Exception as e:
         print(f"❌ 접속 오류: {e}")
         print("팁: .env 파일의 SPREADSHEET_NAME이 정확한지, 서비스 계정이 공유되어 있는지 확인하세요.")
         return
 
-    print(f"✅ '{spreadsheet_name}'의 '{SHEET_NAME}' 시트 작업을 시작합니다...")
+    fill_spreadsheet(sh)
+
+def fill_spreadsheet(sh):
+    """스프레드시트의 SHEET_NAME('통합DB') 워크시트를 직접 읽어 AI 열 채우기"""
+    try:
+        worksheet = sh.worksheet(SHEET_NAME)
+    except Exception as e:
+        print(f"❌ 접속 오류: {e}")
+        print(f"팁: '{sh.title}'에 '{SHEET_NAME}' 시트가 있는지 확인하세요.")
+        return
+
+    print(f"✅ '{sh.title}'의 '{SHEET_NAME}' 시트 작업을 시작합니다...")
 
     # 3. 데이터 로드
+    # 로컬 사본(sheet_mirror.py)이 최신이면 시트를 다시 읽지 않음
+    mirror = None
+    if SHEET_MIRROR_ENABLED:
+        try:
+            mirror = SheetMirror(sh, worksheet)
+        except Exception as e:
+            print(f"   - (시트 사본 사용 불가: {e})")
+
     range_query = f"D{START_ROW}:K"
     print(f"   - 데이터 읽는 중... ({range_query})")
-    all_values = worksheet.get(range_query)
-    
-    # 4. 작업 분류 (채우기 vs 업데이트)
+    all_values = mirror.get(range_query) if mirror else worksheet.get(range_query)
+
+    # 4. 작업 분류 및 실행 (쓰기는 시트와 로컬 사본 양쪽에)
+    def write_cells(batch_data):
+        worksheet.batch_update(batch_data)
+        record_mirror_write(mirror, batch_data)
+
+    try:
+        fill_ai_columns(all_values, write_cells)
+    finally:
+        # 쓴 뒤의 시트 수정 시각을 한 번만 기록
+        if mirror is not None:
+            mirror.close()
+
+def run_stage(sheet_manager):
+    """
+    run_all.py / daemon.py에서 크롤링 직후 같은 프로세스에서 실행하는 AI 단계.
+    SheetManager가 이미 연결한 시트와 방금 쓴 행 색인(D~O)을 그대로 사용하므로
+    인증/시트 열기/D6:K 읽기를 다시 하지 않습니다.
+    .env의 SPREADSHEET_NAME이 크롤링한 스프레드시트와 다르면 예전처럼 그 시트를 따로 열어 작업합니다.
+    """
+    spreadsheet_name = os.environ.get("SPREADSHEET_NAME")
+    if spreadsheet_name and spreadsheet_name != sheet_manager.sh.title:
+        print(f"   - SPREADSHEET_NAME('{spreadsheet_name}')이 크롤링 시트('{sheet_manager.sh.title}')와 달라 따로 엽니다.")
+        main()
+        return
+
+    print("=== AI 태그/설명 채우기 (크롤링 결과 이어서) ===")
+    print(f"AI 공급자: {AI_PROVIDER}")
+
+    if sheet_manager.worksheet.title != SHEET_NAME:
+        # 크롤러는 첫 번째 워크시트에 쓰므로, 그것이 '통합DB'가 아니면 단독 실행과 같은 워크시트를 이름으로 엶
+        print(f"   - 크롤링 워크시트('{sheet_manager.worksheet.title}')가 '{SHEET_NAME}'이 아니어서 따로 엽니다.")
+        fill_spreadsheet(sheet_manager.sh)
+        return
+
+    if sheet_manager.snapshot_loaded:
+        rows = sheet_manager.rows
+        last_row = max(rows, default=START_ROW - 1)
+        all_values = [list(rows.get(n, []))[:8] for n in range(START_ROW, last_row + 1)]
+    else:
+        # 시작 시 시트를 못 읽었으면 이번에만 직접 읽음
+        all_values = sheet_manager.worksheet.get(f"D{START_ROW}:K")
+
+    def write_cells(batch_data):
+        if not sheet_manager.write_cells(batch_data):
+            raise RuntimeError("시트 쓰기 실패")
+
+    fill_ai_columns(all_values, write_cells)
+
+def fill_ai_columns(all_values, write_cells):
+    """
+    빈칸 채우기/구버전 갱신 대상을 골라 AI로 E(태그)/K(설명)열을 작성
+    all_values: START_ROW(6)행부터의 [D, E, F, ... K] 값 목록
+    write_cells: batch_update 형식 [{'range', 'values'}]을 시트에 쓰는 함수 (실패하면 예외)
+    """
+    # 1. 작업 분류 (채우기 vs 업데이트)
     fill_queue = []
     update_queue = []
     
@@ -239,10 +315,11 @@ def main():
         if len(row_values) < 8:
             row_values += [''] * (8 - len(row_values))
 
-        category = row_values[COL_CATEGORY_IDX].strip()
-        product_name = row_values[COL_PRODUCT_NAME_IDX].strip()
-        current_tags = row_values[COL_TAGS_IDX].strip()
-        current_desc = row_values[COL_DESC_IDX].strip()
+        # 사본 값은 FORMULA 렌더링이라 숫자 셀은 숫자로 옴
+        category = str(row_values[COL_CATEGORY_IDX]).strip()
+        product_name = str(row_values[COL_PRODUCT_NAME_IDX]).strip()
+        current_tags = str(row_values[COL_TAGS_IDX]).strip()
+        current_desc = str(row_values[COL_DESC_IDX]).strip()
 
         # [예외] '이벤트' 카테고리 건너뜀
         if "이벤트" in category:
@@ -273,7 +350,7 @@ def main():
     print(f"   - 신규 작성 필요: {len(fill_queue)}건")
     print(f"   - 업데이트 필요: {len(update_queue)}건")
 
-    # 5. 작업 실행
+    # 2. 작업 실행
     # 우선순위: 1. 빈칸 채우기 -> 2. 업데이트
     total_queues = [('신규 채우기', fill_queue), ('업데이트', update_queue)]
 
@@ -324,7 +401,7 @@ def main():
                         # 중간 저장 (API 호출 최적화: 임계치 이상 쌓였을 때만 저장)
                         if len(batch_data) >= SHEET_SAVE_THRESHOLD * 2:
                             try:
-                                worksheet.batch_update(batch_data)
+                                write_cells(batch_data)
                                 batch_data = []
                             except Exception as e:
                                 print(f"     -> ⚠️ 중간 저장 실패: {e} (메모리 보관)")
@@ -357,7 +434,7 @@ def main():
         if batch_data:
             print(f"\n남은 {len(batch_data)//2}건의 데이터를 시트에 저장 중...")
             try:
-                worksheet.batch_update(batch_data)
+                write_cells(batch_data)
                 print("✅ 저장 완료!")
             except Exception as e:
                 print(f"❌ 저장 실패: {e}")
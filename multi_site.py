@@ -0,0 +1,96 @@
+"""
+여러 국가 사이트를 사이트별 워커 프로세스에서 동시에 크롤링합니다.
+
+각 프로세스는 자기 브라우저/HTTP 커넥션 풀/이벤트 루프를 갖고, 사이트 프로필(site_profiles.py)의
+store_file / spreadsheet 로 저장하므로 서로 간섭하지 않습니다. 사이트별 로그는 logs/monitor_{코드}.log 에 남습니다.
+
+사용법:
+    python multi_site.py --sites kr jp             # 크롤링 + 사이트별 스프레드시트 동기화
+    python multi_site.py --sites kr jp --no-sheet  # 상태 저장소에만 저장
+    python multi_site.py                           # 등록된 모든 사이트
+"""
+import argparse
+import asyncio
+import datetime
+import multiprocessing
+import os
+import sys
+import time
+
+from site_profiles import available_sites, get_profile
+
+
+def run_site(code, sync_sheet=True, resume=False):
+    """워커 프로세스 진입점: 사이트 하나를 run_all.py와 같은 순서(시트 연결 -> 크롤링 -> 변경 내역)로 처리"""
+    from run_all import Logger
+    from amway_full_crawler import run_full_crawl
+    from crawl_store import CrawlStore
+
+    sys.stdout = Logger(os.path.join("logs", f"monitor_{code}.log"))
+    profile = get_profile(code)
+    print(f"\n[{datetime.datetime.now()}] [{code}] 작업 시작 ({profile['base_url']})")
+
+    sheet_manager = None
+    if sync_sheet:
+        from sync_to_sheet import SheetManager
+        sheet_manager = SheetManager(spreadsheet_name=profile["spreadsheet"])
+
+    store = CrawlStore(profile["store_file"])
+    try:
+        asyncio.run(run_full_crawl(
+            data_callback=sheet_manager.append_data if sheet_manager else None,
+            store=store, resume=resume, profile=profile))
+        if sheet_manager:
+            sheet_manager.finalize_and_report_changes(store_changes=store.run_changes())
+    finally:
+        store.close()
+        if sheet_manager:
+            sheet_manager.close()
+    print(f"[{datetime.datetime.now()}] [{code}] 작업 완료")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Amway 다국가 동시 크롤링')
+    parser.add_argument('--sites', nargs='+', help=f'사이트 코드 목록 (기본: 전체 - {", ".join(available_sites())})')
+    parser.add_argument('--no-sheet', action='store_true', help='구글 시트 동기화 없이 상태 저장소에만 저장')
+    parser.add_argument('--resume', action='store_true', help='사이트별로 중단된 직전 실행을 이어서 진행')
+    args = parser.parse_args()
+
+    codes = args.sites or available_sites()
+    profiles = [get_profile(code) for code in codes]  # 잘못된 코드는 워커를 띄우기 전에 오류
+
+    # 두 사이트가 같은 저장 위치를 쓰면 서로의 상품을 '사라진 상품'으로 정리하므로 시작 전에 중단
+    targets = ["store_file"] + ([] if args.no_sheet else ["spreadsheet"])
+    for key in targets:
+        seen = {}
+        for profile in profiles:
+            other = seen.setdefault(profile[key], profile["code"])
+            if other != profile["code"]:
+                print(f"!!! {other}와 {profile['code']} 사이트가 같은 {key}({profile[key]})를 사용합니다. "
+                      f"site_profiles에서 사이트별로 다르게 지정해주세요.")
+                sys.exit(1)
+
+    os.makedirs("logs", exist_ok=True)
+    print(f"[{datetime.datetime.now()}] {len(codes)}개 사이트 동시 크롤링 시작: {', '.join(codes)}")
+    started = time.time()
+
+    # Playwright/asyncio 상태를 공유하지 않도록 fork 대신 spawn
+    ctx = multiprocessing.get_context("spawn")
+    workers = [
+        ctx.Process(target=run_site, args=(code, not args.no_sheet, args.resume), name=f"crawl-{code}")
+        for code in codes
+    ]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    failed = [w.name for w in workers if w.exitcode != 0]
+    print(f"\n전체 완료 ({int(time.time() - started)}초) - 성공 {len(workers) - len(failed)} / 실패 {len(failed)}")
+    if failed:
+        print(f"  실패: {', '.join(failed)} (logs/monitor_<코드>.log 확인)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+크롤러 -> 상품 레지스트리 -> 상태 저장소 / 구글 시트로 전달되는 상품 레코드.
+
+추출 결과(브라우저 JS, HTML 파서, 상품 검색 JSON - 모두 문자열 dict)는 크롤러 경계(ProductRegistry.merge)에서
+한 번만 Product로 바뀌고, 가격/PV/BV는 이때 사이트 가격 표기(site_profiles의 currency)에 맞춰 숫자로 파싱됩니다.
+이후 단계는 '원', ',' 를 다시 지우지 않고 숫자를 그대로 사용합니다.
+
+체크포인트/프로모션 캐시/샤드 워커 큐에는 경계 이전의 원본 dict가 저장되므로 형식이 바뀌지 않습니다.
+"""
+import re
+
+FIELDS = ("id", "name", "price", "status", "link", "image", "category", "sub_category", "pv", "bv")
+NUMBER_FIELDS = ("price", "pv", "bv")
+DEFAULT_CURRENCY = {"thousands": ",", "decimal": "."}
+
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+
+def parse_number(value, currency=None):
+    """
+    '45,000원' -> 45000, 'PV : 1,200' -> 1200, '1.234,50 €' (decimal=',') -> 1234.5, 숫자가 없으면 0
+    정수로 떨어지면 int, 아니면 float
+    """
+    if isinstance(value, (int, float)):
+        return value
+    currency = currency or DEFAULT_CURRENCY
+    text = str(value or "")
+    if currency["thousands"]:
+        text = text.replace(currency["thousands"], "")
+    if currency["decimal"] != ".":
+        text = text.replace(currency["decimal"], ".")
+    m = _NUMBER.search(text)
+    if not m:
+        return 0
+    number = float(m.group(0))
+    return int(number) if number.is_integer() else number
+
+
+class Product:
+    """상품 하나. events는 이 상품이 포함된 프로모션 제목 목록 (시트/저장소에는 기록되지 않음)"""
+    __slots__ = FIELDS + ("events",)
+
+    def __init__(self, id="", name="", price=0, status="", link="", image="", category="", sub_category="",
+                 pv=0, bv=0, events=None):
+        self.id = id
+        self.name = name
+        self.price = price
+        self.status = status
+        self.link = link
+        self.image = image
+        self.category = category
+        self.sub_category = sub_category
+        self.pv = pv
+        self.bv = bv
+        self.events = events if events is not None else []
+
+    @classmethod
+    def from_raw(cls, item, profile=None, pid=None):
+        """추출 결과 dict -> Product (숫자 파싱, 사이트 판매 상태 문구 -> 공통 상태)"""
+        currency = profile["currency"] if profile else None
+        labels = profile["status_labels"] if profile else {}
+        status = item.get("status") or ""
+        return cls(
+            id=item.get("id") or pid or "",
+            name=item.get("name") or "",
+            price=parse_number(item.get("price"), currency),
+            status=labels.get(status, status),
+            link=item.get("link") or "",
+            image=item.get("image") or "",
+            category=item.get("category") or "",
+            sub_category=item.get("sub_category") or "",
+            pv=parse_number(item.get("pv"), currency),
+            bv=parse_number(item.get("bv"), currency),
+            events=list(item.get("events") or []),
+        )
+
+    @classmethod
+    def from_dict(cls, data):
+        """to_dict() 결과(이미 숫자)를 다시 읽을 때 - 파싱 없음"""
+        return cls(**{f: data[f] for f in FIELDS + ("events",) if f in data})
+
+    def to_dict(self):
+        """JSON 직렬화용 dict"""
+        data = {f: getattr(self, f) for f in FIELDS}
+        data["events"] = list(self.events)
+        return data
+
+    def values(self):
+        """비교용 튜플 (events 제외)"""
+        return tuple(getattr(self, f) for f in FIELDS)
+
+    def copy(self):
+        product = Product.__new__(Product)
+        for f in FIELDS:
+            setattr(product, f, getattr(self, f))
+        product.events = list(self.events)
+        return product
+
+    def __eq__(self, other):
+        if not isinstance(other, Product):
+            return NotImplemented
+        return self.values() == other.values() and self.events == other.events
+
+    def __repr__(self):
+        return f"Product(id={self.id!r}, name={self.name!r}, price={self.price!r}, status={self.status!r})"
+
+
+def to_products(products, profile=None):
+    """{ id: dict | Product } -> { id: Product }"""
+    return {
+        pid: item if isinstance(item, Product) else Product.from_raw(item, profile, pid)
+        for pid, item in (products or {}).items()
+    }
@@ -0,0 +1,699 @@
+"""
+상품 카드 추출 규칙을 한 곳에 모은 모듈.
+
+- EXTRACTION_JS: 브라우저 컨텍스트에 init script로 한 번만 설치되는 추출 라이브러리 (window.__amwayExtract)
+  크롤러는 매번 큰 스크립트를 보내는 대신 extract_call("category", ...) 같은 짧은 호출만 evaluate 합니다.
+- parse_*: 같은 규칙을 따르는 순수 파이썬 파서 (저장된/내려받은 HTML용, 표준 라이브러리 html.parser만 사용)
+
+셀렉터/품절 문구/프로모션 목록 문구는 SELECTORS, STATUS_MARKERS, PROMOTION_MARKERS 에서만 수정하면 양쪽에 함께 반영됩니다.
+다른 국가 사이트는 site_profiles.py의 "rules"로 이 기본값의 일부를 덮어씁니다 (make_rules).
+
+브라우저 없이 추출 속도 측정:
+    python product_parser.py saved_category.html --repeat 50
+"""
+import json
+import re
+import sys
+import time
+from html.parser import HTMLParser
+
+BASE_URL = "https://www.amway.co.kr"
+PV_REGEX = re.compile(r"PV\s*:\s*([\d,]+)")
+BV_REGEX = re.compile(r"BV\s*:\s*([\d,]+)")
+
+# 상품 카드 셀렉터 (앞의 것이 없을 때 다음 것을 사용)
+# 파이썬 파서는 "tag", ".class", "tag.class", "tag[attr='value']" 형태만 지원합니다.
+SELECTORS = {
+    "card": [".product_item", ".box_product"],
+    "name": [".text_product-title", ".product_name"],
+    "price": [".text_price-data", ".price"],
+    "volume_data": ["input[name='productTealiumTagInfo']", ".js-addtocart-v2"],
+}
+# 카드 텍스트에 포함되면 해당 판매 상태로 판단 (앞에서부터 우선)
+STATUS_MARKERS = ["일시품절", "품절", "단종"]
+# 프로모션 목록의 링크 문구 규칙: include 중 하나를 포함하고 exclude는 포함하지 않아야 항목, period가 있는 줄이 기간
+PROMOTION_MARKERS = {
+    "include": ["기간 :", "프로모션"],
+    "exclude": ["진행중인", "종료된"],
+    "period": "기간 :",
+}
+
+DEFAULT_RULES = {
+    "selectors": SELECTORS,
+    "status_markers": STATUS_MARKERS,
+    "promotion_markers": PROMOTION_MARKERS,
+}
+
+
+def make_rules(overrides=None):
+    """기본 추출 규칙에 사이트별 덮어쓰기(selectors는 키 단위로 병합)를 적용"""
+    rules = dict(DEFAULT_RULES)
+    for key, value in (overrides or {}).items():
+        if key == "selectors":
+            rules["selectors"] = {**SELECTORS, **value}
+        else:
+            rules[key] = value
+    return rules
+
+
+EXTRACTOR_GLOBAL = "__amwayExtract"
+
+_EXTRACTION_JS_TEMPLATE = r"""
+(() => {
+    if (window.__EXTRACTOR__) return;
+
+    const RULES = __RULES__;
+    const SELECTORS = RULES.selectors;
+    const STATUS_MARKERS = RULES.status_markers;
+    const PROMO = RULES.promotion_markers;
+    const pvRegex = /PV\s*:\s*([\d,]+)/;
+    const bvRegex = /BV\s*:\s*([\d,]+)/;
+
+    const first = (root, selectors) => {
+        for (const sel of selectors) {
+            const el = root.querySelector(sel);
+            if (el) return el;
+        }
+        return null;
+    };
+    const absolute = (url, baseUrl) => (url && url.startsWith("/")) ? baseUrl + url : url;
+
+    const findCards = () => {
+        for (const sel of SELECTORS.card) {
+            const found = Array.from(document.querySelectorAll(sel));
+            if (found.length) return found;
+        }
+        return [];
+    };
+
+    const cardFields = (product, baseUrl) => {
+        const nameEl = first(product, SELECTORS.name);
+        const linkEl = product.querySelector("a");
+        const priceEl = first(product, SELECTORS.price);
+        const imgEl = product.querySelector("img");
+        return {
+            name: nameEl ? nameEl.innerText.trim() : "Unknown Name",
+            link: absolute(linkEl ? linkEl.getAttribute("href") : "", baseUrl) || "",
+            price: priceEl ? priceEl.innerText.trim() : "0",
+            image: absolute(imgEl ? imgEl.getAttribute("src") : "", baseUrl) || "",
+        };
+    };
+
+    const parseVolume = (raw) => {
+        if (!raw) return null;
+        const parsed = parseInt(parseFloat(raw));
+        return isNaN(parsed) ? null : String(parsed);
+    };
+
+    const volumes = (product, text) => {
+        let pv = "0";
+        let bv = "0";
+
+        const dataEl = first(product, SELECTORS.volume_data);
+        if (dataEl) {
+            pv = parseVolume(dataEl.getAttribute("data-product-point-value")) || pv;
+            bv = parseVolume(dataEl.getAttribute("data-product-business-volume")) || bv;
+        }
+
+        if (pv === "0") {
+            const match = text.match(pvRegex);
+            if (match) pv = match[1].replace(/,/g, "");
+        }
+        if (bv === "0") {
+            const match = text.match(bvRegex);
+            if (match) bv = match[1].replace(/,/g, "");
+        }
+        return {pv, bv};
+    };
+
+    window.__EXTRACTOR__ = {
+        // 카테고리 그리드 -> { id: {...} }
+        category(catName, baseUrl) {
+            const results = {};
+            findCards().forEach(product => {
+                try {
+                    const f = cardFields(product, baseUrl);
+                    const productId = f.link ? f.link.split('/').pop() : f.name;
+
+                    const text = product.innerText;
+                    const status = STATUS_MARKERS.find(marker => text.includes(marker)) || "판매중";
+                    const {pv, bv} = volumes(product, text);
+
+                    // Smart Order Handling
+                    let category = catName;
+                    if (f.name.includes("스마트 오더") || f.name.includes("스마트오더")) {
+                        category = "스마트 오더";
+                    }
+
+                    results[productId] = {
+                        "id": productId, "name": f.name, "price": f.price, "status": status,
+                        "link": f.link, "image": f.image, "category": category, "sub_category": "",
+                        "pv": pv, "bv": bv
+                    };
+                } catch (e) {}
+            });
+            return results;
+        },
+
+        // 프로모션 상세 -> { id: {...} } (상품 카드가 없으면 상품 링크만으로 최소 정보)
+        promotion(baseUrl) {
+            const results = {};
+            const cards = findCards();
+
+            if (cards.length > 0) {
+                cards.forEach(product => {
+                    try {
+                        const f = cardFields(product, baseUrl);
+                        if (!f.link || !f.link.includes("/shop/")) return;
+                        const productId = f.link.split('/').pop();
+                        const {pv, bv} = volumes(product, product.innerText);
+
+                        if (!results[productId]) {
+                            results[productId] = {
+                                "id": productId, "name": f.name, "price": f.price, "status": "진행중",
+                                "link": f.link, "image": f.image, "category": "이벤트", "sub_category": "",
+                                "pv": pv, "bv": bv
+                            };
+                        }
+                    } catch (e) {}
+                });
+            } else {
+                // Fallback: Link-only check
+                document.querySelectorAll("a[href*='/shop/']").forEach(sl => {
+                    try {
+                        const href = sl.getAttribute("href");
+                        if (href.includes("/shop/c/")) return;
+
+                        // Check if it looks like a product link (has /p/ or ends in digits)
+                        const parts = href.split('/');
+                        const lastPart = parts[parts.length - 1];
+                        if (!href.includes("/p/") && isNaN(lastPart)) return;
+
+                        const fullUrl = absolute(href, baseUrl);
+                        const productId = fullUrl.split('/').pop();
+
+                        let name = sl.innerText.trim();
+                        if (!name) {
+                            const img = sl.querySelector("img");
+                            if (img) name = img.getAttribute("alt") || "이벤트 상품";
+                        }
+                        if (!name) name = "이벤트 상품";
+
+                        if (!results[productId]) {
+                            results[productId] = {
+                                "id": productId, "name": name, "price": "0", "status": "진행중",
+                                "link": fullUrl, "image": "", "category": "이벤트", "sub_category": "",
+                                "pv": "0", "bv": "0"
+                            };
+                        }
+                    } catch (e) {}
+                });
+            }
+            return results;
+        },
+
+        // 프로모션 목록 -> [{text, url, period}]
+        promotionList(baseUrl) {
+            const results = [];
+            document.querySelectorAll('a').forEach(link => {
+                const text = link.innerText ? link.innerText.trim() : "";
+
+                if (!text || text.length < 5) return;
+                if (!PROMO.include.some(marker => text.includes(marker))) return;
+                if (PROMO.exclude.some(marker => text.includes(marker))) return;
+
+                const href = link.getAttribute('href');
+                const dataCode = link.getAttribute('data-code');
+                const noticeType = link.getAttribute('data-notice-type');
+
+                let targetUrl = null;
+                if (href && href !== "#" && !href.startsWith("javascript")) {
+                    targetUrl = absolute(href, baseUrl);
+                } else if (dataCode && noticeType) {
+                    targetUrl = `${baseUrl}/notifications/promotion/detail?notificationCode=${dataCode}&noticeType=${noticeType}&searchPromotionStatus=progress`;
+                }
+
+                if (targetUrl) {
+                    // 목록에 표시된 기간 문자열 (프로모션 캐시의 변경 판단에 사용)
+                    const periodLine = text.split('\n').find(line => line.includes(PROMO.period));
+                    results.push({
+                        text: text.split('\n')[0].trim(),
+                        url: targetUrl,
+                        period: periodLine ? periodLine.trim() : ""
+                    });
+                }
+            });
+            return results;
+        },
+
+        // 상단 카테고리 탭 -> [{name, url}]
+        categories(targetCats, baseUrl) {
+            const results = [];
+            const links = Array.from(document.querySelectorAll('a'));
+
+            targetCats.forEach(catName => {
+                try {
+                    // 1. Try exact match on text (offsetParent != null checks visibility roughly)
+                    let match = links.find(l => {
+                        const text = l.innerText ? l.innerText.trim() : "";
+                        return text === catName && l.offsetParent !== null;
+                    });
+
+                    // 2. Fallback to contains if not found
+                    if (!match) {
+                        match = links.find(l => {
+                            const text = l.innerText || "";
+                            const href = l.getAttribute('href');
+                            return text.includes(catName) && l.offsetParent !== null && href && href.includes('/shop/');
+                        });
+                    }
+
+                    if (match) {
+                        const href = match.getAttribute('href');
+                        if (href) results.push({name: catName, url: absolute(href, baseUrl)});
+                    }
+                } catch (e) {}
+            });
+            return results;
+        }
+    };
+})();
+"""
+
+
+def build_extraction_js(rules=None):
+    """추출 규칙(make_rules 결과)을 주입한 브라우저 추출 라이브러리"""
+    rules = rules or DEFAULT_RULES
+    return _EXTRACTION_JS_TEMPLATE.replace("__EXTRACTOR__", EXTRACTOR_GLOBAL) \
+        .replace("__RULES__", json.dumps(rules, ensure_ascii=False))
+
+
+EXTRACTION_JS = build_extraction_js()
+
+
+def extract_call(fn_name, *args):
+    """
+    page.evaluate 에 넘길 짧은 호출 스크립트.
+    라이브러리가 아직 없으면(init script 이전에 열린 문서 등) null을 반환하므로 호출 측에서 설치 후 재시도합니다.
+    """
+    params = ", ".join(f"a{i}" for i in range(len(args)))
+    return (f"([{params}]) => window.{EXTRACTOR_GLOBAL} "
+            f"? window.{EXTRACTOR_GLOBAL}.{fn_name}({params}) : null")
+
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+BLOCK_TAGS = {
+    "div", "p", "li", "ul", "ol", "dl", "dt", "dd", "tr", "table",
+    "h1", "h2", "h3", "h4", "h5", "h6", "section", "article", "br",
+}
+SKIP_TEXT_TAGS = {"script", "style", "noscript", "template"}
+
+
+class Node:
+    __slots__ = ("tag", "attrs", "children", "parent")
+
+    def __init__(self, tag, attrs=None, parent=None):
+        self.tag = tag
+        self.attrs = attrs or {}
+        self.children = []
+        self.parent = parent
+
+    def get(self, name, default=None):
+        return self.attrs.get(name, default)
+
+    def has_class(self, cls):
+        return cls in (self.attrs.get("class") or "").split()
+
+    def iter(self):
+        """자기 자신을 제외한 모든 하위 요소를 문서 순서대로 순회"""
+        stack = list(reversed([c for c in self.children if isinstance(c, Node)]))
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed([c for c in node.children if isinstance(c, Node)]))
+
+    def find_all(self, pred):
+        return [n for n in self.iter() if pred(n)]
+
+    def find(self, pred):
+        for n in self.iter():
+            if pred(n):
+                return n
+        return None
+
+    def text(self):
+        """innerText 근사값 (블록 요소 경계에서 줄바꿈)"""
+        parts = []
+        self._collect_text(parts)
+        text = "".join(parts)
+        lines = [" ".join(line.split()) for line in text.split("\n")]
+        return "\n".join(line for line in lines if line)
+
+    def _collect_text(self, parts):
+        for child in self.children:
+            if isinstance(child, Node):
+                if child.tag in SKIP_TEXT_TAGS:
+                    continue
+                if child.tag in BLOCK_TAGS:
+                    parts.append("\n")
+                child._collect_text(parts)
+                if child.tag in BLOCK_TAGS:
+                    parts.append("\n")
+            else:
+                parts.append(child)
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node("#document")
+        self.current = self.root
+
+    def handle_starttag(self, tag, attrs):
+        node = Node(tag, {k: (v if v is not None else "") for k, v in attrs}, self.current)
+        self.current.children.append(node)
+        if tag not in VOID_TAGS:
+            self.current = node
+
+    def handle_startendtag(self, tag, attrs):
+        node = Node(tag, {k: (v if v is not None else "") for k, v in attrs}, self.current)
+        self.current.children.append(node)
+
+    def handle_endtag(self, tag):
+        # 닫는 태그와 짝이 맞는 가장 가까운 조상까지 올라감 (잘못 닫힌 태그 허용)
+        node = self.current
+        while node is not None and node.tag != tag:
+            node = node.parent
+        if node is not None and node.parent is not None:
+            self.current = node.parent
+
+    def handle_data(self, data):
+        self.current.children.append(data)
+
+
+def parse_html(html):
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+
+def _absolute(url, base_url):
+    if url and url.startswith("/"):
+        return base_url + url
+    return url
+
+
+_SELECTOR_RE = re.compile(r"""^([\w-]*)(?:\.([\w-]+))?(?:\[([\w-]+)=['"]?([^'"\]]*)['"]?\])?$""")
+
+
+def _matcher(selector):
+    """SELECTORS의 단순 셀렉터 문자열 -> Node 판별 함수"""
+    m = _SELECTOR_RE.match(selector.strip())
+    if not m or not any(m.groups()):
+        raise ValueError(f"지원하지 않는 셀렉터: {selector}")
+    tag, cls, attr, value = m.groups()
+
+    def pred(n):
+        if tag and n.tag != tag:
+            return False
+        if cls and not n.has_class(cls):
+            return False
+        if attr and n.get(attr) != value:
+            return False
+        return True
+    return pred
+
+
+_MATCHER_CACHE = {}
+
+
+def _matchers(rules):
+    """rules의 셀렉터 -> { key: [판별 함수] } (같은 셀렉터 구성은 한 번만 컴파일)"""
+    selectors = (rules or DEFAULT_RULES)["selectors"]
+    cache_key = json.dumps(selectors, sort_keys=True)
+    if cache_key not in _MATCHER_CACHE:
+        _MATCHER_CACHE[cache_key] = {key: [_matcher(sel) for sel in sels] for key, sels in selectors.items()}
+    return _MATCHER_CACHE[cache_key]
+
+
+def _first(node, matchers):
+    for pred in matchers:
+        found = node.find(pred)
+        if found:
+            return found
+    return None
+
+
+def _parse_volume(raw):
+    try:
+        return str(int(float(raw)))
+    except (TypeError, ValueError):
+        return None
+
+
+def _extract_pv_bv(card, text, matchers):
+    pv = "0"
+    bv = "0"
+
+    data_el = _first(card, matchers["volume_data"])
+
+    if data_el:
+        pv = _parse_volume(data_el.get("data-product-point-value")) or pv
+        bv = _parse_volume(data_el.get("data-product-business-volume")) or bv
+
+    if pv == "0":
+        m = PV_REGEX.search(text)
+        if m:
+            pv = m.group(1).replace(",", "")
+    if bv == "0":
+        m = BV_REGEX.search(text)
+        if m:
+            bv = m.group(1).replace(",", "")
+    return pv, bv
+
+
+def _card_fields(card, base_url, matchers):
+    name_el = _first(card, matchers["name"])
+    name = name_el.text().strip() if name_el else "Unknown Name"
+
+    link_el = card.find(lambda n: n.tag == "a")
+    link = _absolute(link_el.get("href", "") if link_el else "", base_url)
+
+    price_el = _first(card, matchers["price"])
+    price = price_el.text().strip() if price_el else "0"
+
+    img_el = card.find(lambda n: n.tag == "img")
+    image = _absolute(img_el.get("src", "") if img_el else "", base_url)
+
+    return name, link, price, image
+
+
+def find_product_cards(root, rules=None):
+    for pred in _matchers(rules)["card"]:
+        cards = root.find_all(pred)
+        if cards:
+            return cards
+    return []
+
+
+def parse_category_products(html, cat_name, base_url=BASE_URL, rules=None):
+    """
+    카테고리 그리드 HTML -> { id: {...} }
+    EXTRACTION_JS 의 category() 와 같은 결과 형식입니다.
+    """
+    rules = rules or DEFAULT_RULES
+    matchers = _matchers(rules)
+    root = parse_html(html)
+    results = {}
+    for card in find_product_cards(root, rules):
+        try:
+            name, link, price, image = _card_fields(card, base_url, matchers)
+            product_id = link.split("/")[-1] if link else name
+
+            text = card.text()
+            status = next((marker for marker in rules["status_markers"] if marker in text), "판매중")
+
+            pv, bv = _extract_pv_bv(card, text, matchers)
+
+            category = cat_name
+            if "스마트 오더" in name or "스마트오더" in name:
+                category = "스마트 오더"
+
+            results[product_id] = {
+                "id": product_id,
+                "name": name,
+                "price": price,
+                "status": status,
+                "link": link,
+                "image": image,
+                "category": category,
+                "sub_category": "",
+                "pv": pv,
+                "bv": bv,
+            }
+        except Exception:
+            continue
+    return results
+
+
+def parse_promotion_products(html, base_url=BASE_URL, rules=None, link_fallback=True):
+    """
+    프로모션 상세 HTML -> { id: {...} }
+    상품 카드가 없으면 상품 링크만으로 최소 정보를 만듭니다 (EXTRACTION_JS 의 promotion() 과 동일).
+    link_fallback=False: 카드가 없으면 빈 결과 (정적 HTML에서는 헤더/추천 영역 링크까지 상품으로 잡히므로)
+    """
+    matchers = _matchers(rules)
+    root = parse_html(html)
+    results = {}
+    cards = find_product_cards(root, rules)
+
+    if cards:
+        for card in cards:
+            try:
+                name, link, price, image = _card_fields(card, base_url, matchers)
+                if not link or "/shop/" not in link:
+                    continue
+                product_id = link.split("/")[-1]
+                pv, bv = _extract_pv_bv(card, card.text(), matchers)
+
+                if product_id not in results:
+                    results[product_id] = {
+                        "id": product_id,
+                        "name": name,
+                        "price": price,
+                        "status": "진행중",
+                        "link": link,
+                        "image": image,
+                        "category": "이벤트",
+                        "sub_category": "",
+                        "pv": pv,
+                        "bv": bv,
+                    }
+            except Exception:
+                continue
+    elif link_fallback:
+        for a in root.find_all(lambda n: n.tag == "a" and "/shop/" in n.get("href", "")):
+            try:
+                href = a.get("href", "")
+                if "/shop/c/" in href:
+                    continue
+                last_part = href.split("/")[-1]
+                if "/p/" not in href and not last_part.isdigit():
+                    continue
+
+                full_url = _absolute(href, base_url)
+                product_id = full_url.split("/")[-1]
+
+                name = a.text().strip()
+                if not name:
+                    img = a.find(lambda n: n.tag == "img")
+                    if img:
+                        name = img.get("alt") or "이벤트 상품"
+                if not name:
+                    name = "이벤트 상품"
+
+                if product_id not in results:
+                    results[product_id] = {
+                        "id": product_id,
+                        "name": name,
+                        "price": "0",
+                        "status": "진행중",
+                        "link": full_url,
+                        "image": "",
+                        "category": "이벤트",
+                        "sub_category": "",
+                        "pv": "0",
+                        "bv": "0",
+                    }
+            except Exception:
+                continue
+    return results
+
+
+def parse_anchors(html, base_url=BASE_URL):
+    """모든 <a> 태그를 [{text, href, attrs}] 형태로 반환 (href는 절대 경로로 변환하지 않음)"""
+    root = parse_html(html)
+    return [
+        {"text": a.text(), "href": a.get("href", ""), "attrs": a.attrs}
+        for a in root.find_all(lambda n: n.tag == "a")
+    ]
+
+
+def match_category_links(anchors, target_cats, base_url=BASE_URL):
+    """EXTRACTION_JS 의 categories() 와 같은 규칙(정확히 일치 -> 포함 + /shop/ 링크)으로 카테고리 URL을 찾습니다."""
+    results = []
+    for cat_name in target_cats:
+        match = next((a for a in anchors if a["text"].strip() == cat_name), None)
+        if not match:
+            match = next(
+                (a for a in anchors if cat_name in a["text"] and "/shop/" in (a["href"] or "")),
+                None,
+            )
+        if match and match["href"]:
+            results.append({"name": cat_name, "url": _absolute(match["href"], base_url)})
+    return results
+
+
+def match_promotion_links(anchors, base_url=BASE_URL, rules=None):
+    """EXTRACTION_JS 의 promotionList() 와 같은 규칙으로 프로모션 항목을 찾습니다."""
+    markers = (rules or DEFAULT_RULES)["promotion_markers"]
+    results = []
+    for a in anchors:
+        text = a["text"].strip()
+        if not text or len(text) < 5:
+            continue
+        if not any(marker in text for marker in markers["include"]):
+            continue
+        if any(marker in text for marker in markers["exclude"]):
+            continue
+
+        href = a["href"]
+        data_code = a["attrs"].get("data-code")
+        notice_type = a["attrs"].get("data-notice-type")
+
+        target_url = None
+        if href and href != "#" and not href.startswith("javascript"):
+            target_url = _absolute(href, base_url)
+        elif data_code and notice_type:
+            target_url = (
+                f"{base_url}/notifications/promotion/detail?notificationCode={data_code}"
+                f"&noticeType={notice_type}&searchPromotionStatus=progress"
+            )
+
+        if target_url:
+            period = next((line.strip() for line in text.split("\n") if markers["period"] in line), "")
+            results.append({"text": text.split("\n")[0].strip(), "url": target_url, "period": period})
+    return results
+
+
+def _benchmark(argv):
+    """저장된 HTML 파일로 파이썬 파서의 추출 속도를 측정합니다 (브라우저 불필요)."""
+    import argparse
+    parser = argparse.ArgumentParser(description="저장된 HTML로 상품 추출 속도 측정")
+    parser.add_argument("html_file")
+    parser.add_argument("--promotion", action="store_true", help="프로모션 상세 페이지 규칙으로 추출")
+    parser.add_argument("--category", default="테스트", help="카테고리 이름")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    with open(args.html_file, "r", encoding="utf-8") as f:
+        html = f.read()
+
+    products = {}
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        if args.promotion:
+            products = parse_promotion_products(html)
+        else:
+            products = parse_category_products(html, args.category)
+    per_run = (time.perf_counter() - started) / max(args.repeat, 1)
+
+    print(f"상품 {len(products)}개 / 1회 {per_run * 1000:.1f}ms "
+          f"({len(products) / per_run if per_run else 0:.0f}개/초, HTML {len(html) / 1024:.0f}KB)")
+
+
+if __name__ == "__main__":
+    _benchmark(sys.argv[1:])
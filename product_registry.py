@@ -0,0 +1,81 @@
+"""
+한 번의 크롤링 실행 동안 상품을 id 기준으로 모으는 레지스트리.
+
+같은 상품이 여러 카테고리/프로모션에 나와도 저장 단계(시트, 상태 저장소)로는
+- 처음 본 상품은 한 번만 전달하고
+- 이후 출처가 합쳐지면서 내용이 바뀐 경우에만 '갱신'으로 다시 전달합니다.
+
+병합 규칙:
+- 일반 카테고리 정보가 이벤트(프로모션) 정보보다 우선합니다. (판매 상태, 분류)
+- 비어 있거나 "0"인 값(링크만 있는 프로모션 항목 등)은 다른 출처의 값으로 채웁니다.
+- 상품이 포함된 프로모션 제목은 events 목록에 누적됩니다.
+
+추출 결과 dict는 여기서 Product로 바뀝니다 (가격/PV/BV 숫자 파싱은 상품당 한 번).
+"""
+from product import FIELDS, Product
+
+EVENT_CATEGORY = "이벤트"
+EMPTY_VALUES = ("", 0, None, "Unknown Name", "이벤트 상품")
+# 비교/전달 대상 필드 (events 제외 - 시트/저장소에는 기록되지 않는 부가 정보)
+COMPARED_FIELDS = FIELDS[1:]
+
+
+class ProductRegistry:
+    def __init__(self, profile=None):
+        """profile: 사이트 프로필 (가격 표기/판매 상태 문구). 없으면 기본 표기"""
+        self.profile = profile
+        self.products = {}
+        self.duplicates = 0
+        self.updates = 0
+
+    def __len__(self):
+        return len(self.products)
+
+    def _merge_into(self, current, item, event_title):
+        merged = current.copy()
+        from_event = item.category == EVENT_CATEGORY
+        current_is_event = current.category == EVENT_CATEGORY
+
+        if current_is_event and not from_event:
+            # 카테고리 정보가 늦게 도착: 카테고리 값을 기본으로 하고 이벤트 값으로 빈 칸만 채움
+            base, extra = item, current
+        else:
+            base, extra = current, item
+
+        for field in COMPARED_FIELDS:
+            value = getattr(base, field)
+            if value in EMPTY_VALUES and getattr(extra, field) not in EMPTY_VALUES:
+                value = getattr(extra, field)
+            setattr(merged, field, value)
+
+        if event_title and event_title not in merged.events:
+            merged.events.append(event_title)
+        return merged
+
+    def merge(self, batch, event_title=None):
+        """
+        batch: { id: dict | Product } (카테고리 또는 프로모션 하나의 결과)
+        event_title: 프로모션 결과면 프로모션 제목
+        반환: 이번에 저장 단계로 보내야 할 { id: Product } (신규 + 내용이 바뀐 상품)
+        """
+        to_emit = {}
+        for pid, raw in (batch or {}).items():
+            item = raw.copy() if isinstance(raw, Product) else Product.from_raw(raw, self.profile, pid)
+            current = self.products.get(pid)
+            if current is None:
+                merged = item
+                merged.events = [event_title] if event_title else []
+                self.products[pid] = merged
+                to_emit[pid] = merged
+                continue
+
+            self.duplicates += 1
+            merged = self._merge_into(current, item, event_title)
+            self.products[pid] = merged
+            if merged.values() != current.values():
+                self.updates += 1
+                to_emit[pid] = merged
+        return to_emit
+
+    def report(self):
+        print(f"  [상품 레지스트리] 고유 상품 {len(self.products)}개 / 중복 병합 {self.duplicates}건 / 갱신 전달 {self.updates}건")
@@ -1,9 +1,9 @@
 import sys
 import time
-import subprocess
 import os
 import datetime
 import asyncio
+import argparse
 
 class Logger:
     """화면 출력과 파일 저장을 동시에 하는 로거"""
@@ -21,6 +21,14 @@ class Logger:
         self.log.flush()
 
 def main():
+    parser = argparse.ArgumentParser(description='Amway 통합 자동화')
+    parser.add_argument('--resume', action='store_true',
+                        help='직전 크롤링이 중간에 끝났다면 완료된 카테고리/프로모션은 건너뛰고 이어서 진행')
+    parser.add_argument('--site', help='사이트 코드 (site_profiles.py, 기본값: CRAWL_SITE 또는 kr)')
+    parser.add_argument('--shards', type=int,
+                        help='크롤링 워커 프로세스 수 (각자 브라우저 실행, 기본값: CRAWL_SHARDS 또는 1)')
+    args = parser.parse_args()
+
     # 로그 디렉토리 생성
     if not os.path.exists("logs"):
         os.makedirs("logs")
@@ -46,6 +54,8 @@ def main():
         # 의존성이 없으면 여기서 에러 발생
         import amway_full_crawler
         from sync_to_sheet import SheetManager
+        from crawl_store import CrawlStore
+        from site_profiles import get_profile
     except ImportError as e:
         print(f"\n!!! 필수 모듈을 불러올 수 없습니다: {e}")
         print("필요한 패키지가 설치되었는지 확인해주세요.")
@@ -54,10 +64,12 @@ def main():
         print(f"  {sys.executable} -m playwright install")
         sys.exit(1)
 
+    profile = get_profile(args.site)
+
     # 1. 시트 매니저 초기화 (연결 및 기존 데이터 삭제)
     print("\n>>> [1/3] 구글 시트 연결 및 초기화...")
     try:
-        sheet_manager = SheetManager()
+        sheet_manager = SheetManager(spreadsheet_name=profile["spreadsheet"])
     except Exception as e:
         print(f"\n!!! 시트 연결 실패: {e}")
         print("service_account.json 파일을 확인해주세요.")
@@ -66,10 +78,15 @@ def main():
     # 2. 크롤링 실행 (콜백으로 시트 저장 함수 전달)
     print("\n>>> [2/3] 전체 상품 크롤링 시작 (실시간 저장)...")
     start_time = time.time()
+
+    # 상품 상태/이력 저장소 (SQLite)
+    store = CrawlStore(profile["store_file"])
     
     try:
         # sheet_manager.append_data 함수를 콜백으로 넘김
-        asyncio.run(amway_full_crawler.run_full_crawl(data_callback=sheet_manager.append_data))
+        asyncio.run(amway_full_crawler.run_full_crawl(
+            data_callback=sheet_manager.append_data, store=store, resume=args.resume, profile=profile,
+            shards=args.shards))
             
     except Exception as e:
         print(f"\n!!! 크롤링 중 오류 발생: {e}")
@@ -79,27 +96,29 @@ def main():
     # 변경 사항 리포트 생성
     print("\n>>> 크롤링 데이터 정리 및 리포트 생성...")
     try:
-        sheet_manager.finalize_and_report_changes()
+        # 직전 완료 실행과 상품 id 기준으로 비교 (최초 실행이면 None -> 시트 스냅샷 기준 비교)
+        sheet_manager.finalize_and_report_changes(store_changes=store.run_changes())
     except Exception as e:
         print(f"!!! 변경 내역 기록 중 오류: {e}")
 
     # 3. AI 태그 채우기 (main.py)
-    print("\n>>> [3/3] AI 빈칸 채우기 (main.py 실행)...")
-    if os.path.exists("main.py"):
+    # 같은 프로세스에서 실행: 시트 연결과 방금 쓴 행 색인을 그대로 넘겨 인증/시트 읽기를 다시 하지 않음
+    print("\n>>> [3/3] AI 빈칸 채우기 (main.py)...")
+    # main.py는 import 시점에 .env를 읽고 AI 클라이언트를 만들므로, 설정 오류도 여기서 잡아 크롤링 결과와 무관하게 계속 진행
+    try:
+        import main as ai_main
+    except Exception as e:
+        print(f"   -> AI 모듈을 불러올 수 없습니다: {e} (AI 채우기 건너뜀)")
+        print("      현재 폴더에 main.py 파일이 있는지, 패키지 설치와 .env의 AI 설정(API 키 등)을 확인해주세요.")
+    else:
         try:
-            print("   -> main.py 실행 시작...")
-            # main.py 실행 (출력을 실시간으로 보여줌)
-            result = subprocess.run([sys.executable, "main.py"], check=False)
-            
-            if result.returncode == 0:
-                print("   -> AI 작업 완료.")
-            else:
-                print(f"   !!! AI 작업 중 오류 발생 (종료 코드: {result.returncode})")
+            ai_main.run_stage(sheet_manager)
+            print("   -> AI 작업 완료.")
         except Exception as e:
-            print(f"   !!! main.py 실행 실패: {e}")
-    else:
-        print("   -> 'main.py' 파일을 찾을 수 없습니다. (AI 채우기 건너뜀)")
-        print("      현재 폴더에 main.py 파일이 있는지 확인해주세요.")
+            print(f"   !!! AI 작업 중 오류 발생: {e}")
+
+    # 시트 사본에 쓴 뒤의 수정 시각을 한 번만 기록하고 닫음
+    sheet_manager.close()
 
     elapsed_total = time.time() - start_time
     
@@ -0,0 +1,110 @@
+"""
+구글 시트 클라이언트 공용 생성기 (sync_to_sheet.SheetManager, main.py, event_sync.py, daemon.py 공통).
+
+각 진입점이 따로 Credentials + gspread.authorize를 만들면 실행할 때마다 토큰 교환과 TLS 연결을 새로 합니다.
+get_client()는
+- 프로세스 안에서 gspread 클라이언트 하나를 공유하고 (run_all.py의 크롤링 -> AI 단계가 같은 연결 사용)
+- HTTP 세션에 커넥션 풀(keep-alive)을 붙여 같은 호스트로의 연결을 재사용하며
+- 액세스 토큰을 디스크(cache/google_token.json)에 저장해, 만료가 가깝지 않으면 다음 실행에서도 토큰 교환 없이 그대로 씁니다.
+"""
+import atexit
+import datetime
+import json
+import os
+import threading
+
+import gspread
+from google.auth.transport.requests import Request
+from google.oauth2.service_account import Credentials
+from requests.adapters import HTTPAdapter
+
+SCOPES = [
+    'https://www.googleapis.com/auth/spreadsheets',
+    'https://www.googleapis.com/auth/drive'
+]
+
+SERVICE_ACCOUNT_FILE = 'service_account.json'
+
+SHEET_TOKEN_CACHE = os.environ.get("SHEET_TOKEN_CACHE", os.path.join("cache", "google_token.json"))
+# 만료까지 이 시간(초)보다 적게 남은 토큰은 재사용하지 않음
+TOKEN_REFRESH_MARGIN = int(os.environ.get("SHEET_TOKEN_REFRESH_MARGIN", "300"))
+SHEET_HTTP_POOL_SIZE = int(os.environ.get("SHEET_HTTP_POOL_SIZE", "10"))
+
+_client = None
+_lock = threading.Lock()
+
+
+def _utcnow():
+    # google-auth와 같은 형식 (tzinfo 없는 UTC)
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def _load_cached_token(creds, path=SHEET_TOKEN_CACHE):
+    """저장해 둔 토큰이 같은 계정/권한이고 만료가 충분히 남았으면 creds에 넣고 True"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached["account"] != creds.service_account_email or cached["scopes"] != list(SCOPES):
+            return False
+        expiry = datetime.datetime.fromisoformat(cached["expiry"])
+    except (OSError, ValueError, KeyError):
+        return False
+    if (expiry - _utcnow()).total_seconds() <= TOKEN_REFRESH_MARGIN:
+        return False
+    creds.token = cached["token"]
+    creds.expiry = expiry
+    return True
+
+
+def _save_token(creds, path=SHEET_TOKEN_CACHE):
+    if not creds.token or not creds.expiry:
+        return
+    try:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        # 액세스 토큰이므로 소유자만 읽을 수 있게
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({
+                "account": creds.service_account_email,
+                "scopes": list(SCOPES),
+                "token": creds.token,
+                "expiry": creds.expiry.isoformat(),
+            }, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"  (구글 토큰 캐시 저장 실패: {e})")
+
+
+def _http_session(gc):
+    """gspread 클라이언트가 쓰는 requests 세션 (gspread 6: http_client.session / 5: session)"""
+    http_client = getattr(gc, "http_client", None)
+    return http_client.session if http_client is not None else gc.session
+
+
+def get_client(service_account_file=SERVICE_ACCOUNT_FILE):
+    """프로세스 공용 gspread 클라이언트 (처음 호출할 때 한 번만 인증)"""
+    global _client
+    with _lock:
+        if _client is not None:
+            return _client
+
+        creds = Credentials.from_service_account_file(service_account_file, scopes=SCOPES)
+        gc = gspread.authorize(creds)
+
+        session = _http_session(gc)
+        adapter = HTTPAdapter(pool_connections=SHEET_HTTP_POOL_SIZE, pool_maxsize=SHEET_HTTP_POOL_SIZE)
+        session.mount("https://", adapter)
+
+        if _load_cached_token(creds):
+            print("  (저장된 구글 액세스 토큰 사용)")
+        else:
+            # AuthorizedSession으로 토큰을 요청하면 다시 인증을 시도하므로 별도 요청 객체 사용
+            creds.refresh(Request())
+            _save_token(creds)
+
+        # 실행 중에 자동 갱신된 토큰도 다음 실행에서 쓰도록 종료 시 저장
+        atexit.register(_save_token, creds)
+        _client = gc
+        return gc
@@ -0,0 +1,244 @@
+"""
+'통합DB' 워크시트의 로컬 사본 (SQLite).
+
+시트가 커질수록 SheetManager(D6:O), main.py(D6:K), event_sync.py(전체)가 시작할 때마다 시트 전체를 읽는 데
+몇 분씩 걸립니다. SheetMirror는 워크시트 전체 값을 행 단위로 저장하고, 스프레드시트의 Drive modifiedTime을 함께 기록해 둡니다.
+값은 읽는 쪽이 원래 쓰던 렌더링으로 저장합니다 (SheetManager/main.py: FORMULA, event_sync.py: FORMATTED_VALUE).
+렌더링마다 사본이 따로 있습니다.
+
+- 시작 시: modifiedTime 한 번만 조회 -> 기록과 같으면 로컬 사본에서 바로 읽고, 다르면(누가 시트를 고쳤으면) 전체를 다시 읽음
+- 우리 프로그램이 쓸 때: record_write / record_clear로 사본도 같이 고치고, 실행을 마칠 때(close) 쓴 뒤의 modifiedTime을
+  한 번만 조회해 기록 (그래서 바로 다음 실행도 전체를 다시 읽지 않고, 쓰기마다 Drive API를 부르지도 않음)
+
+modifiedTime은 스프레드시트 단위라 '변경내역' 시트에 행을 추가해도 바뀝니다. 다른 워크시트에 쓴 뒤에도 touch()로 알려 둡니다.
+우리가 쓰는 도중 사람이 같은 시트를 고치면 그 변경은 사본에 반영되지 않을 수 있으므로,
+SHEET_MIRROR_MAX_AGE_HOURS가 지나면 modifiedTime과 관계없이 전체를 다시 읽습니다.
+"""
+import datetime
+import json
+import os
+import re
+import sqlite3
+import threading
+
+SHEET_MIRROR_ENABLED = os.environ.get("SHEET_MIRROR", "1") != "0"
+SHEET_MIRROR_DB = os.environ.get("SHEET_MIRROR_DB", os.path.join("cache", "sheet_mirror.db"))
+SHEET_MIRROR_MAX_AGE_HOURS = float(os.environ.get("SHEET_MIRROR_MAX_AGE_HOURS", "24"))
+
+_A1 = re.compile(r"^(?:'((?:[^']|'')*)'!|[^!]*!)?([A-Z]*)(\d*)(?::([A-Z]*)(\d*))?$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS mirrors (
+    spreadsheet_id TEXT NOT NULL,
+    worksheet_id TEXT NOT NULL,
+    modified_time TEXT,
+    loaded_at TEXT NOT NULL,
+    PRIMARY KEY (spreadsheet_id, worksheet_id)
+);
+CREATE TABLE IF NOT EXISTS mirror_rows (
+    spreadsheet_id TEXT NOT NULL,
+    worksheet_id TEXT NOT NULL,
+    row INTEGER NOT NULL,
+    cells TEXT NOT NULL,
+    PRIMARY KEY (spreadsheet_id, worksheet_id, row)
+);
+"""
+
+
+def _now():
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+
+def _col_index(letters):
+    """'A' -> 0, 'Z' -> 25, 'AA' -> 26"""
+    index = 0
+    for ch in letters:
+        index = index * 26 + (ord(ch) - ord("A") + 1)
+    return index - 1
+
+
+def parse_range(range_name):
+    """
+    'D6:O' / 'A1:Z10' / "'통합DB'!F7" -> (시작 행, 시작 열, 끝 행, 끝 열)
+    행/열은 1 / 0부터, 끝이 열려 있으면 None
+    """
+    m = _A1.match(range_name.strip())
+    if not m:
+        raise ValueError(f"지원하지 않는 범위: {range_name}")
+    c1, r1, c2, r2 = m.group(2), m.group(3), m.group(4), m.group(5)
+    start_row = int(r1) if r1 else 1
+    start_col = _col_index(c1) if c1 else 0
+    if m.group(4) is None and m.group(5) is None:
+        # 'F7' 같은 한 칸
+        return start_row, start_col, start_row, start_col
+    end_row = int(r2) if r2 else None
+    end_col = _col_index(c2) if c2 else None
+    return start_row, start_col, end_row, end_col
+
+
+def _stored_value(value):
+    """USER_ENTERED로 쓴 값 -> FORMULA 렌더링으로 다시 읽었을 때의 값 (앞의 '는 텍스트 표시일 뿐 값에 남지 않음)"""
+    if isinstance(value, str) and value.startswith("'"):
+        return value[1:]
+    return value
+
+
+class SheetMirror:
+    def __init__(self, spreadsheet, worksheet, path=SHEET_MIRROR_DB, max_age_hours=SHEET_MIRROR_MAX_AGE_HOURS,
+                 value_render_option="FORMULA"):
+        self.sh = spreadsheet
+        self.worksheet = worksheet
+        self.value_render_option = value_render_option
+        self.key = (str(spreadsheet.id), f"{worksheet.id}:{value_render_option}")
+        self.max_age_hours = max_age_hours
+        self.grid = None  # 행 번호 -> [A, B, C ...]
+        # 우리가 쓴 뒤 아직 modifiedTime을 기록하지 않았는지 (close에서 한 번만 조회)
+        self.written = False
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def remote_modified_time(self):
+        """스프레드시트의 Drive modifiedTime (조회 실패 시 None)"""
+        try:
+            return self.sh.get_lastUpdateTime()
+        except Exception as e:
+            print(f"  (시트 수정 시각 조회 실패: {e})")
+            return None
+
+    def load(self):
+        """로컬 사본이 최신이면 그대로, 아니면 시트 전체를 다시 읽어 저장. 반환: 로컬 사본을 썼는지"""
+        with self._lock:
+            if self.grid is not None:
+                return True
+
+            remote = self.remote_modified_time()
+            row = self.conn.execute(
+                "SELECT modified_time, loaded_at FROM mirrors WHERE spreadsheet_id = ? AND worksheet_id = ?",
+                self.key).fetchone()
+            if remote and row and row[0] == remote:
+                age = datetime.datetime.now() - datetime.datetime.fromisoformat(row[1])
+                if self.max_age_hours <= 0 or age.total_seconds() <= self.max_age_hours * 3600:
+                    self.grid = {
+                        r: json.loads(cells) for r, cells in self.conn.execute(
+                            "SELECT row, cells FROM mirror_rows WHERE spreadsheet_id = ? AND worksheet_id = ?",
+                            self.key)
+                    }
+                    print(f"  [시트 사본] 시트 변경 없음 ({remote}) -> 로컬 사본 사용 ({len(self.grid)}행)")
+                    return True
+
+            print("  [시트 사본] 시트가 바뀌었거나 사본이 없음 -> 전체 읽기")
+            values = self.worksheet.get(value_render_option=self.value_render_option)
+            self.grid = {n: list(cells) for n, cells in enumerate(values, start=1) if cells}
+            with self.conn:
+                self.conn.execute("DELETE FROM mirror_rows WHERE spreadsheet_id = ? AND worksheet_id = ?", self.key)
+                self.conn.executemany(
+                    "INSERT INTO mirror_rows (spreadsheet_id, worksheet_id, row, cells) VALUES (?, ?, ?, ?)",
+                    [(*self.key, n, json.dumps(cells, ensure_ascii=False)) for n, cells in self.grid.items()])
+                self._save_revision(remote, loaded=True)
+            return False
+
+    def get(self, range_name):
+        """worksheet.get(range_name)처럼 [[값...]] 반환 (행 끝의 빈칸, 범위 끝의 빈 행은 생략)"""
+        self.load()
+        start_row, start_col, end_row, end_col = parse_range(range_name)
+        with self._lock:
+            last_row = max(self.grid, default=0)
+            if end_row is not None:
+                last_row = min(last_row, end_row)
+            result = []
+            for n in range(start_row, last_row + 1):
+                cells = self.grid.get(n, [])
+                cells = cells[start_col:] if end_col is None else cells[start_col:end_col + 1]
+                while cells and cells[-1] in ("", None):
+                    cells = cells[:-1]
+                result.append(list(cells))
+        while result and not result[-1]:
+            result.pop()
+        return result
+
+    def record_write(self, data):
+        """
+        우리가 시트에 쓴 내용 반영. data: batch_update / values_batch_update의 [{'range', 'values'}]
+        (범위 앞의 '시트이름'! 은 무시 - 이 사본의 워크시트에 쓴 것만 넘길 것)
+        """
+        with self._lock:
+            if self.grid is None:
+                return
+            changed = set()
+            for d in data:
+                start_row, start_col, _, _ = parse_range(d["range"])
+                for i, values in enumerate(d["values"]):
+                    n = start_row + i
+                    cells = self.grid.setdefault(n, [])
+                    if len(cells) < start_col + len(values):
+                        cells.extend([""] * (start_col + len(values) - len(cells)))
+                    for j, value in enumerate(values):
+                        cells[start_col + j] = _stored_value(value)
+                    changed.add(n)
+            self._save_rows(changed)
+        self.touch()
+
+    def record_clear(self, ranges):
+        """우리가 batch_clear로 비운 범위 반영"""
+        with self._lock:
+            if self.grid is None:
+                return
+            changed = set()
+            for range_name in ranges:
+                start_row, start_col, end_row, end_col = parse_range(range_name)
+                last_row = max(self.grid, default=0) if end_row is None else end_row
+                for n in range(start_row, last_row + 1):
+                    cells = self.grid.get(n)
+                    if not cells:
+                        continue
+                    stop = len(cells) if end_col is None else min(end_col + 1, len(cells))
+                    for j in range(start_col, stop):
+                        cells[j] = ""
+                    changed.add(n)
+            self._save_rows(changed)
+        self.touch()
+
+    def touch(self):
+        """우리가 시트(다른 워크시트 포함)에 썼음을 표시. modifiedTime은 sync_revision/close에서 한 번만 조회"""
+        with self._lock:
+            self.written = True
+
+    def sync_revision(self):
+        """우리가 쓴 뒤의 modifiedTime을 기록 (다음 실행이 자기 쓰기 때문에 전체를 다시 읽지 않도록)"""
+        with self._lock:
+            if self.grid is None or not self.written:
+                return
+            with self.conn:
+                self._save_revision(self.remote_modified_time())
+            self.written = False
+
+    def _save_rows(self, rows):
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO mirror_rows (spreadsheet_id, worksheet_id, row, cells) VALUES (?, ?, ?, ?)",
+                [(*self.key, n, json.dumps(self.grid[n], ensure_ascii=False)) for n in rows])
+
+    def _save_revision(self, modified_time, loaded=False):
+        # 조회에 실패했으면(None) 다음 실행에서 전체를 다시 읽게 됨
+        if loaded:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO mirrors (spreadsheet_id, worksheet_id, modified_time, loaded_at)"
+                " VALUES (?, ?, ?, ?)", (*self.key, modified_time, _now()))
+        else:
+            self.conn.execute(
+                "UPDATE mirrors SET modified_time = ? WHERE spreadsheet_id = ? AND worksheet_id = ?",
+                (modified_time, *self.key))
+
+    def close(self):
+        with self._lock:
+            try:
+                self.sync_revision()
+            finally:
+                self.conn.close()
@@ -0,0 +1,74 @@
+"""
+국가별 사이트 설정 (기본 URL, 카테고리 탭 이름, 추출 규칙, 가격 표기, 저장 위치).
+
+크롤러/HTTP 엔진/시트 동기화는 이 프로필만 보고 동작하므로, 사이트를 추가할 때 코드를 고칠 필요가 없습니다.
+- 코드에 추가: 아래 SITE_PROFILES에 항목 추가
+- 파일로 추가: CRAWL_SITE_PROFILES_FILE(기본 site_profiles.json)에 { "코드": {...} } 형식으로 작성
+  (없는 키는 DEFAULT_PROFILE 값을 사용하며, rules는 product_parser 기본 규칙에 덮어씁니다)
+
+CRAWL_SITE(기본 kr)로 run_all.py / amway_full_crawler.py 가 사용할 사이트를 고르고,
+여러 사이트를 동시에 돌릴 때는 multi_site.py를 사용합니다.
+"""
+import json
+import os
+
+import product_parser
+from crawl_store import STORE_FILE
+
+DEFAULT_SITE = os.environ.get("CRAWL_SITE", "kr")
+SITE_PROFILES_FILE = os.environ.get("CRAWL_SITE_PROFILES_FILE", "site_profiles.json")
+
+DEFAULT_PROFILE = {
+    "base_url": "https://www.amway.co.kr",
+    # 상단 카테고리 탭 이름 (화면에 보이는 문구)
+    "categories": ["영양건강", "뷰티", "퍼스널 케어", "홈리빙", "원포원", "웰니스", "플러스 쇼핑"],
+    # 카테고리를 못 찾았을 때 사용할 전체 상품 페이지
+    "fallback_category": "전체상품",
+    # product_parser.make_rules 에 넘기는 덮어쓰기 (selectors / status_markers / promotion_markers)
+    "rules": {},
+    # 가격 표기: 천 단위 구분자, 소수점 기호 (product.parse_number)
+    "currency": {"thousands": ",", "decimal": "."},
+    # 사이트 판매 상태 문구 -> 시트/저장소에서 쓰는 공통 상태 (예: {"在庫切れ": "품절"})
+    "status_labels": {},
+    # 결과 저장 위치
+    "spreadsheet": "통합DB",
+    "store_file": STORE_FILE,
+    # 상태 저장소가 비어 있을 때 한 번 가져올 예전 JSON 덤프
+    "legacy_json_file": None,
+}
+
+SITE_PROFILES = {
+    "kr": {
+        "legacy_json_file": "amway_products_full.json",
+    },
+}
+
+
+def _load_file_profiles(path=SITE_PROFILES_FILE):
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def get_profile(code=None):
+    """사이트 코드 -> 완성된 프로필 dict (rules는 make_rules 적용 결과)"""
+    code = code or DEFAULT_SITE
+    profiles = {**SITE_PROFILES, **_load_file_profiles()}
+    if code not in profiles:
+        raise KeyError(f"알 수 없는 사이트 코드: {code} (사용 가능: {', '.join(sorted(profiles))})")
+
+    profile = {**DEFAULT_PROFILE, **profiles[code], "code": code}
+    if code != "kr" and "store_file" not in profiles[code]:
+        # 사이트마다 별도 상태 저장소
+        profile["store_file"] = f"amway_crawl_state_{code}.db"
+    if code != "kr" and "spreadsheet" not in profiles[code]:
+        # 사이트마다 별도 스프레드시트 (같은 시트를 쓰면 서로의 행을 '사라진 상품'으로 지움)
+        profile["spreadsheet"] = f"{DEFAULT_PROFILE['spreadsheet']}_{code}"
+    profile["base_url"] = profile["base_url"].rstrip("/")
+    profile["rules"] = product_parser.make_rules(profile["rules"])
+    return profile
+
+
+def available_sites():
+    return sorted({**SITE_PROFILES, **_load_file_profiles()})
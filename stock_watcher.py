@@ -0,0 +1,130 @@
+"""
+이미 알고 있는 상품의 판매 상태(품절/일시품절/판매중)만 빠르게 확인하는 재고 감시 모드.
+
+전체 크롤링(브라우저 렌더링, 프로모션, 시트 전체 재기록) 없이
+1. 상태 저장소(amway_crawl_state.db)에서 마지막 전체 크롤링의 상품 목록을 읽고
+2. 카테고리 상품 목록 JSON을 큰 페이지 단위로 받아(카테고리당 몇 번의 요청) 상태만 비교한 뒤
+3. 상태가 바뀐 상품만 저장소와 시트의 제품명(F열, '(품절)' 표시) 칸을 고칩니다.
+
+매시간 실행 예:
+    python stock_watcher.py
+    python stock_watcher.py --dry-run   # 변경 목록만 출력
+"""
+import asyncio
+import datetime
+import os
+import time
+
+from crawl_store import CrawlStore
+from http_crawler import HttpCrawler
+from product import Product
+from site_profiles import get_profile
+
+# 상태 확인용 한 페이지 상품 수 (요청 수를 줄이기 위해 전체 크롤링보다 크게)
+STOCK_PAGE_SIZE = int(os.environ.get("STOCK_PAGE_SIZE", "100"))
+# 프로모션에서만 발견된 상품은 카테고리 목록에 없으므로 감시하지 않음
+EVENT_CATEGORY = "이벤트"
+
+
+async def fetch_current_statuses(http, categories, profile):
+    """카테고리 목록 JSON -> { id: 공통 상태 } (실패한 카테고리의 상품은 빠짐)"""
+    results = await asyncio.gather(*[
+        http.fetch_category(cat, page_size=STOCK_PAGE_SIZE) for cat in categories
+    ])
+    statuses = {}
+    for cat, products in zip(categories, results):
+        if products is None:
+            print(f"  [재고 감시] {cat['name']} 상태 확인 실패 -> 이번 확인에서 제외")
+        for pid, product in (products or {}).items():
+            statuses[pid] = Product.from_raw(product, profile, pid).status
+    return statuses
+
+
+def diff_statuses(known, current):
+    """저장된 상품과 현재 상태 비교 -> [{id, name, link, before, after}]"""
+    changes = []
+    for pid, item in known.items():
+        if item.category == EVENT_CATEGORY or pid not in current:
+            continue
+        if item.status != current[pid]:
+            changes.append({
+                "id": pid,
+                "name": item.name,
+                "link": item.link,
+                "before": item.status,
+                "after": current[pid],
+            })
+    return changes
+
+
+async def check_stock(store, profile):
+    latest = store.last_finished_run()
+    known = store.get_products(latest["run_id"]) if latest else {}
+    if not known:
+        print("저장된 상품이 없습니다. 먼저 전체 크롤링(run_all.py)을 실행하세요.")
+        return None
+
+    async with HttpCrawler(profile["base_url"], rules=profile["rules"]) as http:
+        categories = await http.discover_categories(profile["categories"])
+        if not categories:
+            print("카테고리를 찾지 못했습니다.")
+            return None
+        current = await fetch_current_statuses(http, categories, profile)
+        http.report()
+
+    print(f"  알려진 상품 {len(known)}개 중 {sum(1 for pid in known if pid in current)}개 상태 확인")
+    return diff_statuses(known, current)
+
+
+def apply_changes(store, changes, profile, sheet_manager=None):
+    """저장소 상태 갱신 + 시트 제품명(F열) 칸 수정 + '변경내역' 기록"""
+    from sync_to_sheet import SheetManager, display_name
+
+    store.update_statuses({c["id"]: c["after"] for c in changes})
+
+    if sheet_manager is None:
+        # 몇 개 열만 읽으면 되므로 시트 사본(수정 시각이 바뀌면 시트 전체를 다시 읽음)은 쓰지 않음
+        sheet_manager = SheetManager(load_snapshot=False, spreadsheet_name=profile["spreadsheet"], use_mirror=False)
+    # 행은 O열 상품 id로 찾음 (id가 아직 없는 예전 행만 링크로)
+    sheet_manager.update_names_by_id(
+        {c["id"]: display_name(c["name"], c["after"]) for c in changes},
+        links_by_id={c["id"]: c["link"] for c in changes},
+    )
+
+    today = time.strftime("%Y-%m-%d %H:%M")
+    sheet_manager.append_history([
+        [today, "상태변경", c["name"], "판매 상태가 변경됨 (재고 감시)", c["before"], c["after"]]
+        for c in changes
+    ])
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description='Amway 재고 상태 감시 (가벼운 모드)')
+    parser.add_argument('--dry-run', action='store_true', help='시트/저장소를 고치지 않고 변경 목록만 출력')
+    parser.add_argument('--site', help='사이트 코드 (site_profiles.py, 기본값: CRAWL_SITE 또는 kr)')
+    args = parser.parse_args()
+
+    profile = get_profile(args.site)
+    print(f"[{datetime.datetime.now()}] 재고 상태 확인 시작 (site={profile['code']})")
+    started = time.time()
+
+    store = CrawlStore(profile["store_file"])
+    try:
+        changes = asyncio.run(check_stock(store, profile))
+        if changes is None:
+            return
+
+        for c in changes:
+            print(f"  - {c['name']}: {c['before']} -> {c['after']}")
+        print(f"  상태 변경 {len(changes)}건")
+
+        if changes and not args.dry_run:
+            apply_changes(store, changes, profile)
+    finally:
+        store.close()
+        print(f"재고 확인 완료 ({time.time() - started:.1f}초)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,97 @@
-import gspread
 import time
 import random
-from gspread.exceptions import APIError
-from google.oauth2.service_account import Credentials
+import threading
 import os
 
-# 구글 시트 설정
-SCOPES = [
-    'https://www.googleapis.com/auth/spreadsheets',
-    'https://www.googleapis.com/auth/drive'
-]
+from product import parse_number
+from sheet_client import get_client
+from sheet_mirror import SHEET_MIRROR_ENABLED, SheetMirror, parse_range
+
+SOLD_OUT_STATUSES = ["일시품절", "품절"]
+SOLD_OUT_SUFFIX = "(품절)"
+
+# 상품 데이터 영역: 6행부터, D~O열 (O열: 숨긴 상품 id 열 - 이름/품절 표시/순서가 바뀌어도 같은 상품의 행을 찾는 키)
+START_ROW = 6
+COLUMNS = "DEFGHIJKLMNO"
+MAX_ROW = 5000
+ID_COL = COLUMNS.index("O")
+ID_HEADER = "상품ID"
+
+# 쓰기 버퍼: 크롤러 묶음마다 바로 쓰지 않고 모아서 한 번의 values_batch_update로 전송
+# 다음 중 하나라도 넘으면 즉시 전송 (행 수 / 대략적인 전송 크기(바이트) / 첫 항목이 버퍼에 들어온 뒤 경과 시간(초))
+SHEET_FLUSH_ROWS = int(os.environ.get("SHEET_FLUSH_ROWS", "300"))
+SHEET_FLUSH_BYTES = int(os.environ.get("SHEET_FLUSH_BYTES", str(1024 * 1024)))
+SHEET_FLUSH_SECONDS = float(os.environ.get("SHEET_FLUSH_SECONDS", "10"))
+
+
+def display_name(name, status):
+    """시트 F열에 쓰는 제품명 (품절/일시품절이면 '(품절)' 표시, 판매 재개면 표시 제거)"""
+    if status in SOLD_OUT_STATUSES:
+        if SOLD_OUT_SUFFIX not in name:
+            return f"{name} {SOLD_OUT_SUFFIX}"
+        return name
+    return name.replace(f" {SOLD_OUT_SUFFIX}", "").replace(SOLD_OUT_SUFFIX, "").strip()
+
+
+def _same_cell(old, new):
+    """시트에 있는 값(FORMULA 렌더링)과 새로 쓸 값이 같은지 (숫자는 '45,000' / 45000 같은 표기 차이 무시)"""
+    if old == new:
+        return True
+    if isinstance(new, (int, float)):
+        return str(old).strip() != "" and parse_number(old) == new
+    if new.startswith("'"):
+        # USER_ENTERED에서 앞의 '는 '텍스트로 저장' 표시일 뿐 값에는 남지 않음
+        new = new[1:]
+    return str(old).strip() == new.strip()
+
+
+def _row_id(row):
+    """행의 O열 상품 id (문자열)"""
+    return str(row[ID_COL]).lstrip("'").strip()
+
+
+def _merge_spans(cells):
+    """
+    cells: [(행, 시작 열, 끝 열, [값...])] -> batch_update용 [{'range', 'values'}]
+    같은 열 구간이 연속된 행이면 한 범위로 합칩니다. (새 상품 여러 행 -> D{a}:N{b} 하나)
+    """
+    blocks = []
+    for row_num, c1, c2, values in sorted(cells, key=lambda c: (c[1], c[2], c[0])):
+        last = blocks[-1] if blocks else None
+        if last and last["cols"] == (c1, c2) and last["end"] == row_num - 1:
+            last["values"].append(values)
+            last["end"] = row_num
+        else:
+            blocks.append({"cols": (c1, c2), "start": row_num, "end": row_num, "values": [values]})
+    data = []
+    for b in blocks:
+        c1, c2 = COLUMNS[b["cols"][0]], COLUMNS[b["cols"][1]]
+        if (c1, b["start"]) == (c2, b["end"]):
+            range_str = f"{c1}{b['start']}"
+        else:
+            range_str = f"{c1}{b['start']}:{c2}{b['end']}"
+        data.append({"range": range_str, "values": b["values"]})
+    return data
 
-SERVICE_ACCOUNT_FILE = 'service_account.json'
 
 class SheetManager:
-    def __init__(self):
+    def __init__(self, gc=None, load_snapshot=True, spreadsheet_name="통합DB", use_mirror=SHEET_MIRROR_ENABLED):
+        """
+        gc: 이미 인증된 gspread 클라이언트 (없으면 sheet_client.get_client()의 프로세스 공용 클라이언트)
+        spreadsheet_name: 사이트 프로필의 spreadsheet (국가별로 다른 스프레드시트에 저장할 때)
+        load_snapshot: False면 기존 데이터(D6:O)를 읽지 않음 (stock_watcher처럼 일부 셀만 고칠 때)
+        use_mirror: 시트를 직접 읽는 대신 로컬 사본(sheet_mirror.py)을 사용 (시트가 바뀌었을 때만 다시 읽음)
+        """
         print("구글 시트 연결 중...")
 
         # Retry logic for connection
         max_retries = 5
         for i in range(max_retries):
             try:
-                self.creds = Credentials.from_service_account_file(SERVICE_ACCOUNT_FILE, scopes=SCOPES)
-                self.gc = gspread.authorize(self.creds)
-                self.sh = self.gc.open("통합DB")
+                if gc is None:
+                    gc = get_client()
+                self.gc = gc
+                self.sh = self.gc.open(spreadsheet_name)
                 self.worksheet = self.sh.get_worksheet(0)
                 
                 # 변경 내역 기록을 위한 시트
@@ -43,139 +111,321 @@ class SheetManager:
                 print(f"시트 연결 실패 ({e}). {wait_time:.1f}초 후 재시도 ({i+1}/{max_retries})...")
                 time.sleep(wait_time)
 
+        # 시트 로컬 사본 (읽기는 여기서, 쓰기는 시트와 사본 양쪽에)
+        self.mirror = None
+        if use_mirror:
+            try:
+                self.mirror = SheetMirror(self.sh, self.worksheet)
+            except Exception as e:
+                print(f"  (시트 사본 사용 불가: {e})")
+
         # 1. 기존 데이터 백업 및 AI 데이터(태그/설명) 보존
-        print("기존 데이터 분석 중... (데이터 양에 따라 1~2분 이상 소요될 수 있습니다. 잠시만 기다려주세요...)")
+        # 키: O열 상품 id (id가 없는 예전 행은 F열 제품명)
         self.old_data = {}
         self.ai_data = {}
+        # 행 번호 -> 그 행의 old_data 키 (append_data가 id/링크로 찾은 행의 이전 값을 찾을 때 사용)
+        self.old_keys = {}
+
+        # 2. 시트 행 색인 (변경된 칸만 쓰기 위함)
+        # 행 번호 -> 시트에 있는(또는 이번 실행에서 쓴) D~O 값
+        self.rows = {}
+        # 상품 id(O열) -> 행 번호. 이름/판매 상태/순서가 바뀌어도 같은 행을 고침
+        self.id_index = {}
+        # 안정 키(상품 링크, 없으면 제품명) -> 행 번호. O열이 아직 비어 있는 예전 행을 찾을 때 사용
+        self.row_index = {}
+        # 중간의 빈 행 (새 상품에 먼저 배정) / 마지막 사용 행 다음 행
+        self.free_rows = []
+        self.next_row = START_ROW
+        self.snapshot_loaded = False
+
+        # 3. New Data Accumulator (상품 id -> Product)
+        self.new_data_check = {}
+        # 이번 실행에서 쓴 상품 id -> 행 번호 (갱신 시 같은 행을 덮어쓰기 위함)
+        self.written_rows = {}
+        self.claimed_rows = set()
+
+        # 4. 쓰기 버퍼 (행 번호 -> 새 D~N 값 / 바뀐 열 index)
+        # append_data(파이프라인 writer 스레드)와 시간 초과 전송(타이머 스레드)이 함께 쓰므로 락으로 보호
+        self._lock = threading.RLock()
+        self._pending = {}
+        self._dirty = {}
+        self._pending_bytes = 0
+        self._flush_timer = None
+        self.flush_count = 0
+
+        if load_snapshot:
+            self._load_snapshot()
 
+    def _load_snapshot(self):
+        print("기존 데이터 분석 중... (데이터 양에 따라 1~2분 이상 소요될 수 있습니다. 잠시만 기다려주세요...)")
         try:
-            # D6:N 범위 읽기 최적화
+            # D6:O 범위 읽기 최적화
             # get_all_values() 대신 필요한 범위만 가져와서 메모리와 네트워크 대역폭을 절약합니다.
-            # D열(index 0) ~ N열(index 10)까지가 반환됩니다.
-            all_rows = self.worksheet.get('D6:N')
-            
-            for row in all_rows:
-                # D열(index 0) ~ N열(index 10)까지가 유효 데이터 범위
+            # D열(index 0) ~ O열(index 11)까지가 반환됩니다.
+            # FORMULA 렌더링: H열은 '=IMAGE(G6)' 수식, 가격/PV/BV는 표시 형식 없는 숫자로 받아 새 값과 그대로 비교
+            all_rows = self._read(f'D{START_ROW}:O')
+
+            for offset, row in enumerate(all_rows):
+                row_num = START_ROW + offset
                 # row 길이가 충분한지 확인. F열(Name)은 반환된 row의 index 2에 위치합니다.
                 if len(row) > 2 and row[2]: # F열(index 2, Name)이 존재해야 함
-                    # D6:N 기준 인덱스: D=0, E=1, F=2, ... K=7, L=8 ...
+                    row = list(row) + [""] * (len(COLUMNS) - len(row))
+                    # D6:O 기준 인덱스: D=0, E=1, F=2, ... K=7, L=8 ... O=11
                     name = row[2] # F열
+                    pid = _row_id(row) # O열 (숨김)
+                    key = pid or name
 
-                    tags = row[1] if len(row) > 1 else ""  # E열
-                    desc = row[7] if len(row) > 7 else "" # K열
+                    tags = row[1]  # E열
+                    desc = row[7]  # K열
 
-                    self.ai_data[name] = {
+                    self.ai_data[key] = {
                         "tags": tags,
                         "desc": desc
                     }
 
-                    price = row[8] if len(row) > 8 else "0" # L열
-                    self.old_data[name] = {
-                        "price": price
+                    price = row[8] or "0" # L열
+                    self.old_data[key] = {
+                        "name": name,
+                        "price": parse_number(price)
                     }
+
+                    self.rows[row_num] = row
+                    self.old_keys[row_num] = key
+                    if pid:
+                        self.id_index.setdefault(pid, row_num)
+                    self.row_index.setdefault(self._row_key(row[5], name), row_num)
+                else:
+                    self.free_rows.append(row_num)
+            self.next_row = START_ROW + len(all_rows)
+            self.snapshot_loaded = True
         except Exception as e:
             print(f"  (기존 데이터 읽기 실패: {e})")
 
-        # 2. Start Row: D6
-        self.current_row = 6
+        # 빈 시트 / 예전 시트 / 머리글을 지운 시트 모두 O열 머리글이 없으면 준비
+        self._ensure_id_column()
+
+    def _read(self, range_name):
+        """로컬 사본이 있으면 사본에서, 없으면 시트에서 (FORMULA 렌더링)"""
+        if self.mirror is not None:
+            try:
+                return self.mirror.get(range_name)
+            except Exception as e:
+                print(f"  (시트 사본 읽기 실패, 시트에서 직접 읽음: {e})")
+                self.mirror = None
+        return self.worksheet.get(range_name, value_render_option='FORMULA')
 
-        # 3. Initialization: Clear data (D~N열) -> Skip for safety (Incremental Overwrite)
-        # print("시트 초기화 중 (D6:N5000)...")
-        # try:
-        #     self.worksheet.batch_clear(["D6:N5000"])
-        # except:
-        #     print("  (초기화 건너뜀)")
+    def _mirror(self, method, *args):
+        """시트에 쓴 내용을 로컬 사본에도 반영 (실패하면 이후로는 사본을 쓰지 않음)"""
+        if self.mirror is None:
+            return
+        try:
+            getattr(self.mirror, method)(*args)
+        except Exception as e:
+            print(f"  (시트 사본 갱신 실패: {e})")
+            self.mirror = None
 
-        # 4. New Data Accumulator
-        self.new_data_check = {}
+    def _ensure_id_column(self):
+        """O열 머리글이 '상품ID'가 아니면 (읽지 못한 경우 포함) id 열을 준비합니다."""
+        try:
+            header = self._read(f"O{START_ROW - 1}")
+        except Exception as e:
+            # 시트가 O열보다 좁으면 범위 오류가 남
+            print(f"  (상품 id 열 머리글 읽기 실패: {e})")
+            header = None
+        if header and header[0] and header[0][0] == ID_HEADER:
+            return
+        self._prepare_id_column()
+
+    def _prepare_id_column(self):
+        """
+        처음 한 번: O열에 상품 id 머리글을 쓰고 열을 숨깁니다.
+        기존 행의 id는 이번 실행의 append_data가 (링크로 행을 찾은 뒤) 바뀐 칸으로 채웁니다.
+        """
+        print(f"  (상품 id 열(O열) 준비: 머리글 '{ID_HEADER}', 열 숨김)")
+        try:
+            if self.worksheet.col_count <= ID_COL + 3:
+                self.worksheet.add_cols(ID_COL + 4 - self.worksheet.col_count)
+            self.worksheet.update(range_name=f"O{START_ROW - 1}", values=[[ID_HEADER]])
+            self.worksheet.hide_columns(ID_COL + 3, ID_COL + 4) # A=0 기준 O열 (끝은 포함하지 않음)
+            self._mirror("record_write", [{'range': f"O{START_ROW - 1}", 'values': [[ID_HEADER]]}])
+        except Exception as e:
+            print(f"  (상품 id 열 준비 실패: {e})")
+
+    @staticmethod
+    def _row_key(link, name):
+        link = str(link or "").strip()
+        return link or display_name(str(name or ""), "")
+
+    def _allocate_row(self):
+        if self.free_rows:
+            return self.free_rows.pop(0)
+        row_num = self.next_row
+        self.next_row += 1
+        return row_num
 
     def append_data(self, data_dict):
         """
-        data_dict: { 'id': {info}, ... }
+        data_dict: { 'id': Product, ... }
+        상품마다 O열 상품 id(없는 예전 행은 링크)로 시트의 기존 행을 찾아, 시트 스냅샷과 달라진 칸만 쓰기 버퍼에 넣습니다.
+        시트에 없는 상품은 빈 행(없으면 마지막 행 다음)에 추가합니다.
+        이번 실행에서 이미 쓴 상품 id가 다시 오면 (크롤러 레지스트리의 '갱신') 같은 행을 고칩니다.
+        버퍼는 SHEET_FLUSH_ROWS / SHEET_FLUSH_BYTES / SHEET_FLUSH_SECONDS 중 하나를 넘으면 전송됩니다.
         """
         if not data_dict:
             return
 
-        rows = []
-        # Sort by name
-        sorted_items = sorted(data_dict.values(), key=lambda x: x['name'])
-        
-        for item in sorted_items:
-            name = item.get('name', '')
-            original_name = name
-            status = item.get('status', '')
+        with self._lock:
+            unchanged = 0
+            # Sort by name (새 상품이 추가되는 순서)
+            for pid, item in sorted(data_dict.items(), key=lambda x: x[1].name):
+                key = item.id or pid
+                row_num = self.written_rows.get(key)
+                if row_num is None:
+                    stable_key = self._row_key(item.link, item.name)
+                    row_num = self.id_index.get(key)
+                    if row_num is None:
+                        row_num = self.row_index.get(stable_key)
+                        # 링크가 같아도 다른 상품 id가 적힌 행이면 다른 상품
+                        if row_num is not None and _row_id(self.rows[row_num]) not in ("", key):
+                            row_num = None
+                    if row_num is None or row_num in self.claimed_rows:
+                        row_num = self._allocate_row()
+                    self.id_index[key] = row_num
+                    self.row_index[stable_key] = row_num
+                    self.written_rows[key] = row_num
+                    self.claimed_rows.add(row_num)
+
+                values = self._build_row(key, item, row_num)
+                # 아직 전송하지 않은 값이 있으면 그것과, 없으면 시트에 있는 값과 비교
+                old = self._pending.get(row_num) or self.rows.get(row_num)
+                if old is None:
+                    # 새 행은 D~O 전체 (연속된 새 행은 한 범위로 합쳐짐)
+                    changed = range(len(COLUMNS))
+                else:
+                    changed = [i for i, v in enumerate(values) if not _same_cell(old[i], v)]
+                if not changed:
+                    unchanged += 1
+                    continue
+
+                self._pending[row_num] = values
+                self._dirty.setdefault(row_num, set()).update(changed)
+                self._pending_bytes += sum(len(str(values[i])) for i in changed)
 
-            # [Added] Sold Out Handling
-            # If status is "일시품절" or "품절", append "(품절)" to the name
-            if status in ["일시품절", "품절"]:
-                if "(품절)" not in name:
-                    name = f"{name} (품절)"
+            if unchanged:
+                print(f"  -> {unchanged}개 상품 변경 없음 (쓰기 생략)")
 
-            if name:
-                self.new_data_check[name] = item
+            if len(self._pending) >= SHEET_FLUSH_ROWS or self._pending_bytes >= SHEET_FLUSH_BYTES:
+                self.flush()
+            elif self._pending and self._flush_timer is None:
+                # 묶음이 더 오지 않아도 SHEET_FLUSH_SECONDS 안에는 시트에 반영
+                # (데몬 스레드가 아니므로 크롤링이 오류로 끝나도 프로세스 종료 전에 한 번 전송됨)
+                self._flush_timer = threading.Timer(SHEET_FLUSH_SECONDS, self.flush)
+                self._flush_timer.start()
 
+    def flush(self):
+        """쓰기 버퍼의 바뀐 칸을 한 번의 values_batch_update로 전송. 반환: 성공 여부"""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._pending:
+                return True
+
+            cells = []
+            for row_num, cols in self._dirty.items():
+                values = self._pending[row_num]
+                # 연속된 열은 한 범위로 (예: 가격~BV -> L:N)
+                cols = sorted(cols)
+                first = last = cols[0]
+                for i in cols[1:] + [None]:
+                    if i is not None and i == last + 1:
+                        last = i
+                        continue
+                    cells.append((row_num, first, last, values[first:last + 1]))
+                    if i is not None:
+                        first = last = i
+
+            title = self.worksheet.title.replace("'", "''")
+            data = [{'range': f"'{title}'!{d['range']}", 'values': d['values']} for d in _merge_spans(cells)]
+
+            def _write():
+                self.sh.values_batch_update({'valueInputOption': 'USER_ENTERED', 'data': data})
+
+            ok = self._write_with_retry(_write)
+            if ok:
+                self.flush_count += 1
+                cell_count = sum(len(c[3]) for c in cells)
+                print(f"  -> {len(self._pending)}개 상품 {cell_count}칸 반영 (범위 {len(data)}개, 전송 #{self.flush_count})")
+                self.rows.update(self._pending)
+                self._mirror("record_write", data)
+            # 실패해도 (재시도 후 최종 실패) 같은 내용을 계속 다시 보내지 않도록 버퍼는 비움
+            self._pending = {}
+            self._dirty = {}
+            self._pending_bytes = 0
+            return ok
+
+    def _build_row(self, key, item, this_row_num):
+        """Product -> D~O 한 행 (AI 데이터 복원, 품절 표시 포함)"""
+        original_name = item.name
+        # [Added] Sold Out Handling
+        # If status is "일시품절" or "품절", append "(품절)" to the name
+        name = display_name(original_name, item.status)
+
+        # 갱신으로 같은 id가 다시 오면 덮어씀 (이름이 바뀌어도 한 상품)
+        if name:
+            self.new_data_check[key] = item
+
+        # AI 데이터(E/K열): 같은 상품의 기존 행에 있던 값을 그대로 유지
+        existing = self._pending.get(this_row_num) or self.rows.get(this_row_num)
+        if existing and (existing[1] or existing[7]):
+            tags, desc = existing[1], existing[7]
+        else:
             # Restore AI Data if exists
-            # Try to restore using the modified name first, then fallback to original name
-            ai_info = self.ai_data.get(name)
+            # 상품 id로 먼저 찾고, id 열이 없던 예전 행은 표시 이름 -> 원래 이름 순으로
+            ai_info = self.ai_data.get(key) or self.ai_data.get(name)
             if not ai_info and name != original_name:
                 ai_info = self.ai_data.get(original_name)
 
             tags = ai_info.get('tags', '') if ai_info else ''
             desc = ai_info.get('desc', '') if ai_info else ''
 
-            # Price/PV/BV cleanup
-            price_raw = str(item.get('price','0')).replace('원', '').replace(',', '').strip()
-            pv_raw = str(item.get('pv','0')).replace('PV','').replace(':','').replace(',', '').strip()
-            bv_raw = str(item.get('bv','0')).replace('BV','').replace(':','').replace(',', '').strip()
-            
-            # Formula row index adjustment
-            this_row_num = self.current_row + len(rows)
-            
-            # New Mapping:
-            # D: 분류 (category) - Korean
-            # E: 태그 (tags) - Restored from AI
-            # F: 제품명 (name)
-            # G: 사진URL (image)
-            # H: 사진보기 (=IMAGE)
-            # I: 상품링크 (link)
-            # J: (Empty)
-            # K: 설명 (description) - Restored from AI
-            # L: 가격 (price)
-            # M: PV (pv)
-            # N: BV (bv)
-            
-            row_data = [
-                item.get('category',''),       # D
-                tags,                          # E (Preserved)
-                name,                          # F
-                item.get('image',''),          # G
-                f'=IMAGE(G{this_row_num})',    # H
-                item.get('link',''),           # I
-                "",                            # J
-                desc,                          # K (Preserved)
-                price_raw,                     # L
-                pv_raw,                        # M
-                bv_raw                         # N
-            ]
-            rows.append(row_data)
-
-        if not rows:
-            return
+        # New Mapping:
+        # D: 분류 (category) - Korean
+        # E: 태그 (tags) - Restored from AI
+        # F: 제품명 (name)
+        # G: 사진URL (image)
+        # H: 사진보기 (=IMAGE)
+        # I: 상품링크 (link)
+        # J: (Empty)
+        # K: 설명 (description) - Restored from AI
+        # L: 가격 (price)
+        # M: PV (pv)
+        # N: BV (bv)
+        # O: 상품 id (숨김)
 
-        # Batch update (D~N)
-        end_row = self.current_row + len(rows) - 1
-        range_str = f"D{self.current_row}:N{end_row}"
-        
+        # Price/PV/BV: 크롤러 경계(Product)에서 이미 숫자로 파싱됨
+        return [
+            item.category,                 # D
+            tags,                          # E (Preserved)
+            name,                          # F
+            item.image,                    # G
+            f'=IMAGE(G{this_row_num})',    # H
+            item.link,                     # I
+            "",                            # J
+            desc,                          # K (Preserved)
+            item.price,                    # L
+            item.pv,                       # M
+            item.bv,                       # N
+            f"'{key}"                      # O (Hidden, 숫자 id의 앞자리 0이 지워지지 않도록 텍스트로)
+        ]
+
+    def _write_with_retry(self, write):
         # Retry logic for writing
         max_write_retries = 5
         for i in range(max_write_retries):
             try:
-                # gspread v6 compatibility: Use keyword arguments
-                self.worksheet.update(range_name=range_str, values=rows, value_input_option='USER_ENTERED')
-                print(f"  -> {len(rows)}개 데이터 입력 완료 ({range_str})")
-
-                self.current_row += len(rows)
-                break
+                write()
+                return True
             except Exception as e:
                 # 503 Service Unavailable or others
                 if i == max_write_retries - 1:
@@ -186,55 +436,183 @@ class SheetManager:
                     print(f"  !!! 시트 쓰기 오류: {e}")
                     print(f"  -> {wait_time:.1f}초 후 재시도 ({i+1}/{max_write_retries})...")
                     time.sleep(wait_time)
+        return False
+
+    def write_cells(self, data):
+        """
+        다른 단계(main.run_stage의 AI 태그/설명 등)가 상품 영역의 셀을 고칠 때 사용.
+        data: batch_update 형식 [{'range': 'E7', 'values': [[...]]}]
+        시트에 쓴 뒤 행 색인(rows)과 로컬 사본에도 반영합니다. 반환: 성공 여부
+        """
+        with self._lock:
+            # 버퍼에 남은 크롤링 결과가 나중에 같은 칸을 덮어쓰지 않도록 먼저 전송
+            self.flush()
+            if not self._write_with_retry(lambda: self.worksheet.batch_update(data)):
+                return False
+            for d in data:
+                start_row, start_col, _, _ = parse_range(d["range"])
+                for i, values in enumerate(d["values"]):
+                    row = self.rows.get(start_row + i)
+                    if row is None:
+                        continue
+                    for j, value in enumerate(values):
+                        col = start_col + j - 3 # A=0 -> D=0
+                        if 0 <= col < len(COLUMNS):
+                            row[col] = value
+            self._mirror("record_write", data)
+            return True
+
+    def update_names_by_id(self, names_by_id, links_by_id=None):
+        """
+        names_by_id: { 상품 id(O열): 새 제품명(F열) }
+        links_by_id: { 상품 id: 상품링크(I열) } - O열이 아직 비어 있는 예전 행을 찾을 때만 사용
+        I~O열만 읽어 행을 찾고 F열 셀만 한 번의 batch_update로 고칩니다. 반환: 고친 셀 수
+        """
+        if not names_by_id:
+            return 0
+
+        ids_by_link = {link: pid for pid, link in (links_by_id or {}).items() if link}
+        rows = self._read(f'I{START_ROW}:O')
+        data = []
+        for offset, row in enumerate(rows):
+            row = list(row) + [""] * (7 - len(row))
+            pid = str(row[6]).lstrip("'").strip()  # O열
+            if not pid:
+                pid = ids_by_link.get(row[0], "")  # I열
+            if pid in names_by_id:
+                data.append({'range': f"F{START_ROW + offset}", 'values': [[names_by_id[pid]]]})
 
-    def finalize_and_report_changes(self):
+        if data and self._write_with_retry(lambda: self.worksheet.batch_update(data)):
+            self._mirror("record_write", data)
+            print(f"  -> 제품명 {len(data)}칸 갱신 완료")
+            return len(data)
+        return 0
+
+    def append_history(self, changes):
+        """'변경내역' 시트에 행 추가"""
+        if not changes:
+            return
+        try:
+            self.history_sheet.append_rows(changes)
+            # 스프레드시트 수정 시각이 바뀌므로 사본의 기록도 맞춤
+            self._mirror("touch")
+            print(">>> '변경내역' 시트에 저장 완료!")
+        except Exception as e:
+            print(f"변경내역 저장 실패: {e}")
+
+    def finalize_and_report_changes(self, store_changes=None):
         """
         크롤링 완료 후 변경 사항을 '변경내역' 시트에 기록
+        store_changes: CrawlStore.run_changes() 결과. 주어지면 시트 스냅샷 대신 상품 id 기준 이력으로 비교합니다.
         """
-        # Cleanup remaining rows (if any)
-        if self.current_row < 5000:
-            print(f"\n>>> 잔여 데이터 정리 중 ({self.current_row}행 이후)...")
+        # 쓰기 버퍼에 남은 칸부터 전송
+        self.flush()
+
+        # 이번 실행에서 나오지 않은 상품의 행만 비움 (시트를 못 읽었으면 예전처럼 마지막으로 쓴 행 이후 전체)
+        stale = sorted(r for r in self.rows if r not in self.claimed_rows)
+        if stale:
+            print(f"\n>>> 목록에서 사라진 상품 {len(stale)}행 정리 중...")
+            ranges = [d["range"] for d in _merge_spans([(r, 0, len(COLUMNS) - 1, []) for r in stale])]
+        elif not self.snapshot_loaded and self.next_row < MAX_ROW:
+            print(f"\n>>> 잔여 데이터 정리 중 ({self.next_row}행 이후)...")
+            ranges = [f"D{self.next_row}:O{MAX_ROW}"]
+        else:
+            ranges = []
+        if ranges:
             try:
-                self.worksheet.batch_clear([f"D{self.current_row}:N5000"])
+                self.worksheet.batch_clear(ranges)
+                self._mirror("record_clear", ranges)
+                for r in stale:
+                    row = self.rows.pop(r, None)
+                    if row and self.id_index.get(_row_id(row)) == r:
+                        del self.id_index[_row_id(row)]
+                    self.free_rows.append(r)
             except Exception as e:
                 print(f"  (잔여 데이터 삭제 실패: {e})")
 
         print("\n>>> 변경 사항 분석 중...")
-        changes = []
         today = time.strftime("%Y-%m-%d %H:%M")
-        
-        # 1. 신규 상품 (New)
-        for name, info in self.new_data_check.items():
-            if name not in self.old_data:
-                price = info.get('price','').replace('원','').replace(',','').strip()
-                changes.append([today, "신규", name, "신제품 추가됨", "", f"{price}원"])
-
-        # 2. 삭제된 상품 (Removed)
-        for name, info in self.old_data.items():
-            if name not in self.new_data_check:
-                changes.append([today, "삭제", name, "목록에서 사라짐 (단종)", f"{info['price']}원", "-"])
-
-        # 3. 가격/정보 변경 (Changed)
-        for name, new_info in self.new_data_check.items():
-            if name in self.old_data:
-                old = self.old_data[name]
-                
-                # Compare Price
-                new_price = str(new_info.get('price','0')).replace('원','').replace(',','').strip()
-                old_price = str(old['price']).replace(',','').strip()
-                
-                if new_price != old_price and new_price != "0" and old_price != "0":
-                     changes.append([today, "가격변경", name, "가격이 변경됨", f"{old_price}원", f"{new_price}원"])
+
+        if store_changes is not None:
+            changes = self._changes_from_store(store_changes, today)
+        else:
+            changes = self._changes_from_snapshot(today)
 
         if changes:
             print(f"총 {len(changes)}건의 변경사항을 발견했습니다.")
-            try:
-                self.history_sheet.append_rows(changes)
-                print(">>> '변경내역' 시트에 저장 완료!")
-            except Exception as e:
-                print(f"변경내역 저장 실패: {e}")
+            self.append_history(changes)
         else:
             print(">>> 변경 사항이 없습니다.")
 
+    def _changes_from_store(self, store_changes, today):
+        """상태 저장소의 실행 간 비교 결과 -> '변경내역' 행 목록"""
+        changes = []
+        for item in store_changes["new"]:
+            changes.append([today, "신규", item.name, "신제품 추가됨", "", f"{item.price}원"])
+
+        for item in store_changes["removed"]:
+            changes.append([today, "삭제", item.name, "목록에서 사라짐 (단종)", f"{item.price}원", "-"])
+
+        for c in store_changes["changed"]:
+            before, after = c["before"], c["after"]
+            name = after["name"]
+            if before["price"] != after["price"] and before["price"] and after["price"]:
+                changes.append([today, "가격변경", name, "가격이 변경됨", f"{before['price']}원", f"{after['price']}원"])
+            if before["status"] != after["status"]:
+                changes.append([today, "상태변경", name, "판매 상태가 변경됨", before["status"], after["status"]])
+        return changes
+
+    def _changes_from_snapshot(self, today):
+        """시작 시 읽은 시트 스냅샷(old_data)과 이번 크롤링 결과를 상품 id(예전 행은 이름) 기준으로 비교"""
+        changes = []
+        matched = set()
+
+        for key, new_info in self.new_data_check.items():
+            name = display_name(new_info.name, new_info.status)
+            # append_data가 id(예전 행은 링크)로 찾은 행의 이전 값 (품절 표시로 이름이 바뀌어도 같은 상품)
+            old_key = self.old_keys.get(self.written_rows.get(key))
+            if old_key is None:
+                old_key = key if key in self.old_data else name
+            old = self.old_data.get(old_key)
+
+            # 1. 신규 상품 (New)
+            if old is None:
+                changes.append([today, "신규", name, "신제품 추가됨", "", f"{new_info.price}원"])
+                continue
+            matched.add(old_key)
+
+            # 2. 가격/정보 변경 (Changed)
+            # Compare Price (둘 다 숫자)
+            new_price = new_info.price
+            old_price = old['price']
+
+            if new_price != old_price and new_price and old_price:
+                 changes.append([today, "가격변경", name, "가격이 변경됨", f"{old_price}원", f"{new_price}원"])
+
+            # 시트에는 판매 상태가 제품명의 '(품절)' 표시로만 남아 있음
+            old_sold_out = SOLD_OUT_SUFFIX in old['name']
+            new_sold_out = new_info.status in SOLD_OUT_STATUSES
+            if old_sold_out != new_sold_out:
+                changes.append([today, "상태변경", name, "판매 상태가 변경됨",
+                                "품절" if old_sold_out else "판매중", new_info.status or "판매중"])
+
+        # 3. 삭제된 상품 (Removed)
+        for key, info in self.old_data.items():
+            if key not in matched:
+                changes.append([today, "삭제", info['name'], "목록에서 사라짐 (단종)", f"{info['price']}원", "-"])
+
+        return changes
+
+    def close(self):
+        """남은 쓰기 버퍼를 전송하고 로컬 사본 연결을 닫음 (daemon.py처럼 실행마다 새로 만드는 경우)"""
+        with self._lock:
+            self.flush()
+            if self.mirror is not None:
+                try:
+                    self.mirror.close()
+                except Exception as e:
+                    print(f"  (시트 사본 닫기 실패: {e})")
+                self.mirror = None
+
 if __name__ == "__main__":
     print("This module is intended to be imported by run_all.py")